@@ -0,0 +1,65 @@
+-- Sallie Studio Backend - Current-state tables for limbic and trust data
+-- limbic_states and trust_records become append-only history; the latest
+-- values per user live in limbic_current and trust_current
+
+BEGIN;
+
+-- History tables (created by the services until now)
+CREATE TABLE IF NOT EXISTS limbic_states (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    trust DOUBLE PRECISION DEFAULT 0.5,
+    warmth DOUBLE PRECISION DEFAULT 0.5,
+    arousal DOUBLE PRECISION DEFAULT 0.5,
+    valence DOUBLE PRECISION DEFAULT 0.5,
+    posture VARCHAR(50) DEFAULT 'companion'
+);
+
+CREATE TABLE IF NOT EXISTS trust_records (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    trust_score DOUBLE PRECISION DEFAULT 0.0,
+    trust_tier INTEGER DEFAULT 0,
+    action_type VARCHAR(100) NOT NULL,
+    outcome VARCHAR(50) NOT NULL, -- 'success', 'failure', 'penalty'
+    reason TEXT
+);
+
+-- Current state, one row per user, maintained by upsert
+CREATE TABLE IF NOT EXISTS limbic_current (
+    user_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    trust DOUBLE PRECISION DEFAULT 0.5,
+    warmth DOUBLE PRECISION DEFAULT 0.5,
+    arousal DOUBLE PRECISION DEFAULT 0.5,
+    valence DOUBLE PRECISION DEFAULT 0.5,
+    posture VARCHAR(50) DEFAULT 'companion'
+);
+
+CREATE TABLE IF NOT EXISTS trust_current (
+    user_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    trust_score DOUBLE PRECISION DEFAULT 0.0,
+    trust_tier INTEGER DEFAULT 0
+);
+
+-- Per-user history scans (analytics, backfill) walk these newest first
+CREATE INDEX IF NOT EXISTS idx_limbic_states_user_timestamp ON limbic_states(user_id, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_trust_records_user_timestamp ON trust_records(user_id, timestamp DESC);
+
+-- Backfill current state from the latest history row per user
+INSERT INTO limbic_current (user_id, updated_at, trust, warmth, arousal, valence, posture)
+SELECT DISTINCT ON (user_id) user_id, timestamp, trust, warmth, arousal, valence, posture
+FROM limbic_states
+ORDER BY user_id, timestamp DESC
+ON CONFLICT (user_id) DO NOTHING;
+
+INSERT INTO trust_current (user_id, updated_at, trust_score, trust_tier)
+SELECT DISTINCT ON (user_id) user_id, timestamp, trust_score, trust_tier
+FROM trust_records
+ORDER BY user_id, timestamp DESC
+ON CONFLICT (user_id) DO NOTHING;
+
+COMMIT;
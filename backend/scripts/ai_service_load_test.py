@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+AI Service Chat Load Test
+Drives AIService._call_chat_model against a local fake OpenAI endpoint and
+reports chat throughput and event-loop lag as in-flight requests grow
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+import openai
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../services/python-ai-service'))
+
+from src.services.ai_service import AIService
+from src.services.provider_limits import ProviderLimiter
+
+PROVIDER_LATENCY = 0.1  # seconds the fake provider takes per completion
+PROVIDER_LIMIT = 32
+IN_FLIGHT_LEVELS = [1, 4, 16, 32, 64]
+REQUESTS_PER_SLOT = 5
+
+def completion_body() -> bytes:
+    return json.dumps({
+        "id": "chatcmpl-load-test",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "gpt-3.5-turbo",
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": "Hello from the fake provider"},
+            "finish_reason": "stop"
+        }],
+        "usage": {"prompt_tokens": 12, "completion_tokens": 6, "total_tokens": 18}
+    }).encode()
+
+async def handle_fake_provider(reader, writer):
+    """Keep-alive HTTP/1.1 stub that answers every chat completion after a delay"""
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+
+            await asyncio.sleep(PROVIDER_LATENCY)
+            body = completion_body()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: application/json\r\n"
+                b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+            )
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionResetError):
+        pass
+    finally:
+        writer.close()
+
+async def measure_loop_lag(stop: asyncio.Event, samples: list):
+    """Record how late a 10 ms ticker wakes up while the load runs"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        samples.append(time.perf_counter() - start - 0.01)
+
+async def run_level(service: AIService, in_flight: int):
+    """Issue in_flight * REQUESTS_PER_SLOT chats, in_flight at a time"""
+    total = in_flight * REQUESTS_PER_SLOT
+    semaphore = asyncio.Semaphore(in_flight)
+    messages = [{"role": "user", "content": "How are you today?"}]
+
+    async def one_chat():
+        async with semaphore:
+            await service._call_chat_model(messages, "gpt-3.5-turbo", 0.7, 64)
+
+    stop = asyncio.Event()
+    lag = []
+    ticker = asyncio.create_task(measure_loop_lag(stop, lag))
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one_chat() for _ in range(total)])
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await ticker
+    return total / elapsed, max(lag, default=0.0) * 1000
+
+async def main():
+    server = await asyncio.start_server(handle_fake_provider, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    client = openai.AsyncOpenAI(api_key="load-test", base_url=f"http://127.0.0.1:{port}/v1", max_retries=0)
+    service = AIService(openai_client=client)
+    service.limiter = ProviderLimiter({"openai": PROVIDER_LIMIT, "anthropic": PROVIDER_LIMIT})
+
+    print("🤖 AI SERVICE CHAT LOAD TEST")
+    print("=" * 50)
+    print(f"Fake provider latency: {PROVIDER_LATENCY * 1000:.0f} ms, OpenAI limit: {PROVIDER_LIMIT}")
+    print(f"{'in-flight':>10} {'chats/s':>10} {'max loop lag (ms)':>18}")
+
+    for in_flight in IN_FLIGHT_LEVELS:
+        throughput, lag = await run_level(service, in_flight)
+        print(f"{in_flight:>10} {throughput:>10.1f} {lag:>18.1f}")
+
+    print("=" * 50)
+
+    await client.close()
+    server.close()
+    await server.wait_closed()
+
+if __name__ == "__main__":
+    asyncio.run(main())
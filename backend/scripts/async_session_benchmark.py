@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Async Session Benchmark
+Runs concurrent chat turns against SQLite two ways: the old pattern of a
+synchronous Session used inside async handlers, and AIService.chat on an
+AsyncSession over aiosqlite. Reports turns/s and event-loop lag, then
+sweeps the async pool size
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../services/python-ai-service'))
+
+from src.models.conversation import Base, Conversation, Message
+from src.schemas.conversation import ChatRequest
+from src.services.ai_service import AIService
+from src.services.usage_recorder import UsageRecorder
+
+CONVERSATIONS = 64
+HISTORY = 40  # messages per seeded conversation
+PROVIDER_LATENCY = 0.02  # seconds the fake model takes per turn
+CONCURRENCY_LEVELS = [1, 8, 32]
+POOL_SIZES = [1, 4, 16]
+TURNS_PER_SLOT = 8
+JOURNAL_MODE = os.environ.get("JOURNAL_MODE", "WAL")
+
+class FakeOpenAI:
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, messages, **kwargs):
+        await asyncio.sleep(PROVIDER_LATENCY)
+        usage = {"prompt_tokens": 120, "completion_tokens": 12, "total_tokens": 132}
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="Sounds good, tell me more."))],
+            usage=SimpleNamespace(model_dump=lambda: usage)
+        )
+
+def seed(url: str) -> list:
+    """Create conversations with HISTORY messages each; returns their ids"""
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        conn.exec_driver_sql(f"PRAGMA journal_mode={JOURNAL_MODE}")
+    Base.metadata.create_all(engine)
+    ids = []
+    start = datetime(2026, 1, 1)
+    with sessionmaker(bind=engine)() as db:
+        for _ in range(CONVERSATIONS):
+            conversation = Conversation(
+                id=uuid.uuid4(),
+                user_id="benchmark-user",
+                title="Benchmark",
+                model="gpt-3.5-turbo",
+                temperature=0.7,
+                max_tokens=64
+            )
+            db.add(conversation)
+            for i in range(HISTORY):
+                db.add(Message(
+                    conversation_id=conversation.id,
+                    role="user" if i % 2 == 0 else "assistant",
+                    content=f"Message {i} about the garden and the weather this week",
+                    created_at=start + timedelta(seconds=i)
+                ))
+            ids.append(conversation.id)
+        db.commit()
+    engine.dispose()
+    return ids
+
+async def measure_loop_lag(stop: asyncio.Event, samples: list):
+    """Record how late a 5 ms ticker wakes up while the load runs"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.005)
+        samples.append(time.perf_counter() - start - 0.005)
+
+async def drive(turn, conversation_ids: list, concurrency: int):
+    """Run concurrency * TURNS_PER_SLOT turns; returns (turns/s, p99 loop lag ms)"""
+    total = concurrency * TURNS_PER_SLOT
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            await turn(conversation_ids[i % len(conversation_ids)])
+
+    stop = asyncio.Event()
+    lag = []
+    ticker = asyncio.create_task(measure_loop_lag(stop, lag))
+    start = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(total)])
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+
+    lag.sort()
+    return total / elapsed, lag[int(0.99 * (len(lag) - 1))] * 1000 if lag else 0.0
+
+def sync_turn_factory(url: str, client: FakeOpenAI):
+    """The pre-port data access: blocking Session calls inside an async handler"""
+    # A pool smaller than the in-flight turns deadlocks here: a blocking checkout
+    # stalls the event loop that would otherwise return a connection
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        pool_size=max(CONCURRENCY_LEVELS),
+        max_overflow=0
+    )
+    Session = sessionmaker(bind=engine)
+
+    async def turn(conversation_id):
+        with Session() as db:
+            conversation = db.query(Conversation).filter(Conversation.id == conversation_id).first()
+            history = db.query(Message).filter(
+                Message.conversation_id == conversation.id
+            ).order_by(Message.created_at.desc(), Message.id.desc()).limit(20).all()
+            messages = [{"role": m.role, "content": m.content} for m in reversed(history)]
+
+            response = await client.chat.completions.create(model=conversation.model, messages=messages)
+
+            db.add(Message(conversation_id=conversation.id, role="user", content="How is it going?"))
+            db.add(Message(
+                conversation_id=conversation.id,
+                role="assistant",
+                content=response.choices[0].message.content
+            ))
+            conversation.updated_at = datetime.utcnow()
+            db.commit()
+
+    return turn, engine
+
+def async_turn_factory(url: str, service: AIService, pool_size: int, spool_dir: str):
+    """The ported path: AIService.chat on an AsyncSession"""
+    engine = create_async_engine(url, pool_size=pool_size, max_overflow=0, pool_timeout=60)
+    Session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    service.usage_recorder = UsageRecorder(Session, spool_dir=spool_dir)
+
+    async def turn(conversation_id):
+        async with Session() as db:
+            await service.chat(
+                ChatRequest(message="How is it going?", conversation_id=conversation_id),
+                "benchmark-user",
+                db
+            )
+
+    return turn, engine
+
+async def main():
+    workdir = tempfile.mkdtemp(prefix="async-session-benchmark-")
+    path = os.path.join(workdir, "benchmark.db")
+    conversation_ids = seed(f"sqlite:///{path}")
+
+    client = FakeOpenAI()
+    service = AIService(openai_client=client)
+
+    print("🗄️  ASYNC SESSION BENCHMARK")
+    print("=" * 64)
+    print(f"SQLite file, {CONVERSATIONS} conversations x {HISTORY} messages, fake model {PROVIDER_LATENCY * 1000:.0f} ms")
+    print(f"{'mode':<14} {'in-flight':>10} {'turns/s':>10} {'p99 loop lag (ms)':>18}")
+
+    sync_turn, sync_engine = sync_turn_factory(f"sqlite:///{path}", client)
+    for concurrency in CONCURRENCY_LEVELS:
+        throughput, lag = await drive(sync_turn, conversation_ids, concurrency)
+        print(f"{'sync Session':<14} {concurrency:>10} {throughput:>10.1f} {lag:>18.1f}")
+    sync_engine.dispose()
+
+    async_turn, async_engine = async_turn_factory(
+        f"sqlite+aiosqlite:///{path}", service, max(CONCURRENCY_LEVELS), workdir
+    )
+    for concurrency in CONCURRENCY_LEVELS:
+        throughput, lag = await drive(async_turn, conversation_ids, concurrency)
+        print(f"{'AsyncSession':<14} {concurrency:>10} {throughput:>10.1f} {lag:>18.1f}")
+    await service.usage_recorder.close()
+    await async_engine.dispose()
+
+    print("-" * 64)
+    print(f"AsyncSession pool size sweep at {max(CONCURRENCY_LEVELS)} in flight")
+    print(f"{'pool_size':>10} {'turns/s':>10} {'p99 loop lag (ms)':>18}")
+    for pool_size in POOL_SIZES:
+        async_turn, async_engine = async_turn_factory(f"sqlite+aiosqlite:///{path}", service, pool_size, workdir)
+        throughput, lag = await drive(async_turn, conversation_ids, max(CONCURRENCY_LEVELS))
+        print(f"{pool_size:>10} {throughput:>10.1f} {lag:>18.1f}")
+        await service.usage_recorder.close()
+        await async_engine.dispose()
+
+    print("=" * 64)
+
+if __name__ == "__main__":
+    asyncio.run(main())
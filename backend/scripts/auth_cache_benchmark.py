@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Auth Cache Benchmark
+Calls a gateway-shaped FastAPI app directly over ASGI with auth_middleware
+and a Depends(get_current_user) route, and compares per-request auth
+overhead of the previous decode-twice path with the verified-token cache
+"""
+
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import jwt
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../services/api-gateway/src'))
+
+from shared.config import settings
+from shared.models import TrustTier, UserResponse
+from middleware import auth
+
+REQUESTS = 20000
+USERS = 500  # distinct tokens, requested round-robin
+
+def make_tokens() -> list:
+    expires = datetime.now(timezone.utc) + timedelta(hours=1)
+    return [
+        jwt.encode(
+            {"sub": f"user-{n}", "email": f"user-{n}@example.com", "name": f"User {n}", "trust_tier": "partner", "exp": expires},
+            settings.JWT_SECRET_KEY,
+            algorithm=settings.JWT_ALGORITHM
+        )
+        for n in range(USERS)
+    ]
+
+def legacy_verify(token: str) -> UserResponse:
+    """The previous get_current_user body: decode, verify and build on every call"""
+    try:
+        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+        exp = payload.get('exp')
+        if exp and datetime.fromtimestamp(exp, timezone.utc) < datetime.now(timezone.utc):
+            raise HTTPException(status_code=401, detail="Token expired")
+        return UserResponse(
+            id=payload['sub'],
+            email=payload['email'],
+            name=payload.get('name'),
+            trust_tier=TrustTier(payload.get('trust_tier', 'stranger'))
+        )
+    except jwt.InvalidTokenError as e:
+        raise HTTPException(status_code=401, detail=f"Invalid token: {str(e)}")
+
+async def legacy_middleware(request, call_next):
+    authorization = request.headers.get('authorization')
+    request.state.user = legacy_verify(authorization[7:]) if authorization else None
+    return await call_next(request)
+
+async def legacy_current_user(credentials: HTTPAuthorizationCredentials = Depends(auth.security)) -> UserResponse:
+    return legacy_verify(credentials.credentials)
+
+FIXED_USER = UserResponse(id="user-0", email="user-0@example.com", name="User 0", trust_tier=TrustTier.PARTNER)
+
+async def unverified_current_user(credentials: HTTPAuthorizationCredentials = Depends(auth.security)) -> UserResponse:
+    """Same dependency shape as get_current_user, without verifying anything"""
+    return FIXED_USER
+
+async def passthrough_middleware(request, call_next):
+    return await call_next(request)
+
+def build_app(middleware, current_user) -> FastAPI:
+    app = FastAPI()
+    app.middleware("http")(middleware)
+
+    @app.get("/api/limbic/state")
+    async def state(user: UserResponse = Depends(current_user)):
+        return {"user": user.id}
+
+    return app
+
+async def drive(app, tokens: list, requests: int = REQUESTS) -> float:
+    """Issue authenticated GETs round-robin over tokens; returns microseconds per request"""
+    def receiver():
+        sent = False
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # The http middleware listens for a disconnect that never comes
+            await asyncio.Event().wait()
+
+        return receive
+
+    async def send(message):
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"unexpected status {message['status']}")
+
+    start = time.perf_counter()
+    for i in range(requests):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/api/limbic/state",
+            "raw_path": b"/api/limbic/state",
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"host", b"benchmark"), (b"authorization", f"Bearer {tokens[i % len(tokens)]}".encode())],
+            "client": ("127.0.0.1", 1234),
+            "server": ("benchmark", 80)
+        }
+        await app(scope, receiver(), send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+async def main():
+    tokens = make_tokens()
+
+    print("🔐 AUTH CACHE BENCHMARK")
+    print("=" * 64)
+    print(f"{REQUESTS} requests round-robin over {USERS} tokens ({settings.JWT_ALGORITHM})")
+    print(f"{'auth path':<30} {'us/request':>12} {'auth overhead':>14}")
+
+    # The baseline has the same middleware and dependency layers, minus verification
+    results = []
+    for name, app in [
+        ("no verification", build_app(passthrough_middleware, unverified_current_user)),
+        ("decode in middleware + Depends", build_app(legacy_middleware, legacy_current_user)),
+        ("verified-token cache", build_app(auth.auth_middleware, auth.get_current_user))
+    ]:
+        auth.token_cache.clear()
+        await drive(app, tokens, USERS)  # warm up, and fill the cache once per token
+        results.append((name, await drive(app, tokens)))
+
+    baseline = results[0][1]
+    for i, (name, cost) in enumerate(results):
+        overhead = f"{cost - baseline:.1f}" if i else "-"
+        print(f"{name:<30} {cost:>12.1f} {overhead:>14}")
+
+    print("-" * 64)
+    print(f"cache hits {auth.token_cache.hits}, misses {auth.token_cache.misses}")
+    print("=" * 64)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+AdvancedCache Benchmark
+Measures get/put latency per eviction strategy as the cache grows
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.advanced_performance import AdvancedCache, CacheStrategy
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+OPERATIONS = 50_000
+
+def fill_cache(strategy, size):
+    """Create a full cache so every further put triggers an eviction"""
+    cache = AdvancedCache(max_size=size, strategy=strategy)
+    ttl = 3600 if strategy == CacheStrategy.TTL else None
+    for i in range(size):
+        cache.put(f"key-{i}", i, ttl)
+    return cache
+
+def measure(strategy, size):
+    """Return average (get, put) latency in microseconds for a full cache"""
+    cache = fill_cache(strategy, size)
+    ttl = 3600 if strategy == CacheStrategy.TTL else None
+    rng = random.Random(42)
+
+    keys = [f"key-{rng.randrange(size)}" for _ in range(OPERATIONS)]
+    start = time.perf_counter()
+    for key in keys:
+        cache.get(key)
+    get_us = (time.perf_counter() - start) / OPERATIONS * 1e6
+
+    start = time.perf_counter()
+    for i in range(OPERATIONS):
+        cache.put(f"new-{i}", i, ttl)
+    put_us = (time.perf_counter() - start) / OPERATIONS * 1e6
+
+    return get_us, put_us
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+
+    print("⚡ ADVANCEDCACHE LATENCY BENCHMARK")
+    print("=" * 50)
+    print(f"{'strategy':<10} {'entries':>10} {'get (us)':>10} {'put (us)':>10}")
+
+    for strategy in CacheStrategy:
+        for size in sizes:
+            get_us, put_us = measure(strategy, size)
+            print(f"{strategy.value:<10} {size:>10} {get_us:>10.2f} {put_us:>10.2f}")
+
+    print("=" * 50)
+    print("Latency should stay flat as the entry count grows.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Local Inference Batching Benchmark
+Measures CPU throughput of the sentiment and NER pipelines used by
+AIService.analyze_sentiment and AIService.extract_entities as the
+LocalInferenceScheduler's max batch size grows
+
+Requires transformers and torch; the first run downloads the models.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+from transformers import pipeline
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../services/python-ai-service'))
+
+from src.services.local_inference import LocalInferenceScheduler
+
+PIPELINES = {
+    "sentiment": lambda: pipeline(
+        "sentiment-analysis",
+        model="cardiffnlp/twitter-roberta-base-sentiment-latest",
+        device=-1
+    ),
+    "ner": lambda: pipeline(
+        "ner",
+        model="dbmdz/bert-large-cased-finetuned-conll03-english",
+        aggregation_strategy="simple",
+        device=-1
+    ),
+}
+BATCH_SIZES = [1, 4, 8, 16, 32]
+REQUESTS = 256
+TEXTS = [
+    "I finally finished the project and Sarah loved the demo in Berlin!",
+    "The meeting with Acme Corp ran late again and nothing got decided.",
+    "Feeling okay today, just a bit tired after the trip to Chicago.",
+    "Thanks for remembering my sister's birthday, that meant a lot.",
+]
+
+async def run(models, name: str, max_batch_size: int):
+    """Submit REQUESTS texts concurrently; return (requests/s, avg batch size)"""
+    scheduler = LocalInferenceScheduler(models, max_batch_size=max_batch_size, max_wait=0.01)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        scheduler.submit(name, TEXTS[i % len(TEXTS)])
+        for i in range(REQUESTS)
+    ])
+    elapsed = time.perf_counter() - start
+
+    metrics = scheduler.get_metrics()[name]
+    await scheduler.close()
+    return REQUESTS / elapsed, metrics["average_batch_size"]
+
+async def main():
+    print("🧠 LOCAL INFERENCE BATCHING BENCHMARK")
+    print("=" * 50)
+
+    for name, load in PIPELINES.items():
+        models = {name: load()}
+        # Warm up so weight loading and first-call setup are not timed
+        models[name](TEXTS)
+
+        print(f"\n{name} ({REQUESTS} requests)")
+        print(f"{'max batch':>10} {'req/s':>10} {'avg batch':>10}")
+        for max_batch_size in BATCH_SIZES:
+            throughput, average_batch = await run(models, name, max_batch_size)
+            print(f"{max_batch_size:>10} {throughput:>10.1f} {average_batch:>10.1f}")
+
+    print("=" * 50)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Metrics Middleware Benchmark
+Calls a FastAPI app directly over ASGI (no sockets) with and without request
+metrics, and compares per-request overhead and the number of series created
+by the old raw-path BaseHTTPMiddleware and the route-templated ASGI middleware
+"""
+
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+from fastapi import APIRouter, FastAPI, Request
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+from starlette.middleware.base import BaseHTTPMiddleware
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../services/api-gateway/src'))
+
+from middleware.metrics import HTTPMetrics, MetricsMiddleware
+
+REQUESTS = 10000
+WARMUP = 1000  # requests per app before timing, so lazy setup isn't measured
+ROUTE_GROUPS = 6  # CRUD routes per group, mimicking the gateway's routers
+
+class RawPathMetricsMiddleware(BaseHTTPMiddleware):
+    """The previous middleware: BaseHTTPMiddleware labelled with request.url.path"""
+
+    def __init__(self, app, registry: CollectorRegistry):
+        super().__init__(app)
+        self.count = Counter('http_requests_total', 'Total HTTP requests', ['method', 'endpoint', 'status_code'], registry=registry)
+        self.duration = Histogram('http_request_duration_seconds', 'HTTP request duration', ['method', 'endpoint'], registry=registry)
+        self.active = Gauge('active_connections', 'Active connections', registry=registry)
+
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        self.active.inc()
+        try:
+            response = await call_next(request)
+            self.count.labels(request.method, request.url.path, str(response.status_code)).inc()
+            self.duration.labels(request.method, request.url.path).observe(time.time() - start_time)
+            return response
+        finally:
+            self.active.dec()
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    for group in range(ROUTE_GROUPS):
+        router = APIRouter()
+
+        @router.get("/items")
+        async def list_items():
+            return {"items": []}
+
+        @router.post("/items")
+        async def create_item():
+            return {"created": True}
+
+        @router.get("/items/{item_id}")
+        async def get_item(item_id: str):
+            return {"id": item_id}
+
+        @router.delete("/items/{item_id}")
+        async def delete_item(item_id: str):
+            return {"deleted": item_id}
+
+        app.include_router(router, prefix=f"/api/group{group}")
+    return app
+
+def series_count(registry: CollectorRegistry) -> int:
+    return sum(len(metric.samples) for metric in registry.collect())
+
+async def drive(app, requests: int = REQUESTS) -> float:
+    """Issue GETs for fresh item ids; returns microseconds per request"""
+    def receiver():
+        sent = False
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # BaseHTTPMiddleware listens for a disconnect that never comes
+            await asyncio.Event().wait()
+
+        return receive
+
+    async def send(message):
+        pass
+
+    paths = [f"/api/group{i % ROUTE_GROUPS}/items/{uuid.uuid4()}" for i in range(requests)]
+    start = time.perf_counter()
+    for path in paths:
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"host", b"benchmark")],
+            "client": ("127.0.0.1", 1234),
+            "server": ("benchmark", 80)
+        }
+        await app(scope, receiver(), send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+async def main():
+    print("📈 METRICS MIDDLEWARE BENCHMARK")
+    print("=" * 64)
+    print(f"{REQUESTS} GETs over {ROUTE_GROUPS * 4} routes, a fresh id in every path")
+    print(f"{'middleware':<26} {'us/request':>12} {'overhead':>10} {'series':>10}")
+
+    bare = build_app()
+    await drive(bare, WARMUP)
+    baseline = await drive(bare)
+    print(f"{'none':<26} {baseline:>12.1f} {'-':>10} {'-':>10}")
+
+    registry = CollectorRegistry()
+    raw = build_app()
+    raw.add_middleware(RawPathMetricsMiddleware, registry=registry)
+    await drive(raw, WARMUP)
+    cost = await drive(raw)
+    print(f"{'BaseHTTP, raw path':<26} {cost:>12.1f} {cost - baseline:>10.1f} {series_count(registry):>10}")
+
+    registry = CollectorRegistry()
+    templated = build_app()
+    templated.add_middleware(MetricsMiddleware, metrics=HTTPMetrics(registry))
+    await drive(templated, WARMUP)
+    cost = await drive(templated)
+    print(f"{'ASGI, route template':<26} {cost:>12.1f} {cost - baseline:>10.1f} {series_count(registry):>10}")
+
+    print("=" * 64)
+
+if __name__ == "__main__":
+    asyncio.run(main())
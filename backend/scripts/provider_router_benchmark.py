@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Provider Router Benchmark
+Drives AIService._call_chat_model against in-process fake OpenAI and
+Anthropic clients with injected latency and failures, and compares tail
+latency and caller-visible errors with and without hedged routing
+"""
+
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../services/python-ai-service'))
+
+from src.services.ai_service import AIService
+from src.services.provider_router import ProviderRouter
+
+PRIMARY = "gpt-3.5-turbo"
+SECONDARY = "claude-3-haiku-20240307"
+REQUESTS = 400
+CONCURRENCY = 20
+HEDGE_DELAY = 0.15  # seconds before the first hedge, until enough samples exist
+
+def sample_latency() -> float:
+    """Mostly fast with a slow tail: 90% ~60 ms, 8% ~600 ms, 2% ~2 s"""
+    roll = random.random()
+    if roll < 0.90:
+        return random.uniform(0.04, 0.08)
+    if roll < 0.98:
+        return random.uniform(0.5, 0.7)
+    return random.uniform(1.8, 2.2)
+
+class FakeProvider:
+    """Counts calls and answers after a sampled delay, failing when told to"""
+
+    def __init__(self):
+        self.calls = 0
+        self.failing = False
+
+    async def respond(self):
+        self.calls += 1
+        await asyncio.sleep(sample_latency())
+        if self.failing:
+            raise RuntimeError("fake provider outage")
+
+class FakeOpenAI:
+    def __init__(self, provider: FakeProvider):
+        self.provider = provider
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, messages, **kwargs):
+        await self.provider.respond()
+        usage = {"prompt_tokens": 12, "completion_tokens": 6, "total_tokens": 18}
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="Hello from OpenAI"))],
+            usage=SimpleNamespace(model_dump=lambda: usage)
+        )
+
+class FakeAnthropic:
+    def __init__(self, provider: FakeProvider):
+        self.provider = provider
+        self.messages = SimpleNamespace(create=self.create)
+
+    async def create(self, model, messages, **kwargs):
+        await self.provider.respond()
+        return SimpleNamespace(
+            content=[SimpleNamespace(text="Hello from Anthropic")],
+            usage=SimpleNamespace(input_tokens=12, output_tokens=6)
+        )
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+async def run(service: AIService, outage: FakeProvider = None) -> dict:
+    """Issue REQUESTS chats, CONCURRENCY at a time; optionally fail the primary for the middle half"""
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    messages = [{"role": "user", "content": "How are you today?"}]
+    latencies, errors = [], 0
+    completed = 0
+
+    async def one_chat():
+        nonlocal errors, completed
+        async with semaphore:
+            if outage is not None:
+                outage.failing = REQUESTS // 4 <= completed < 3 * REQUESTS // 4
+            start = time.perf_counter()
+            try:
+                await service._call_chat_model(messages, PRIMARY, 0.7, 64)
+                latencies.append(time.perf_counter() - start)
+            except Exception:
+                errors += 1
+            completed += 1
+
+    await asyncio.gather(*[one_chat() for _ in range(REQUESTS)])
+    return {
+        "p50": percentile(latencies, 0.5) * 1000,
+        "p95": percentile(latencies, 0.95) * 1000,
+        "p99": percentile(latencies, 0.99) * 1000,
+        "errors": errors
+    }
+
+async def scenario(name: str, router: ProviderRouter, outage: bool = False):
+    openai_provider, anthropic_provider = FakeProvider(), FakeProvider()
+    service = AIService(
+        openai_client=FakeOpenAI(openai_provider),
+        anthropic_client=FakeAnthropic(anthropic_provider)
+    )
+    service.provider_router = router
+
+    result = await run(service, openai_provider if outage else None)
+    extra = (openai_provider.calls + anthropic_provider.calls) / REQUESTS - 1
+    print(
+        f"{name:<22} {result['p50']:>8.0f} {result['p95']:>8.0f} {result['p99']:>8.0f} "
+        f"{result['errors']:>7} {openai_provider.calls:>8} {extra:>8.1%}"
+    )
+
+async def main():
+    random.seed(7)
+    # Every failed attempt in the outage scenarios logs a warning
+    logging.getLogger("src.services.provider_router").setLevel(logging.ERROR)
+    fallbacks = {PRIMARY: [SECONDARY]}
+
+    print("🔀 PROVIDER ROUTER BENCHMARK")
+    print("=" * 72)
+    print(f"{REQUESTS} chats, {CONCURRENCY} in flight; fake latency 90% ~60 ms, 8% ~600 ms, 2% ~2 s")
+    print(f"{'scenario':<22} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7} {'primary':>8} {'extra':>8}")
+
+    await scenario("direct", ProviderRouter(hedge_delay=None))
+    await scenario("hedged", ProviderRouter(fallbacks, hedge_delay=HEDGE_DELAY))
+    await scenario("outage, direct", ProviderRouter(hedge_delay=None, failure_threshold=10**9), outage=True)
+    await scenario(
+        "outage, routed",
+        ProviderRouter(fallbacks, hedge_delay=HEDGE_DELAY, reset_timeout=0.5),
+        outage=True
+    )
+
+    print("=" * 72)
+    print("primary = calls reaching the primary provider; extra = calls beyond one per chat")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Upstream Channel Benchmark
+Runs a fake communication service on localhost and measures per-frame round
+trip from the gateway three ways: a new httpx client per frame (the original
+websocket route), the pooled keep-alive client, and the persistent
+multiplexed UpstreamChannel
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import sys
+import time
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route, WebSocketRoute
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../services/api-gateway/src'))
+
+from utils.upstream_channel import UpstreamChannel
+
+USERS = 50
+FRAMES_PER_USER = 40
+PROCESSING_DELAY = 0.002  # seconds the fake service spends on each frame
+
+def reply_for(payload: dict) -> dict:
+    return {"type": "response", "content": f"echo: {payload.get('content', '')}"}
+
+async def websocket_message(request: Request):
+    payload = await request.json()
+    await asyncio.sleep(PROCESSING_DELAY)
+    return JSONResponse(reply_for(payload))
+
+async def gateway_channel(websocket: WebSocket):
+    """Answers each frame in its own task so replies come back out of order"""
+    await websocket.accept()
+
+    async def answer(frame: dict):
+        await asyncio.sleep(PROCESSING_DELAY)
+        await websocket.send_text(json.dumps({"id": frame["id"], "status": 200, "body": reply_for(frame["payload"])}))
+
+    tasks = set()
+    try:
+        while True:
+            task = asyncio.create_task(answer(json.loads(await websocket.receive_text())))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    except WebSocketDisconnect:
+        pass
+
+service = Starlette(routes=[
+    Route("/websocket-message", websocket_message, methods=["POST"]),
+    WebSocketRoute("/ws/gateway", gateway_channel)
+])
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+async def run(send_frame) -> dict:
+    """USERS concurrent users, each sending FRAMES_PER_USER frames one after another"""
+    latencies = []
+
+    async def user(user_id: str):
+        for i in range(FRAMES_PER_USER):
+            start = time.perf_counter()
+            status_code, _ = await send_frame(user_id, {"type": "text", "content": f"frame {i}"})
+            assert status_code == 200
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[user(f"user-{n}") for n in range(USERS)])
+    elapsed = time.perf_counter() - start
+    return {
+        "p50": percentile(latencies, 0.5) * 1000,
+        "p99": percentile(latencies, 0.99) * 1000,
+        "rate": len(latencies) / elapsed
+    }
+
+async def main():
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = uvicorn.Server(uvicorn.Config(service, host="127.0.0.1", port=port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    print("🔌 UPSTREAM CHANNEL BENCHMARK")
+    print("=" * 64)
+    print(f"{USERS} users x {FRAMES_PER_USER} frames, fake service {PROCESSING_DELAY * 1000:.0f} ms per frame")
+    print(f"{'transport':<26} {'p50 ms':>8} {'p99 ms':>8} {'frames/s':>10}")
+
+    async def client_per_frame(user_id, payload):
+        async with httpx.AsyncClient() as client:
+            response = await client.post(f"{base_url}/websocket-message", json={**payload, "user_id": user_id})
+        return response.status_code, response.text
+
+    result = await run(client_per_frame)
+    print(f"{'new client per frame':<26} {result['p50']:>8.2f} {result['p99']:>8.2f} {result['rate']:>10.0f}")
+
+    pooled = httpx.AsyncClient(limits=httpx.Limits(max_connections=100, max_keepalive_connections=20))
+
+    async def pooled_post(user_id, payload):
+        response = await pooled.post(f"{base_url}/websocket-message", json={**payload, "user_id": user_id})
+        return response.status_code, response.text
+
+    result = await run(pooled_post)
+    print(f"{'pooled keep-alive POST':<26} {result['p50']:>8.2f} {result['p99']:>8.2f} {result['rate']:>10.0f}")
+    await pooled.aclose()
+
+    channel = UpstreamChannel(f"ws://127.0.0.1:{port}/ws/gateway")
+    await channel.start()
+    await asyncio.wait_for(channel.connected.wait(), 5)
+    result = await run(channel.request)
+    print(f"{'persistent channel':<26} {result['p50']:>8.2f} {result['p99']:>8.2f} {result['rate']:>10.0f}")
+    await channel.close()
+
+    print("=" * 64)
+    server.should_exit = True
+    await server_task
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Upstream Client Pool Benchmark
+Compares a fresh httpx.AsyncClient per request with the gateway's pooled
+UpstreamClientRegistry against a local stub upstream
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../services/api-gateway/src'))
+
+from utils.upstream import UpstreamClientRegistry
+
+REQUESTS = 2_000
+CONCURRENCY = 50
+RESPONSE_BODY = b'{"success": true, "data": {"memories": []}}'
+
+async def handle_stub_connection(reader, writer):
+    """Minimal keep-alive HTTP/1.1 upstream that answers every request with JSON"""
+    try:
+        while True:
+            request = await reader.readuntil(b"\r\n\r\n")
+            if not request:
+                break
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: application/json\r\n"
+                b"Content-Length: " + str(len(RESPONSE_BODY)).encode() + b"\r\n\r\n" + RESPONSE_BODY
+            )
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionResetError):
+        pass
+    finally:
+        writer.close()
+
+async def run(url, get_client, release_client):
+    """Issue REQUESTS GETs with bounded concurrency; return (req/s, p99 ms)"""
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    latencies = []
+
+    async def one_request():
+        async with semaphore:
+            start = time.perf_counter()
+            client = get_client()
+            try:
+                response = await client.get(url)
+                response.raise_for_status()
+            finally:
+                await release_client(client)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one_request() for _ in range(REQUESTS)])
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return REQUESTS / elapsed, latencies[int(len(latencies) * 0.99)] * 1000
+
+async def main():
+    connections = 0
+
+    async def counting_handler(reader, writer):
+        nonlocal connections
+        connections += 1
+        await handle_stub_connection(reader, writer)
+
+    server = await asyncio.start_server(counting_handler, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{port}/recent/user-1"
+
+    print("🔌 UPSTREAM CLIENT POOL BENCHMARK")
+    print("=" * 50)
+
+    async def close_client(client):
+        await client.aclose()
+
+    async def keep_client(client):
+        pass
+
+    per_request = await run(url, httpx.AsyncClient, close_client)
+    per_request_connections, connections = connections, 0
+
+    registry = UpstreamClientRegistry()
+    pooled = await run(url, lambda: registry.get("memory"), keep_client)
+    pool_stats = registry.pool_stats()["memory"]
+    await registry.close()
+
+    print(f"{'mode':<14} {'req/s':>10} {'p99 (ms)':>10} {'TCP conns':>10}")
+    print(f"{'per-request':<14} {per_request[0]:>10,.0f} {per_request[1]:>10.2f} {per_request_connections:>10}")
+    print(f"{'pooled':<14} {pooled[0]:>10,.0f} {pooled[1]:>10.2f} {connections:>10}")
+    print(f"Pool after run: {pool_stats}")
+    print("=" * 50)
+
+    server.close()
+    await server.wait_closed()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -14,7 +14,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 import httpx
 
 # Add shared modules to path
@@ -29,23 +29,22 @@ from shared.models import (
     LimbicState, LimbicResponse, MemoryResponse, AgencyResponse
 )
 from middleware.auth import auth_middleware, get_current_user
-from middleware.rate_limit import rate_limit_middleware
-from routes import auth, limbic, memory, agency, communication
+from middleware.rate_limit import rate_limit_middleware, init_rate_limiter, close_rate_limiter
+from middleware.metrics import HTTPMetrics, MetricsMiddleware, parse_buckets
+from routes import auth, limbic, memory, agency, communication, ai
+from utils.upstream import UpstreamClientRegistry, UpstreamPoolCollector
 
 # Setup logging
 logger = setup_logging("api-gateway")
 structured_logger = StructuredLogger("api-gateway")
 
 import prometheus_client
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
 
 # Create a new registry for this instance
 REGISTRY = prometheus_client.CollectorRegistry()
 
 # Metrics with custom registry
-REQUEST_COUNT = Counter('http_requests_total', 'Total HTTP requests', ['method', 'endpoint', 'status'], registry=REGISTRY)
-REQUEST_DURATION = Histogram('http_request_duration_seconds', 'HTTP request duration', registry=REGISTRY)
-ACTIVE_CONNECTIONS = Counter('active_connections', 'Active connections', registry=REGISTRY)
+HTTP_METRICS = HTTPMetrics(REGISTRY, parse_buckets(settings.METRICS_LATENCY_BUCKETS))
 
 # Service registry
 SERVICE_URLS = {
@@ -57,22 +56,26 @@ SERVICE_URLS = {
     "sensor": f"http://localhost:{settings.PORT + 6}",
 }
 
-# HTTP client for service communication
-http_client = None
+# Pooled HTTP clients for service communication, shared by all routes
+upstreams = UpstreamClientRegistry()
+REGISTRY.register(UpstreamPoolCollector(upstreams))
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
-    global http_client
-    
     # Startup
     logger.info("Starting Sallie API Gateway...")
     
-    # Initialize HTTP client
-    http_client = httpx.AsyncClient(
-        timeout=httpx.Timeout(30.0),
-        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
-    )
+    # Expose upstream clients to route dependencies
+    app.state.upstreams = upstreams
+    
+    # One persistent channel per worker carries every client websocket's frames
+    app.state.communication_channel = communication.create_channel()
+    if app.state.communication_channel is not None:
+        await app.state.communication_channel.start()
+    
+    # Connect the rate limiter to Redis and load its script
+    await init_rate_limiter()
     
     # Health check for services
     await health_check_services()
@@ -83,8 +86,10 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down API Gateway...")
-    if http_client:
-        await http_client.aclose()
+    await close_rate_limiter()
+    if app.state.communication_channel is not None:
+        await app.state.communication_channel.close()
+    await upstreams.close()
     logger.info("API Gateway shutdown complete")
 
 # Create FastAPI app
@@ -107,55 +112,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Custom middleware for logging and metrics
-@app.middleware("http")
-async def logging_middleware(request: Request, call_next):
-    """Middleware for request logging and metrics"""
-    start_time = time.time()
-    
-    # Increment active connections
-    ACTIVE_CONNECTIONS.inc()
-    
-    try:
-        response = await call_next(request)
-        duration = time.time() - start_time
-        
-        # Log request
-        structured_logger.log_request(
-            method=request.method,
-            path=request.url.path,
-            status_code=response.status_code,
-            duration=duration
-        )
-        
-        # Update metrics
-        REQUEST_COUNT.labels(
-            method=request.method,
-            endpoint=request.url.path,
-            status=response.status_code
-        ).inc()
-        REQUEST_DURATION.observe(duration)
-        
-        return response
-        
-    except Exception as e:
-        duration = time.time() - start_time
-        structured_logger.log_error(e, {
-            "method": request.method,
-            "path": request.url.path,
-            "duration": duration
-        })
-        
-        REQUEST_COUNT.labels(
-            method=request.method,
-            endpoint=request.url.path,
-            status=500
-        ).inc()
-        
-        raise
-    finally:
-        # Decrement active connections
-        ACTIVE_CONNECTIONS.dec()
+# Request logging and metrics
+app.add_middleware(MetricsMiddleware, metrics=HTTP_METRICS, structured_logger=structured_logger)
 
 # Rate limiting middleware
 app.middleware("http")(rate_limit_middleware)
@@ -169,6 +127,7 @@ app.include_router(limbic.router, prefix="/api/limbic", tags=["limbic"])
 app.include_router(memory.router, prefix="/api/memory", tags=["memory"])
 app.include_router(agency.router, prefix="/api/agency", tags=["agency"])
 app.include_router(communication.router, prefix="/api/communication", tags=["communication"])
+app.include_router(ai.router, prefix="/api/ai", tags=["ai"])
 
 # Health endpoints
 @app.get("/health", response_model=HealthCheck)
@@ -192,7 +151,7 @@ async def health_check_services():
     
     for service_name, url in SERVICE_URLS.items():
         try:
-            response = await http_client.get(f"{url}/health", timeout=5.0)
+            response = await upstreams.get(service_name).get(f"{url}/health", timeout=5.0)
             service_status[service_name] = "healthy" if response.status_code == 200 else "unhealthy"
         except Exception as e:
             logger.warning(f"Service {service_name} health check failed: {e}")
@@ -207,6 +166,7 @@ async def proxy_request(service_name: str, path: str, method: str, headers: Dict
         raise HTTPException(status_code=404, detail=f"Service {service_name} not found")
     
     url = f"{service_url}{path}"
+    http_client = upstreams.get(service_name)
     
     try:
         if method.upper() == "GET":
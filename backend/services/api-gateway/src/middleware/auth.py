@@ -2,9 +2,12 @@
 Authentication middleware for API Gateway
 """
 
+import hashlib
+import time
 import jwt
+from collections import OrderedDict
 from datetime import datetime, timezone
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from fastapi import Request, HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import httpx
@@ -20,12 +23,59 @@ from shared.models import UserResponse, TrustTier
 # JWT security
 security = HTTPBearer()
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> UserResponse:
-    """Get current user from JWT token"""
+class VerifiedTokenCache:
+    """LRU of verified tokens, keyed by SHA-256 digest so raw tokens aren't kept
+
+    An entry lives for ``ttl`` seconds but never past the token's own ``exp``.
+    Only successful verifications are cached.
+    """
+    
+    def __init__(self, max_entries: int = settings.AUTH_TOKEN_CACHE_SIZE, ttl: float = settings.AUTH_TOKEN_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: OrderedDict[bytes, Tuple[UserResponse, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+    
+    def get(self, token: str) -> Optional[UserResponse]:
+        key = self.digest(token)
+        entry = self.entries.get(key)
+        if entry is None or entry[1] <= time.time():
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+    
+    def put(self, token: str, user: UserResponse, exp: Optional[float]):
+        expires_at = time.time() + self.ttl
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+        self.entries[self.digest(token)] = (user, expires_at)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+    
+    def clear(self):
+        self.entries.clear()
+
+token_cache = VerifiedTokenCache()
+
+def verify_token(token: str) -> UserResponse:
+    """Verify a JWT and build its principal, at most once per token while cached"""
+    user = token_cache.get(token)
+    if user is not None:
+        return user
+    
     try:
         # Decode JWT token
         payload = jwt.decode(
-            credentials.credentials,
+            token,
             settings.JWT_SECRET_KEY,
             algorithms=[settings.JWT_ALGORITHM]
         )
@@ -44,30 +94,46 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         if not user_id or not email:
             raise HTTPException(status_code=401, detail="Invalid token")
         
-        return UserResponse(
+        user = UserResponse(
             id=user_id,
             email=email,
             name=name,
             trust_tier=TrustTier(trust_tier)
         )
         
+    except HTTPException:
+        raise
     except jwt.InvalidTokenError as e:
         raise HTTPException(status_code=401, detail=f"Invalid token: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=401, detail=f"Authentication error: {str(e)}")
+    
+    token_cache.put(token, user, exp)
+    return user
+
+async def get_current_user(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> UserResponse:
+    """Get current user from JWT token"""
+    # auth_middleware has already verified this request's token
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
+    return verify_token(credentials.credentials)
 
 async def get_optional_user(request: Request) -> Optional[UserResponse]:
     """Get optional user from request (doesn't raise exception)"""
+    if hasattr(request.state, "user"):
+        return request.state.user
+    
     try:
         authorization = request.headers.get('authorization')
         if not authorization:
             return None
         
-        # Create credentials object
         if authorization.startswith('Bearer '):
-            token = authorization[7:]
-            credentials = HTTPAuthorizationCredentials(scheme='Bearer', credentials=token)
-            return await get_current_user(credentials)
+            return verify_token(authorization[7:])
         
         return None
         
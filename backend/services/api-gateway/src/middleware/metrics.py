@@ -0,0 +1,170 @@
+"""
+Request metrics middleware for API Gateway
+"""
+
+import time
+from typing import Dict, Optional, Tuple
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+from starlette.routing import WebSocketRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Add shared modules to path
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+from shared.config import settings
+from shared.logging import StructuredLogger
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+KNOWN_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+UNMATCHED_ROUTE = "<unmatched>"
+OVERFLOW_ROUTE = "<other>"
+
+def parse_buckets(value: str) -> Tuple[float, ...]:
+    """Parse comma-separated histogram bucket bounds from config"""
+    buckets = sorted(float(bound) for bound in value.split(",") if bound.strip())
+    return tuple(buckets) or DEFAULT_LATENCY_BUCKETS
+
+class HTTPMetrics:
+    """Request count, latency and in-flight series, labelled by route template"""
+
+    def __init__(self, registry: CollectorRegistry, buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        self.requests = Counter(
+            'http_requests_total',
+            'Total HTTP requests',
+            ['method', 'route', 'status_code'],
+            registry=registry
+        )
+        self.duration = Histogram(
+            'http_request_duration_seconds',
+            'HTTP request duration in seconds',
+            ['method', 'route'],
+            buckets=buckets,
+            registry=registry
+        )
+        self.in_progress = Gauge(
+            'http_requests_in_progress',
+            'HTTP requests currently being handled',
+            ['method', 'route'],
+            registry=registry
+        )
+
+class MetricsMiddleware:
+    """Pure ASGI middleware that records request metrics and logs each request
+
+    Series are labelled with the matched route's path template rather than the
+    raw path, so ids in paths don't mint new series. Unmatched paths share one
+    label, and once ``max_routes`` distinct templates have been seen any further
+    ones share another. Label children are cached, so a request costs a route
+    match and a handful of metric updates.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        metrics: HTTPMetrics,
+        structured_logger: Optional[StructuredLogger] = None,
+        max_routes: int = settings.METRICS_MAX_ROUTES
+    ):
+        self.app = app
+        self.metrics = metrics
+        self.structured_logger = structured_logger
+        self.max_routes = max_routes
+        self.routes: set = set()
+        self.children: Dict[Tuple[str, str], Tuple[Gauge, Histogram]] = {}
+        self.counters: Dict[Tuple[str, str, int], Counter] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"] if scope["method"] in KNOWN_METHODS else "OTHER"
+        route = self._route_label(scope)
+        in_progress, duration = self._children(method, route)
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress.inc()
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            if self.structured_logger:
+                self.structured_logger.log_error(e, {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "duration": time.perf_counter() - start_time
+                })
+            raise
+        finally:
+            elapsed = time.perf_counter() - start_time
+            duration.observe(elapsed)
+            in_progress.dec()
+            self._counter(method, route, status_code).inc()
+
+        if self.structured_logger:
+            self.structured_logger.log_request(
+                method=scope["method"],
+                path=scope["path"],
+                status_code=status_code,
+                duration=elapsed
+            )
+
+    def _route_label(self, scope: Scope) -> str:
+        template = self._match(scope)
+        if template is None:
+            return UNMATCHED_ROUTE
+        if template not in self.routes:
+            if len(self.routes) >= self.max_routes:
+                return OVERFLOW_ROUTE
+            self.routes.add(template)
+        return template
+
+    @staticmethod
+    def _match(scope: Scope) -> Optional[str]:
+        """Path template of the route the router will dispatch to, if any"""
+        router = getattr(scope.get("app"), "router", None)
+        if router is None:
+            return None
+        # Same outcome as route.matches() without building a child scope per route
+        path, method = scope["path"], scope["method"]
+        partial = None
+        for route in router.routes:
+            path_regex = getattr(route, "path_regex", None)
+            if path_regex is None or isinstance(route, WebSocketRoute) or not path_regex.match(path):
+                continue
+            methods = getattr(route, "methods", None)
+            if methods is None or method in methods:
+                return route.path_format
+            if partial is None:
+                # Path matched but not the method; the router answers 405
+                partial = route.path_format
+        return partial
+
+    def _children(self, method: str, route: str) -> Tuple[Gauge, Histogram]:
+        key = (method, route)
+        children = self.children.get(key)
+        if children is None:
+            children = (
+                self.metrics.in_progress.labels(method, route),
+                self.metrics.duration.labels(method, route)
+            )
+            self.children[key] = children
+        return children
+
+    def _counter(self, method: str, route: str, status_code: int) -> Counter:
+        key = (method, route, status_code)
+        counter = self.counters.get(key)
+        if counter is None:
+            counter = self.metrics.requests.labels(method, route, str(status_code))
+            self.counters[key] = counter
+        return counter
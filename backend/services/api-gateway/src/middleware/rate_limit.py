@@ -4,8 +4,9 @@ Rate limiting middleware for API Gateway
 
 import time
 import asyncio
-from typing import Dict, Optional
-from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from collections import OrderedDict, defaultdict, deque
 from fastapi import Request, HTTPException
 import redis.asyncio as redis
 
@@ -108,9 +109,318 @@ class RedisRateLimiter:
             print(f"Rate limiter error: {e}")
             return True
 
+def gcra_parameters(limit: int, window: int) -> tuple:
+    """Emission interval and burst tolerance for `limit` requests per `window`"""
+    emission_interval = window / limit
+    return emission_interval, window - emission_interval
+
+# In-memory GCRA rate limiter (fallback)
+class MemoryGCRARateLimiter:
+    """In-memory rate limiter using GCRA (generic cell rate algorithm)
+    
+    Stores one theoretical arrival time (TAT) per key instead of a timestamp
+    per request, so memory stays constant regardless of the limit. A key whose
+    TAT has passed is indistinguishable from a new key, so idle keys are
+    dropped from the front of the recency-ordered table as requests arrive.
+    """
+    
+    def __init__(self, idle_sweep: int = settings.RATE_LIMIT_IDLE_SWEEP):
+        self.tats: "OrderedDict[str, float]" = OrderedDict()
+        self.idle_sweep = idle_sweep
+    
+    async def is_allowed(
+        self,
+        key: str,
+        limit: int,
+        window: int,
+        current_time: Optional[float] = None
+    ) -> bool:
+        """Check if request is allowed"""
+        if current_time is None:
+            current_time = time.time()
+        
+        # No awaits below, so the check-and-set is atomic on the event loop
+        self._expire_idle(current_time)
+        
+        emission_interval, tolerance = gcra_parameters(limit, window)
+        tat = max(self.tats.get(key, current_time), current_time)
+        
+        if tat - tolerance > current_time:
+            return False
+        
+        self.tats[key] = tat + emission_interval
+        self.tats.move_to_end(key)
+        return True
+    
+    def _expire_idle(self, current_time: float):
+        """Drop a bounded number of least recently updated keys that are idle"""
+        for _ in range(self.idle_sweep):
+            if not self.tats:
+                return
+            key, tat = next(iter(self.tats.items()))
+            if tat > current_time:
+                return
+            del self.tats[key]
+
+# Redis-based GCRA rate limiter
+class RedisGCRARateLimiter:
+    """Redis-based rate limiter using GCRA
+    
+    Keeps a single float per key. The Lua script is loaded once with
+    SCRIPT LOAD and then invoked by SHA; redis-py reloads it transparently
+    if Redis was restarted and lost its script cache.
+    """
+    
+    LUA_SCRIPT = """
+    local key = KEYS[1]
+    local current_time = tonumber(ARGV[1])
+    local emission_interval = tonumber(ARGV[2])
+    local tolerance = tonumber(ARGV[3])
+    
+    local tat = tonumber(redis.call('GET', key)) or current_time
+    if tat < current_time then
+        tat = current_time
+    end
+    
+    -- Too early: the request would exceed the burst tolerance
+    if tat - tolerance > current_time then
+        return 0
+    end
+    
+    local new_tat = tat + emission_interval
+    redis.call('SET', key, new_tat, 'PX', math.ceil((new_tat - current_time) * 1000))
+    return 1
+    """
+    
+    def __init__(self, redis_client: redis.Redis):
+        self.redis = redis_client
+        self.script = redis_client.register_script(self.LUA_SCRIPT)
+    
+    async def load(self):
+        """Pre-register the script so requests only send its SHA"""
+        await self.redis.script_load(self.LUA_SCRIPT)
+    
+    async def is_allowed(
+        self,
+        key: str,
+        limit: int,
+        window: int,
+        current_time: Optional[float] = None
+    ) -> bool:
+        """Check if request is allowed using the GCRA script"""
+        if current_time is None:
+            current_time = time.time()
+        
+        emission_interval, tolerance = gcra_parameters(limit, window)
+        
+        try:
+            result = await self.script(
+                keys=[f"rate_limit:gcra:{key}"],
+                args=[current_time, emission_interval, tolerance]
+            )
+            
+            return bool(result)
+            
+        except Exception as e:
+            # Fallback to allowing request if Redis fails
+            print(f"Rate limiter error: {e}")
+            return True
+
+@dataclass
+class QuotaLease:
+    """Locally admitted slice of a key's quota for one fixed window"""
+    window_start: float
+    window: int
+    limit: int
+    allowance: int
+    pending: int = 0
+    refill: Optional[asyncio.Future] = None
+
+# Hybrid local-first rate limiter
+class HybridRateLimiter:
+    """Local-first rate limiter that reconciles with Redis in the background
+    
+    Each replica admits requests against a locally leased allowance of at
+    most ``lease_size`` per key and fixed window, with no Redis round-trip.
+    When a lease runs dry (or a key is first seen in a window) the request
+    waits for one refill call that reports the lease's counts and sizes the
+    next lease from the global total; concurrent requests share that call.
+    A background task also pushes consumed counts to Redis every
+    ``sync_interval`` seconds in a single script call. The limit is
+    approximate: replicas can overshoot by up to one lease each per sync.
+    If Redis fails, requests are allowed, like the other Redis limiters.
+    """
+    
+    SYNC_SCRIPT = """
+    local totals = {}
+    
+    for i, key in ipairs(KEYS) do
+        totals[i] = redis.call('INCRBY', key, tonumber(ARGV[2 * i - 1]))
+        if redis.call('TTL', key) < 0 then
+            redis.call('EXPIRE', key, tonumber(ARGV[2 * i]))
+        end
+    end
+    
+    return totals
+    """
+    
+    SYNC_BATCH_SIZE = 500
+    
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        lease_size: int = settings.RATE_LIMIT_LEASE_SIZE,
+        sync_interval: float = settings.RATE_LIMIT_SYNC_INTERVAL
+    ):
+        self.redis = redis_client
+        self.lease_size = lease_size
+        self.sync_interval = sync_interval
+        self.leases: Dict[str, QuotaLease] = {}
+        self.closed_windows: List[tuple] = []
+        self.script = redis_client.register_script(self.SYNC_SCRIPT)
+        self.sync_task: Optional[asyncio.Task] = None
+    
+    async def start(self):
+        """Load the sync script and start background reconciliation"""
+        await self.redis.script_load(self.SYNC_SCRIPT)
+        self.sync_task = asyncio.create_task(self._sync_loop())
+    
+    async def stop(self):
+        """Stop background reconciliation and flush pending counts"""
+        if self.sync_task:
+            self.sync_task.cancel()
+            try:
+                await self.sync_task
+            except asyncio.CancelledError:
+                pass
+        await self.sync()
+    
+    async def is_allowed(
+        self,
+        key: str,
+        limit: int,
+        window: int,
+        current_time: Optional[float] = None
+    ) -> bool:
+        """Check if request is allowed against the local lease"""
+        if current_time is None:
+            current_time = time.time()
+        
+        window_start = current_time - current_time % window
+        lease = self.leases.get(key)
+        
+        if lease is None or lease.window_start != window_start:
+            if lease is not None and lease.pending:
+                # The previous window's counts still need to reach Redis
+                self.closed_windows.append((key, lease))
+            # Starts empty so the first request checks the global count
+            lease = QuotaLease(window_start, window, limit, 0)
+            self.leases[key] = lease
+        
+        while lease.allowance <= 0:
+            if lease.refill is None:
+                lease.refill = asyncio.ensure_future(self._refill(key, lease))
+            if not await asyncio.shield(lease.refill):
+                return False
+        
+        lease.allowance -= 1
+        lease.pending += 1
+        return True
+    
+    async def _refill(self, key: str, lease: QuotaLease) -> bool:
+        """Report a lease's counts and size its next allowance from the global total
+        
+        Returns False only when the global limit for the window is reached.
+        """
+        pending = lease.pending
+        lease.pending -= pending
+        try:
+            totals = await self.script(
+                keys=[self._redis_key(key, lease)],
+                args=[pending, lease.window * 2]
+            )
+        except Exception as e:
+            self._requeue([(key, lease, pending, True)])
+            # Fallback to allowing requests if Redis fails; retried after another lease
+            print(f"Rate limiter error: {e}")
+            lease.allowance = self.lease_size
+            return True
+        finally:
+            lease.refill = None
+        
+        remaining = lease.limit - int(totals[0]) - lease.pending
+        lease.allowance = max(0, min(self.lease_size, remaining))
+        return remaining > 0
+    
+    @staticmethod
+    def _redis_key(key: str, lease: QuotaLease) -> str:
+        return f"rate_limit:hybrid:{key}:{int(lease.window_start)}"
+    
+    def _requeue(self, unsent: List[tuple]):
+        """Return unsent counts to their leases for the next sync"""
+        requeued = {id(lease) for _, lease in self.closed_windows}
+        for key, lease, pending, live in unsent:
+            lease.pending += pending
+            # A live lease may have rolled over while the script ran
+            if id(lease) not in requeued and (not live or self.leases.get(key) is not lease):
+                self.closed_windows.append((key, lease))
+    
+    async def _sync_loop(self):
+        """Reconcile on every interval"""
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except Exception as e:
+                # Unsynced counts are kept and retried on the next pass
+                print(f"Rate limiter sync error: {e}")
+    
+    async def sync(self):
+        """Push pending counts to Redis and resize leases from global totals"""
+        current_time = time.time()
+        
+        # Closed windows only report their counts; live leases are also resized
+        batch = [(key, lease, lease.pending, False) for key, lease in self.closed_windows]
+        self.closed_windows = []
+        for key, lease in list(self.leases.items()):
+            if lease.window_start + lease.window <= current_time and not lease.pending:
+                # Window is over and fully reported: drop idle state
+                del self.leases[key]
+                continue
+            if not lease.pending:
+                # Nothing new to report; exhaustion is handled by _refill
+                continue
+            batch.append((key, lease, lease.pending, True))
+        
+        for _, lease, pending, _ in batch:
+            lease.pending -= pending
+        
+        for start in range(0, len(batch), self.SYNC_BATCH_SIZE):
+            chunk = batch[start:start + self.SYNC_BATCH_SIZE]
+            args = []
+            for _, lease, pending, _ in chunk:
+                args.extend([pending, lease.window * 2])
+            
+            try:
+                totals = await self.script(
+                    keys=[self._redis_key(key, lease) for key, lease, _, _ in chunk],
+                    args=args
+                )
+            except Exception:
+                self._requeue(batch[start:])
+                raise
+            
+            for (_, lease, _, live), total in zip(chunk, totals):
+                if live:
+                    remaining = lease.limit - int(total) - lease.pending
+                    lease.allowance = max(0, min(self.lease_size, remaining))
+
 # Global rate limiter instances
-memory_limiter = MemoryRateLimiter()
-redis_limiter: Optional[RedisRateLimiter] = None
+if settings.RATE_LIMIT_ALGORITHM == "sliding_window":
+    memory_limiter = MemoryRateLimiter()
+else:
+    memory_limiter = MemoryGCRARateLimiter()
+redis_limiter = None
 
 async def init_rate_limiter():
     """Initialize rate limiter"""
@@ -120,12 +430,24 @@ async def init_rate_limiter():
         # Try to connect to Redis
         redis_client = redis.from_url(settings.REDIS_URL)
         await redis_client.ping()
-        redis_limiter = RedisRateLimiter(redis_client)
+        if settings.RATE_LIMIT_MODE == "hybrid":
+            redis_limiter = HybridRateLimiter(redis_client)
+            await redis_limiter.start()
+        elif settings.RATE_LIMIT_ALGORITHM == "sliding_window":
+            redis_limiter = RedisRateLimiter(redis_client)
+        else:
+            redis_limiter = RedisGCRARateLimiter(redis_client)
+            await redis_limiter.load()
         print("Rate limiter initialized with Redis")
     except Exception as e:
         print(f"Redis not available, using memory rate limiter: {e}")
         redis_limiter = None
 
+async def close_rate_limiter():
+    """Flush any locally buffered rate limit state"""
+    if isinstance(redis_limiter, HybridRateLimiter):
+        await redis_limiter.stop()
+
 def get_client_ip(request: Request) -> str:
     """Get client IP address"""
     # Check for forwarded headers
@@ -0,0 +1,90 @@
+"""
+AI service routes for API Gateway
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import httpx
+import json
+
+# Add shared modules to path
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+from shared.config import SERVICE_URLS
+from shared.models import UserResponse
+from utils.upstream import upstream_client
+from middleware.auth import get_current_user
+
+router = APIRouter()
+
+# Headers that must reach the client unbuffered for server-sent events.
+# Content-Encoding: identity also keeps GZipMiddleware from holding chunks back.
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+    "Content-Encoding": "identity"
+}
+
+# Tokens may be minutes apart on long generations, so only streamed chats
+# wait on reads indefinitely; everything else keeps the pool's timeout
+STREAM_TIMEOUT = httpx.Timeout(10.0, read=None)
+
+def wants_stream(body: bytes) -> bool:
+    """Whether a chat request body asks for server-sent events"""
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return False
+    return isinstance(payload, dict) and bool(payload.get("stream"))
+
+@router.post("/chat")
+async def chat(
+    request: Request,
+    current_user: UserResponse = Depends(get_current_user),
+    client: httpx.AsyncClient = Depends(upstream_client("ai"))
+):
+    """Chat with the AI service; relays token events as they arrive when "stream" is set"""
+    body = await request.body()
+    upstream_request = client.build_request(
+        "POST",
+        f"{SERVICE_URLS['ai']}/api/v1/ai/chat",
+        content=body,
+        headers={
+            "Authorization": request.headers.get("Authorization", ""),
+            "Content-Type": "application/json"
+        },
+        timeout=STREAM_TIMEOUT if wants_stream(body) else httpx.USE_CLIENT_DEFAULT
+    )
+
+    try:
+        response = await client.send(upstream_request, stream=True)
+    except httpx.RequestError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"AI service unavailable: {str(e)}"
+        )
+
+    if response.headers.get("content-type", "").startswith("text/event-stream"):
+        async def relay():
+            try:
+                async for chunk in response.aiter_raw():
+                    yield chunk
+            finally:
+                await response.aclose()
+
+        return StreamingResponse(relay(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+    try:
+        await response.aread()
+    finally:
+        await response.aclose()
+
+    if response.status_code != 200:
+        raise HTTPException(
+            status_code=response.status_code,
+            detail=response.json().get("detail", "Chat request failed")
+        )
+
+    return JSONResponse(content=response.json())
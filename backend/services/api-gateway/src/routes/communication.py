@@ -2,10 +2,11 @@
 Communication service routes for API Gateway
 """
 
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.responses import StreamingResponse
 import httpx
 import json
+import asyncio
 from typing import Optional, List
 
 # Add shared modules to path
@@ -13,11 +14,13 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
 
-from shared.config import SERVICE_URLS
+from shared.config import SERVICE_URLS, settings
 from shared.models import (
     MessageCreate, MessageResponse, WebSocketMessage,
     APIResponse, UserResponse, CommunicationType
 )
+from utils.upstream import upstream_client
+from utils.upstream_channel import ChannelUnavailable, UpstreamChannel
 from middleware.auth import get_current_user, get_optional_user
 
 router = APIRouter()
@@ -45,74 +48,106 @@ class ConnectionManager:
 
 manager = ConnectionManager()
 
+def create_channel() -> Optional[UpstreamChannel]:
+    """Persistent channel to the communication service, unless disabled in config"""
+    if not settings.COMMUNICATION_CHANNEL_PATH:
+        return None
+    base_url = SERVICE_URLS['communication'].replace("http", "ws", 1)
+    return UpstreamChannel(f"{base_url}{settings.COMMUNICATION_CHANNEL_PATH}")
+
+async def forward_websocket_message(
+    payload: dict,
+    user_id: str,
+    channel: Optional[UpstreamChannel],
+    client: httpx.AsyncClient
+) -> tuple:
+    """Send a frame over the persistent channel, or POST it while the channel is down"""
+    if channel is not None and channel.available:
+        try:
+            return await channel.request(user_id, payload)
+        except ChannelUnavailable:
+            pass
+    
+    response = await client.post(
+        f"{SERVICE_URLS['communication']}/websocket-message",
+        json={**payload, "user_id": user_id},
+        timeout=10.0
+    )
+    return response.status_code, response.text
+
 @router.post("/message", response_model=MessageResponse)
 async def send_message(
     message: MessageCreate,
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user),
+    client: httpx.AsyncClient = Depends(upstream_client("communication"))
 ):
     """Send a message and get response"""
     # Set user_id from authenticated user
     message.user_id = current_user.id
     
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{SERVICE_URLS['communication']}/message",
-                json=message.dict(),
-                timeout=30.0  # Longer timeout for AI response
-            )
-            
-            if response.status_code == 200:
-                return MessageResponse(**response.json())
-            else:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=response.json().get("error", "Message processing failed")
-                )
-                
-        except httpx.RequestError as e:
+    try:
+        response = await client.post(
+            f"{SERVICE_URLS['communication']}/message",
+            json=message.dict(),
+            timeout=30.0  # Longer timeout for AI response
+        )
+        
+        if response.status_code == 200:
+            return MessageResponse(**response.json())
+        else:
             raise HTTPException(
-                status_code=503,
-                detail=f"Communication service unavailable: {str(e)}"
+                status_code=response.status_code,
+                detail=response.json().get("error", "Message processing failed")
             )
+            
+    except httpx.RequestError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Communication service unavailable: {str(e)}"
+        )
 
 @router.get("/messages", response_model=APIResponse)
 async def get_message_history(
     limit: int = 50,
     before: Optional[str] = None,
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user),
+    client: httpx.AsyncClient = Depends(upstream_client("communication"))
 ):
     """Get message history for user"""
     params = {"limit": limit}
     if before:
         params["before"] = before
     
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{SERVICE_URLS['communication']}/messages/{current_user.id}",
-                params=params,
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                return APIResponse(**response.json())
-            else:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=response.json().get("error", "Failed to get message history")
-                )
-                
-        except httpx.RequestError as e:
+    try:
+        response = await client.get(
+            f"{SERVICE_URLS['communication']}/messages/{current_user.id}",
+            params=params,
+            timeout=10.0
+        )
+        
+        if response.status_code == 200:
+            return APIResponse(**response.json())
+        else:
             raise HTTPException(
-                status_code=503,
-                detail=f"Communication service unavailable: {str(e)}"
+                status_code=response.status_code,
+                detail=response.json().get("error", "Failed to get message history")
             )
+            
+    except httpx.RequestError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Communication service unavailable: {str(e)}"
+        )
 
 @router.websocket("/ws/{user_id}")
-async def websocket_endpoint(websocket: WebSocket, user_id: str):
+async def websocket_endpoint(
+    websocket: WebSocket,
+    user_id: str,
+    client: httpx.AsyncClient = Depends(upstream_client("communication"))
+):
     """WebSocket endpoint for real-time communication"""
     await manager.connect(websocket, user_id)
+    channel = getattr(websocket.app.state, "communication_channel", None)
     
     try:
         while True:
@@ -124,24 +159,25 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
                 message = WebSocketMessage(**message_data)
                 
                 # Forward to communication service
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(
-                        f"{SERVICE_URLS['communication']}/websocket-message",
-                        json={**message.dict(), "user_id": user_id},
-                        timeout=10.0
-                    )
+                status_code, body = await forward_websocket_message(message.dict(), user_id, channel, client)
+                
+                if status_code == 200:
+                    # Send response back to client
+                    await websocket.send_text(body)
+                else:
+                    error_response = {
+                        "type": "error",
+                        "content": "Message processing failed",
+                        "error": json.loads(body).get("error", "Unknown error")
+                    }
+                    await websocket.send_text(json.dumps(error_response))
                     
-                    if response.status_code == 200:
-                        # Send response back to client
-                        await websocket.send_text(response.text)
-                    else:
-                        error_response = {
-                            "type": "error",
-                            "content": "Message processing failed",
-                            "error": response.json().get("error", "Unknown error")
-                        }
-                        await websocket.send_text(json.dumps(error_response))
-                        
+            except asyncio.TimeoutError:
+                error_response = {
+                    "type": "error",
+                    "content": "Communication service timed out"
+                }
+                await websocket.send_text(json.dumps(error_response))
             except json.JSONDecodeError:
                 error_response = {
                     "type": "error",
@@ -160,128 +196,132 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
 
 @router.post("/voice/transcribe", response_model=APIResponse)
 async def transcribe_audio(
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user),
+    client: httpx.AsyncClient = Depends(upstream_client("communication"))
 ):
     """Transcribe audio input (placeholder for future voice integration)"""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{SERVICE_URLS['communication']}/voice/transcribe",
-                json={"user_id": current_user.id},
-                timeout=15.0
-            )
-            
-            if response.status_code == 200:
-                return APIResponse(**response.json())
-            else:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=response.json().get("error", "Transcription failed")
-                )
-                
-        except httpx.RequestError as e:
+    try:
+        response = await client.post(
+            f"{SERVICE_URLS['communication']}/voice/transcribe",
+            json={"user_id": current_user.id},
+            timeout=15.0
+        )
+        
+        if response.status_code == 200:
+            return APIResponse(**response.json())
+        else:
             raise HTTPException(
-                status_code=503,
-                detail=f"Communication service unavailable: {str(e)}"
+                status_code=response.status_code,
+                detail=response.json().get("error", "Transcription failed")
             )
+            
+    except httpx.RequestError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Communication service unavailable: {str(e)}"
+        )
 
 @router.post("/voice/synthesize", response_model=APIResponse)
 async def synthesize_speech(
     text: str,
     voice_type: str = "default",
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user),
+    client: httpx.AsyncClient = Depends(upstream_client("communication"))
 ):
     """Synthesize speech from text (placeholder for future voice integration)"""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{SERVICE_URLS['communication']}/voice/synthesize",
-                json={
-                    "user_id": current_user.id,
-                    "text": text,
-                    "voice_type": voice_type
-                },
-                timeout=15.0
-            )
-            
-            if response.status_code == 200:
-                return APIResponse(**response.json())
-            else:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=response.json().get("error", "Speech synthesis failed")
-                )
-                
-        except httpx.RequestError as e:
+    try:
+        response = await client.post(
+            f"{SERVICE_URLS['communication']}/voice/synthesize",
+            json={
+                "user_id": current_user.id,
+                "text": text,
+                "voice_type": voice_type
+            },
+            timeout=15.0
+        )
+        
+        if response.status_code == 200:
+            return APIResponse(**response.json())
+        else:
             raise HTTPException(
-                status_code=503,
-                detail=f"Communication service unavailable: {str(e)}"
+                status_code=response.status_code,
+                detail=response.json().get("error", "Speech synthesis failed")
             )
+            
+    except httpx.RequestError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Communication service unavailable: {str(e)}"
+        )
 
 @router.get("/status", response_model=APIResponse)
-async def get_communication_status(current_user: UserResponse = Depends(get_current_user)):
+async def get_communication_status(
+    current_user: UserResponse = Depends(get_current_user),
+    client: httpx.AsyncClient = Depends(upstream_client("communication"))
+):
     """Get communication service status"""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{SERVICE_URLS['communication']}/status/{current_user.id}",
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                return APIResponse(**response.json())
-            else:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=response.json().get("error", "Failed to get status")
-                )
-                
-        except httpx.RequestError as e:
+    try:
+        response = await client.get(
+            f"{SERVICE_URLS['communication']}/status/{current_user.id}",
+            timeout=10.0
+        )
+        
+        if response.status_code == 200:
+            return APIResponse(**response.json())
+        else:
             raise HTTPException(
-                status_code=503,
-                detail=f"Communication service unavailable: {str(e)}"
+                status_code=response.status_code,
+                detail=response.json().get("error", "Failed to get status")
             )
+            
+    except httpx.RequestError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Communication service unavailable: {str(e)}"
+        )
 
 @router.post("/shoulder-tap", response_model=APIResponse)
 async def send_shoulder_tap(
     message: str,
     priority: str = "normal",
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user),
+    client: httpx.AsyncClient = Depends(upstream_client("communication"))
 ):
     """Send a shoulder tap notification (proactive engagement)"""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{SERVICE_URLS['communication']}/shoulder-tap",
-                json={
-                    "user_id": current_user.id,
-                    "message": message,
-                    "priority": priority
-                },
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                return APIResponse(**response.json())
-            else:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=response.json().get("error", "Failed to send shoulder tap")
-                )
-                
-        except httpx.RequestError as e:
+    try:
+        response = await client.post(
+            f"{SERVICE_URLS['communication']}/shoulder-tap",
+            json={
+                "user_id": current_user.id,
+                "message": message,
+                "priority": priority
+            },
+            timeout=10.0
+        )
+        
+        if response.status_code == 200:
+            return APIResponse(**response.json())
+        else:
             raise HTTPException(
-                status_code=503,
-                detail=f"Communication service unavailable: {str(e)}"
+                status_code=response.status_code,
+                detail=response.json().get("error", "Failed to send shoulder tap")
             )
+            
+    except httpx.RequestError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Communication service unavailable: {str(e)}"
+        )
 
 @router.get("/connections", response_model=APIResponse)
-async def get_active_connections():
+async def get_active_connections(request: Request):
     """Get active WebSocket connections (admin endpoint)"""
+    channel = getattr(request.app.state, "communication_channel", None)
     return APIResponse(
         success=True,
         data={
             "active_connections": len(manager.active_connections),
-            "connected_users": list(manager.active_connections.keys())
+            "connected_users": list(manager.active_connections.keys()),
+            "upstream_channel": channel.stats() if channel is not None else None
         }
     )
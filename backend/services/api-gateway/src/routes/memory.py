@@ -3,53 +3,171 @@ Memory service routes for API Gateway
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+import asyncio
 import httpx
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Awaitable, Callable
+from urllib.parse import quote
 
 # Add shared modules to path
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
 
-from shared.config import SERVICE_URLS
+from shared.config import settings, SERVICE_URLS
 from shared.models import (
     MemoryEntry, MemorySearch, MemoryResponse, MemoryType,
     APIResponse, UserResponse
 )
+from utils.upstream import upstream_client
 from middleware.auth import get_current_user, require_trust_tier, TrustTier
 
 router = APIRouter()
 
+# Batch request/response models
+class BatchStoreRequest(BaseModel):
+    memories: List[MemoryEntry]
+
+class BatchGetRequest(BaseModel):
+    memory_ids: List[str]
+
+class BatchItemResult(BaseModel):
+    index: int
+    success: bool
+    status_code: int
+    data: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+class BatchResponse(BaseModel):
+    success: bool
+    results: List[BatchItemResult]
+
 @router.post("/store", response_model=APIResponse)
 async def store_memory(
     memory: MemoryEntry,
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user),
+    client: httpx.AsyncClient = Depends(upstream_client("memory"))
 ):
     """Store a memory entry"""
     # Set user_id from authenticated user
     memory.user_id = current_user.id
     
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{SERVICE_URLS['memory']}/store",
-                json=memory.dict(),
-                timeout=10.0
+    try:
+        response = await client.post(
+            f"{SERVICE_URLS['memory']}/store",
+            json=memory.dict(),
+            timeout=10.0
+        )
+        
+        if response.status_code == 201:
+            return APIResponse(**response.json())
+        else:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=response.json().get("error", "Failed to store memory")
             )
             
-            if response.status_code == 201:
-                return APIResponse(**response.json())
-            else:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=response.json().get("error", "Failed to store memory")
+    except httpx.RequestError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Memory service unavailable: {str(e)}"
+        )
+
+@router.post("/batch/store", response_model=BatchResponse)
+async def batch_store_memories(
+    batch: BatchStoreRequest,
+    current_user: UserResponse = Depends(get_current_user),
+    client: httpx.AsyncClient = Depends(upstream_client("memory"))
+):
+    """Store many memory entries in one round-trip"""
+    _check_batch_size(len(batch.memories))
+    
+    def store_one(memory: MemoryEntry) -> Callable[[], Awaitable[httpx.Response]]:
+        memory.user_id = current_user.id
+        return lambda: client.post(
+            f"{SERVICE_URLS['memory']}/store",
+            json=memory.dict(),
+            timeout=10.0
+        )
+    
+    return await _run_batch([store_one(memory) for memory in batch.memories], success_status=201)
+
+@router.post("/batch/get", response_model=BatchResponse)
+async def batch_get_memories(
+    batch: BatchGetRequest,
+    current_user: UserResponse = Depends(get_current_user),
+    client: httpx.AsyncClient = Depends(upstream_client("memory"))
+):
+    """Get many memories by ID in one round-trip"""
+    _check_batch_size(len(batch.memory_ids))
+    paths = [_memory_path(memory_id) for memory_id in batch.memory_ids]
+    
+    def get_one(path: str) -> Callable[[], Awaitable[httpx.Response]]:
+        return lambda: client.get(
+            f"{SERVICE_URLS['memory']}/{path}",
+            params={"user_id": current_user.id},
+            timeout=10.0
+        )
+    
+    return await _run_batch([get_one(path) for path in paths], success_status=200)
+
+def _memory_path(memory_id: str) -> str:
+    """Escape a body-supplied ID into one path segment of the memory service
+    
+    Unlike the /{memory_id} routes, batch IDs can contain '/' and would
+    otherwise reach other upstream routes such as /stats/{user_id}.
+    """
+    if memory_id in ("", ".", ".."):
+        raise HTTPException(status_code=400, detail=f"Invalid memory ID: {memory_id!r}")
+    return quote(memory_id, safe="")
+
+def _check_batch_size(size: int):
+    """Reject empty batches and batches over the configured limit"""
+    if size == 0:
+        raise HTTPException(status_code=400, detail="Batch must contain at least one operation")
+    if size > settings.BATCH_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch exceeds {settings.BATCH_MAX_OPERATIONS} operations"
+        )
+
+async def _run_batch(
+    operations: List[Callable[[], Awaitable[httpx.Response]]],
+    success_status: int
+) -> BatchResponse:
+    """Run upstream calls concurrently with bounded parallelism, one result per item"""
+    semaphore = asyncio.Semaphore(settings.BATCH_MAX_CONCURRENCY)
+    
+    async def run(index: int, operation: Callable[[], Awaitable[httpx.Response]]) -> BatchItemResult:
+        async with semaphore:
+            try:
+                response = await operation()
+            except httpx.RequestError as e:
+                return BatchItemResult(
+                    index=index,
+                    success=False,
+                    status_code=503,
+                    error=f"Memory service unavailable: {str(e)}"
                 )
-                
-        except httpx.RequestError as e:
-            raise HTTPException(
-                status_code=503,
-                detail=f"Memory service unavailable: {str(e)}"
-            )
+        
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        if not isinstance(body, dict):
+            body = {"data": body}
+        
+        if response.status_code == success_status:
+            return BatchItemResult(index=index, success=True, status_code=response.status_code, data=body)
+        return BatchItemResult(
+            index=index,
+            success=False,
+            status_code=response.status_code,
+            error=body.get("error", "Memory operation failed")
+        )
+    
+    results = await asyncio.gather(*[run(index, operation) for index, operation in enumerate(operations)])
+    return BatchResponse(success=all(result.success for result in results), results=results)
 
 @router.get("/search", response_model=MemoryResponse)
 async def search_memories(
@@ -58,7 +176,8 @@ async def search_memories(
     tags: Optional[List[str]] = Query(None),
     limit: int = Query(10, ge=1, le=100),
     similarity_threshold: float = Query(0.7, ge=0.0, le=1.0),
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user),
+    client: httpx.AsyncClient = Depends(upstream_client("memory"))
 ):
     """Search memories"""
     search_params = {
@@ -72,203 +191,202 @@ async def search_memories(
     if tags:
         search_params["tags"] = tags
     
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{SERVICE_URLS['memory']}/search/{current_user.id}",
-                params=search_params,
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                return MemoryResponse(**response.json())
-            else:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=response.json().get("error", "Search failed")
-                )
-                
-        except httpx.RequestError as e:
+    try:
+        response = await client.get(
+            f"{SERVICE_URLS['memory']}/search/{current_user.id}",
+            params=search_params,
+            timeout=10.0
+        )
+        
+        if response.status_code == 200:
+            return MemoryResponse(**response.json())
+        else:
             raise HTTPException(
-                status_code=503,
-                detail=f"Memory service unavailable: {str(e)}"
+                status_code=response.status_code,
+                detail=response.json().get("error", "Search failed")
             )
+            
+    except httpx.RequestError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Memory service unavailable: {str(e)}"
+        )
 
 @router.get("/recent", response_model=APIResponse)
 async def get_recent_memories(
     memory_type: Optional[MemoryType] = None,
     limit: int = Query(20, ge=1, le=100),
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user),
+    client: httpx.AsyncClient = Depends(upstream_client("memory"))
 ):
     """Get recent memories for user"""
     params = {"limit": limit}
     if memory_type:
         params["memory_type"] = memory_type.value
     
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{SERVICE_URLS['memory']}/recent/{current_user.id}",
-                params=params,
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                return APIResponse(**response.json())
-            else:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=response.json().get("error", "Failed to get recent memories")
-                )
-                
-        except httpx.RequestError as e:
+    try:
+        response = await client.get(
+            f"{SERVICE_URLS['memory']}/recent/{current_user.id}",
+            params=params,
+            timeout=10.0
+        )
+        
+        if response.status_code == 200:
+            return APIResponse(**response.json())
+        else:
             raise HTTPException(
-                status_code=503,
-                detail=f"Memory service unavailable: {str(e)}"
+                status_code=response.status_code,
+                detail=response.json().get("error", "Failed to get recent memories")
             )
+            
+    except httpx.RequestError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Memory service unavailable: {str(e)}"
+        )
 
 @router.get("/{memory_id}", response_model=APIResponse)
 async def get_memory(
     memory_id: str,
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user),
+    client: httpx.AsyncClient = Depends(upstream_client("memory"))
 ):
     """Get specific memory by ID"""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{SERVICE_URLS['memory']}/{memory_id}",
-                params={"user_id": current_user.id},
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                return APIResponse(**response.json())
-            elif response.status_code == 404:
-                raise HTTPException(status_code=404, detail="Memory not found")
-            else:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=response.json().get("error", "Failed to get memory")
-                )
-                
-        except httpx.RequestError as e:
+    try:
+        response = await client.get(
+            f"{SERVICE_URLS['memory']}/{memory_id}",
+            params={"user_id": current_user.id},
+            timeout=10.0
+        )
+        
+        if response.status_code == 200:
+            return APIResponse(**response.json())
+        elif response.status_code == 404:
+            raise HTTPException(status_code=404, detail="Memory not found")
+        else:
             raise HTTPException(
-                status_code=503,
-                detail=f"Memory service unavailable: {str(e)}"
+                status_code=response.status_code,
+                detail=response.json().get("error", "Failed to get memory")
             )
+            
+    except httpx.RequestError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Memory service unavailable: {str(e)}"
+        )
 
 @router.put("/{memory_id}", response_model=APIResponse)
 async def update_memory(
     memory_id: str,
     memory_update: dict,
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user),
+    client: httpx.AsyncClient = Depends(upstream_client("memory"))
 ):
     """Update a memory entry"""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.put(
-                f"{SERVICE_URLS['memory']}/{memory_id}",
-                json={**memory_update, "user_id": current_user.id},
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                return APIResponse(**response.json())
-            elif response.status_code == 404:
-                raise HTTPException(status_code=404, detail="Memory not found")
-            else:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=response.json().get("error", "Failed to update memory")
-                )
-                
-        except httpx.RequestError as e:
+    try:
+        response = await client.put(
+            f"{SERVICE_URLS['memory']}/{memory_id}",
+            json={**memory_update, "user_id": current_user.id},
+            timeout=10.0
+        )
+        
+        if response.status_code == 200:
+            return APIResponse(**response.json())
+        elif response.status_code == 404:
+            raise HTTPException(status_code=404, detail="Memory not found")
+        else:
             raise HTTPException(
-                status_code=503,
-                detail=f"Memory service unavailable: {str(e)}"
+                status_code=response.status_code,
+                detail=response.json().get("error", "Failed to update memory")
             )
+            
+    except httpx.RequestError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Memory service unavailable: {str(e)}"
+        )
 
 @router.delete("/{memory_id}", response_model=APIResponse)
 @require_trust_tier(TrustTier.ASSOCIATE)
 async def delete_memory(
     memory_id: str,
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user),
+    client: httpx.AsyncClient = Depends(upstream_client("memory"))
 ):
     """Delete a memory entry (requires Associate tier or higher)"""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.delete(
-                f"{SERVICE_URLS['memory']}/{memory_id}",
-                params={"user_id": current_user.id},
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                return APIResponse(**response.json())
-            elif response.status_code == 404:
-                raise HTTPException(status_code=404, detail="Memory not found")
-            else:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=response.json().get("error", "Failed to delete memory")
-                )
-                
-        except httpx.RequestError as e:
+    try:
+        response = await client.delete(
+            f"{SERVICE_URLS['memory']}/{memory_id}",
+            params={"user_id": current_user.id},
+            timeout=10.0
+        )
+        
+        if response.status_code == 200:
+            return APIResponse(**response.json())
+        elif response.status_code == 404:
+            raise HTTPException(status_code=404, detail="Memory not found")
+        else:
             raise HTTPException(
-                status_code=503,
-                detail=f"Memory service unavailable: {str(e)}"
+                status_code=response.status_code,
+                detail=response.json().get("error", "Failed to delete memory")
             )
+            
+    except httpx.RequestError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Memory service unavailable: {str(e)}"
+        )
 
 @router.post("/archive", response_model=APIResponse)
 async def archive_old_memories(
     days: int = Query(30, ge=1),
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user),
+    client: httpx.AsyncClient = Depends(upstream_client("memory"))
 ):
     """Archive memories older than specified days"""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{SERVICE_URLS['memory']}/archive/{current_user.id}",
-                params={"days": days},
-                timeout=30.0  # Longer timeout for bulk operation
-            )
-            
-            if response.status_code == 200:
-                return APIResponse(**response.json())
-            else:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=response.json().get("error", "Archive operation failed")
-                )
-                
-        except httpx.RequestError as e:
+    try:
+        response = await client.post(
+            f"{SERVICE_URLS['memory']}/archive/{current_user.id}",
+            params={"days": days},
+            timeout=30.0  # Longer timeout for bulk operation
+        )
+        
+        if response.status_code == 200:
+            return APIResponse(**response.json())
+        else:
             raise HTTPException(
-                status_code=503,
-                detail=f"Memory service unavailable: {str(e)}"
+                status_code=response.status_code,
+                detail=response.json().get("error", "Archive operation failed")
             )
+            
+    except httpx.RequestError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Memory service unavailable: {str(e)}"
+        )
 
 @router.get("/stats/summary", response_model=APIResponse)
 async def get_memory_stats(
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user),
+    client: httpx.AsyncClient = Depends(upstream_client("memory"))
 ):
     """Get memory statistics for user"""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{SERVICE_URLS['memory']}/stats/{current_user.id}",
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                return APIResponse(**response.json())
-            else:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=response.json().get("error", "Failed to get memory stats")
-                )
-                
-        except httpx.RequestError as e:
+    try:
+        response = await client.get(
+            f"{SERVICE_URLS['memory']}/stats/{current_user.id}",
+            timeout=10.0
+        )
+        
+        if response.status_code == 200:
+            return APIResponse(**response.json())
+        else:
             raise HTTPException(
-                status_code=503,
-                detail=f"Memory service unavailable: {str(e)}"
+                status_code=response.status_code,
+                detail=response.json().get("error", "Failed to get memory stats")
             )
+            
+    except httpx.RequestError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Memory service unavailable: {str(e)}"
+        )
@@ -0,0 +1,120 @@
+"""
+Pooled upstream HTTP clients for API Gateway
+"""
+
+import logging
+from typing import Callable, Dict, Iterator
+
+import httpx
+from fastapi.requests import HTTPConnection
+from prometheus_client.core import GaugeMetricFamily
+
+# Add shared modules to path
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+from shared.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+class UpstreamClientRegistry:
+    """One long-lived httpx.AsyncClient per upstream service
+
+    Each service gets its own connection pool so a slow service cannot
+    starve the others of connections, and keep-alive connections are reused
+    across requests instead of being rebuilt for every proxied call.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = settings.UPSTREAM_MAX_CONNECTIONS,
+        max_keepalive_connections: int = settings.UPSTREAM_MAX_KEEPALIVE,
+        keepalive_expiry: float = settings.UPSTREAM_KEEPALIVE_EXPIRY,
+        timeout: float = settings.UPSTREAM_TIMEOUT,
+        http2: bool = settings.UPSTREAM_HTTP2
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(timeout)
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.clients: Dict[str, httpx.AsyncClient] = {}
+        self.transports: Dict[str, httpx.AsyncHTTPTransport] = {}
+
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("h2 not installed - upstream clients will use HTTP/1.1 only")
+
+    def get(self, service_name: str) -> httpx.AsyncClient:
+        """Get the pooled client for a service, creating it on first use"""
+        client = self.clients.get(service_name)
+        if client is None:
+            transport = httpx.AsyncHTTPTransport(http2=self.http2, limits=self.limits)
+            client = httpx.AsyncClient(transport=transport, timeout=self.timeout)
+            self.transports[service_name] = transport
+            self.clients[service_name] = client
+        return client
+
+    def pool_stats(self) -> Dict[str, Dict[str, int]]:
+        """Active and idle connection counts per service"""
+        stats = {}
+        for service_name, transport in self.transports.items():
+            # httpx does not expose its httpcore pool publicly
+            connections = getattr(getattr(transport, "_pool", None), "connections", [])
+            idle = sum(1 for connection in connections if connection.is_idle())
+            stats[service_name] = {
+                "active": len(connections) - idle,
+                "idle": idle,
+                "max": self.limits.max_connections
+            }
+        return stats
+
+    async def close(self):
+        """Close every pooled client"""
+        for service_name, client in self.clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.error(f"Error closing upstream client {service_name}: {e}")
+        self.clients.clear()
+        self.transports.clear()
+
+class UpstreamPoolCollector:
+    """Prometheus collector reporting upstream pool utilization at scrape time"""
+
+    def __init__(self, registry: UpstreamClientRegistry):
+        self.registry = registry
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        connections = GaugeMetricFamily(
+            'upstream_pool_connections',
+            'Upstream HTTP connections by service and state',
+            labels=['service', 'state']
+        )
+        utilization = GaugeMetricFamily(
+            'upstream_pool_utilization_ratio',
+            'Active upstream connections as a fraction of the pool limit',
+            labels=['service']
+        )
+
+        for service_name, stats in self.registry.pool_stats().items():
+            connections.add_metric([service_name, 'active'], stats['active'])
+            connections.add_metric([service_name, 'idle'], stats['idle'])
+            utilization.add_metric([service_name], stats['active'] / max(stats['max'], 1))
+
+        yield connections
+        yield utilization
+
+def upstream_client(service_name: str) -> Callable[[HTTPConnection], httpx.AsyncClient]:
+    """FastAPI dependency returning the pooled client for a service"""
+    def dependency(connection: HTTPConnection) -> httpx.AsyncClient:
+        return connection.app.state.upstreams.get(service_name)
+    return dependency
@@ -0,0 +1,161 @@
+"""
+Persistent multiplexed websocket channel from API Gateway to a service
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+import websockets
+
+# Add shared modules to path
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+
+from shared.config import settings
+
+logger = logging.getLogger(__name__)
+
+class ChannelUnavailable(Exception):
+    """The channel is not connected, or dropped before a reply arrived"""
+
+class UpstreamChannel:
+    """One long-lived websocket per gateway worker carrying frames for every client
+
+    Each request is sent as ``{"id", "user_id", "payload"}`` and the service
+    answers with ``{"id", "status", "body"}``; the id correlates replies with
+    waiting callers, so replies may arrive in any order. At most
+    ``max_in_flight`` requests are outstanding; further callers wait for a
+    slot, which pushes back on the client websockets feeding the channel.
+    The connection is re-established with capped exponential backoff, and
+    requests pending when it drops, or when a frame can't be sent, fail
+    with ChannelUnavailable.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        max_in_flight: int = settings.UPSTREAM_CHANNEL_MAX_IN_FLIGHT,
+        timeout: float = settings.UPSTREAM_CHANNEL_TIMEOUT,
+        reconnect_max: float = settings.UPSTREAM_CHANNEL_RECONNECT_MAX
+    ):
+        self.url = url
+        self.timeout = timeout
+        self.reconnect_max = reconnect_max
+        self.slots = asyncio.Semaphore(max_in_flight)
+        self.outbox: asyncio.Queue = asyncio.Queue(maxsize=max_in_flight)
+        self.pending: Dict[str, asyncio.Future] = {}
+        self.connected = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.requests = 0
+        self.failures = 0
+        self.reconnects = 0
+
+    async def start(self):
+        """Connect in the background; callers fall back until the channel is up"""
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    @property
+    def available(self) -> bool:
+        return self.connected.is_set()
+
+    async def request(self, user_id: str, payload: Dict[str, Any], timeout: Optional[float] = None) -> Tuple[int, str]:
+        """Send one frame and wait for its reply; returns (status, body)"""
+        if not self.available:
+            raise ChannelUnavailable(f"Channel to {self.url} is not connected")
+
+        async with self.slots:
+            # The channel may have dropped while this caller waited for a slot
+            if not self.available:
+                raise ChannelUnavailable(f"Channel to {self.url} is not connected")
+
+            request_id = uuid.uuid4().hex
+            reply = asyncio.get_running_loop().create_future()
+            self.pending[request_id] = reply
+            self.requests += 1
+            try:
+                await self.outbox.put(json.dumps({"id": request_id, "user_id": user_id, "payload": payload}))
+                return await asyncio.wait_for(reply, timeout or self.timeout)
+            except (ChannelUnavailable, asyncio.TimeoutError):
+                self.failures += 1
+                raise
+            finally:
+                self.pending.pop(request_id, None)
+
+    async def _run(self):
+        delay = 0.5
+        while True:
+            try:
+                async with websockets.connect(self.url) as ws:
+                    delay = 0.5
+                    self.connected.set()
+                    logger.info(f"Upstream channel connected to {self.url}")
+                    reader = asyncio.create_task(self._read(ws))
+                    writer = asyncio.create_task(self._write(ws))
+                    try:
+                        # A failed send ends the connection just like a failed read
+                        done, _ = await asyncio.wait({reader, writer}, return_when=asyncio.FIRST_COMPLETED)
+                    finally:
+                        reader.cancel()
+                        writer.cancel()
+                    for task in done:
+                        task.result()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self.connected.is_set() or self.reconnects == 0:
+                    logger.warning(f"Upstream channel to {self.url} unavailable: {e}")
+            finally:
+                self._drop()
+
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.reconnect_max)
+
+    async def _write(self, ws):
+        while True:
+            frame = await self.outbox.get()
+            await ws.send(frame)
+
+    async def _read(self, ws):
+        async for raw in ws:
+            try:
+                message = json.loads(raw)
+                reply = self.pending.get(message["id"])
+            except (ValueError, KeyError, TypeError):
+                logger.warning("Upstream channel dropped a malformed frame")
+                continue
+            if reply is not None and not reply.done():
+                body = message.get("body", "")
+                reply.set_result((message.get("status", 200), body if isinstance(body, str) else json.dumps(body)))
+
+    def _drop(self):
+        """Fail everything in flight; frames still queued were never sent"""
+        self.connected.clear()
+        while not self.outbox.empty():
+            self.outbox.get_nowait()
+        for reply in self.pending.values():
+            if not reply.done():
+                reply.set_exception(ChannelUnavailable(f"Channel to {self.url} closed"))
+
+    async def close(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connected": self.available,
+            "in_flight": len(self.pending),
+            "requests": self.requests,
+            "failures": self.failures,
+            "reconnects": self.reconnects
+        }
@@ -0,0 +1,7 @@
+import sys
+import os
+
+# Add the gateway sources and the backend directory to the path
+GATEWAY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(GATEWAY_DIR, "src"))
+sys.path.append(os.path.join(GATEWAY_DIR, "../.."))
@@ -0,0 +1,56 @@
+import pytest
+from types import SimpleNamespace
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from middleware.auth import get_current_user
+from routes import ai
+
+CLIENT_TIMEOUT = httpx.Timeout(5.0)
+
+@pytest.fixture
+def upstream_requests():
+    return []
+
+@pytest.fixture
+def client(upstream_requests):
+    """Gateway app whose AI service streams when asked and answers JSON otherwise"""
+    def handle(request: httpx.Request) -> httpx.Response:
+        upstream_requests.append(request)
+        if ai.wants_stream(request.content):
+            async def events():
+                yield b'data: {"type": "done"}\n\n'
+
+            return httpx.Response(200, content=events(), headers={"Content-Type": "text/event-stream"})
+        return httpx.Response(200, json={"response": "hi"})
+
+    upstream = httpx.AsyncClient(transport=httpx.MockTransport(handle), timeout=CLIENT_TIMEOUT)
+    app = FastAPI()
+    app.include_router(ai.router, prefix="/ai")
+    app.state.upstreams = SimpleNamespace(get=lambda service_name: upstream)
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id="user-1")
+    return TestClient(app)
+
+class TestChatTimeouts:
+    """Test cases for the read timeout on proxied chat calls"""
+
+    def test_streamed_chat_has_no_read_timeout(self, client, upstream_requests):
+        """Streamed chats wait on reads for as long as the model takes"""
+        response = client.post("/ai/chat", json={"message": "hello", "stream": True})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        timeout = upstream_requests[0].extensions["timeout"]
+        assert timeout["read"] is None
+        assert timeout["connect"] == 10.0
+
+    @pytest.mark.parametrize("body", [{"message": "hello"}, {"message": "hello", "stream": False}])
+    def test_plain_chat_keeps_pool_timeout(self, client, upstream_requests, body):
+        """Non-streamed chats keep the pooled client's bounded read timeout"""
+        response = client.post("/ai/chat", json=body)
+        assert response.status_code == 200
+        assert response.json() == {"response": "hi"}
+
+        assert upstream_requests[0].extensions["timeout"] == CLIENT_TIMEOUT.as_dict()
@@ -0,0 +1,130 @@
+import pytest
+import time
+from types import SimpleNamespace
+
+import jwt
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from shared.config import settings
+from middleware import auth
+from middleware.auth import VerifiedTokenCache, get_current_user, verify_token
+
+def make_token(**claims) -> str:
+    payload = {"sub": "user-1", "email": "user@example.com", "name": "User", "exp": int(time.time()) + 3600}
+    payload.update(claims)
+    return jwt.encode(payload, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+@pytest.fixture(autouse=True)
+def empty_token_cache():
+    auth.token_cache.clear()
+    yield
+    auth.token_cache.clear()
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    """Counts real JWT verifications"""
+    calls = []
+    decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(auth.jwt, "decode", counting_decode)
+    return calls
+
+class TestVerifiedTokenCache:
+    """Test cases for the verified token LRU"""
+
+    def test_ttl_is_capped_by_token_exp(self):
+        """An entry never outlives the token's own exp"""
+        cache = VerifiedTokenCache(max_entries=10, ttl=300)
+        exp = time.time() + 0.05
+        cache.put("token", "user", exp)
+
+        assert cache.entries[cache.digest("token")][1] == exp
+        assert cache.get("token") == "user"
+        time.sleep(0.06)
+        assert cache.get("token") is None
+        assert cache.entries == {}
+
+    def test_ttl_applies_when_exp_is_later(self):
+        """A long-lived token is still re-verified after ttl seconds"""
+        cache = VerifiedTokenCache(max_entries=10, ttl=0.05)
+        cache.put("token", "user", time.time() + 3600)
+
+        assert cache.get("token") == "user"
+        time.sleep(0.06)
+        assert cache.get("token") is None
+
+    def test_least_recently_used_is_evicted(self):
+        """Beyond max_entries the least recently used token is dropped"""
+        cache = VerifiedTokenCache(max_entries=2, ttl=300)
+        cache.put("a", "user-a", None)
+        cache.put("b", "user-b", None)
+        assert cache.get("a") == "user-a"
+        cache.put("c", "user-c", None)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "user-a"
+        assert cache.get("c") == "user-c"
+
+    def test_raw_tokens_are_not_kept(self):
+        """Entries are keyed by digest, not the token itself"""
+        cache = VerifiedTokenCache(max_entries=10, ttl=300)
+        cache.put("secret-token", "user", None)
+        assert "secret-token" not in cache.entries
+        assert cache.digest("secret-token") in cache.entries
+
+class TestVerifyToken:
+    """Test cases for cached JWT verification"""
+
+    def test_valid_token_is_verified_once(self, decode_calls):
+        """Repeat requests with one token skip JWT verification"""
+        token = make_token()
+        first = verify_token(token)
+        second = verify_token(token)
+
+        assert second is first
+        assert first.id == "user-1"
+        assert len(decode_calls) == 1
+
+    @pytest.mark.parametrize("token", [
+        make_token(email=None),
+        make_token(exp=int(time.time()) - 10),
+        jwt.encode({"sub": "user-1", "email": "user@example.com"}, "wrong-secret", algorithm="HS256"),
+        "not-a-jwt"
+    ])
+    def test_failures_are_not_cached(self, decode_calls, token):
+        """Rejected tokens are verified again on every request"""
+        for _ in range(2):
+            with pytest.raises(HTTPException) as exc_info:
+                verify_token(token)
+            assert exc_info.value.status_code == 401
+
+        assert len(decode_calls) == 2
+        assert auth.token_cache.entries == {}
+
+class TestGetCurrentUser:
+    """Test cases for the get_current_user dependency"""
+
+    @pytest.mark.asyncio
+    async def test_reuses_middleware_principal(self, decode_calls):
+        """The principal set by auth_middleware is returned without re-verifying"""
+        principal = verify_token(make_token())
+        request = SimpleNamespace(state=SimpleNamespace(user=principal))
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials="ignored")
+
+        assert await get_current_user(request, credentials) is principal
+        assert len(decode_calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_verifies_without_middleware_principal(self, decode_calls):
+        """Without a middleware principal the bearer token is verified"""
+        request = SimpleNamespace(state=SimpleNamespace())
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=make_token())
+
+        user = await get_current_user(request, credentials)
+        assert user.id == "user-1"
+        assert len(decode_calls) == 1
@@ -0,0 +1,94 @@
+import pytest
+from types import SimpleNamespace
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from shared.config import settings, SERVICE_URLS
+from middleware.auth import get_current_user
+from routes import memory
+
+MEMORY_URL = httpx.URL(SERVICE_URLS["memory"])
+
+@pytest.fixture
+def upstream_requests():
+    return []
+
+@pytest.fixture
+def client(upstream_requests):
+    """Gateway app whose memory service records requests and echoes the path"""
+    def handle(request: httpx.Request) -> httpx.Response:
+        upstream_requests.append(request)
+        if request.method == "POST":
+            return httpx.Response(201, json={"stored": request.url.path})
+        if request.url.path.endswith("/missing"):
+            return httpx.Response(404, json={"error": "Memory not found"})
+        return httpx.Response(200, json={"path": request.url.raw_path.decode()})
+
+    upstream = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+    app = FastAPI()
+    app.include_router(memory.router, prefix="/memory")
+    app.state.upstreams = SimpleNamespace(get=lambda service_name: upstream)
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id="user-1")
+    return TestClient(app)
+
+class TestBatchGet:
+    """Test cases for fetching many memories in one request"""
+
+    def test_results_are_per_item(self, client, upstream_requests):
+        """Each ID gets its own result, in order, scoped to the caller"""
+        response = client.post("/memory/batch/get", json={"memory_ids": ["a", "missing", "b"]})
+        assert response.status_code == 200
+
+        body = response.json()
+        assert body["success"] is False
+        assert [result["status_code"] for result in body["results"]] == [200, 404, 200]
+        assert body["results"][1]["error"] == "Memory not found"
+        assert all(request.url.params["user_id"] == "user-1" for request in upstream_requests)
+
+    def test_ids_cannot_escape_the_memory_path(self, client, upstream_requests):
+        """A '/' in an ID stays inside one path segment"""
+        response = client.post("/memory/batch/get", json={"memory_ids": ["stats/user-2", "search/x?y=1"]})
+        assert response.status_code == 200
+
+        paths = [request.url.raw_path.decode() for request in upstream_requests]
+        base = MEMORY_URL.raw_path.decode().rstrip("/")
+        assert paths == [f"{base}/stats%2Fuser-2?user_id=user-1", f"{base}/search%2Fx%3Fy%3D1?user_id=user-1"]
+
+    @pytest.mark.parametrize("memory_id", ["", ".", ".."])
+    def test_dot_segments_are_rejected(self, client, upstream_requests, memory_id):
+        """IDs that would be normalized away are refused before any upstream call"""
+        response = client.post("/memory/batch/get", json={"memory_ids": ["a", memory_id]})
+        assert response.status_code == 400
+        assert upstream_requests == []
+
+    def test_batch_size_is_capped(self, client, upstream_requests):
+        """Empty batches and batches over the limit are refused"""
+        too_many = [str(i) for i in range(settings.BATCH_MAX_OPERATIONS + 1)]
+        for memory_ids in ([], too_many):
+            response = client.post("/memory/batch/get", json={"memory_ids": memory_ids})
+            assert response.status_code == 400
+        assert upstream_requests == []
+
+class TestBatchStore:
+    """Test cases for storing many memories in one request"""
+
+    def test_memories_are_stored_as_the_caller(self, client, upstream_requests):
+        """Every stored memory is attributed to the authenticated user"""
+        memories = [{"content": "first", "user_id": "user-2"}, {"content": "second"}]
+        response = client.post("/memory/batch/store", json={"memories": memories})
+        assert response.status_code == 200
+
+        body = response.json()
+        assert body["success"] is True
+        assert [result["index"] for result in body["results"]] == [0, 1]
+        stored = [httpx.Response(200, content=request.content).json() for request in upstream_requests]
+        assert [item["user_id"] for item in stored] == ["user-1", "user-1"]
+
+    def test_batch_size_is_capped(self, client, upstream_requests):
+        """A store batch over the limit is refused"""
+        memories = [{"content": str(i)} for i in range(settings.BATCH_MAX_OPERATIONS + 1)]
+        response = client.post("/memory/batch/store", json={"memories": memories})
+        assert response.status_code == 400
+        assert upstream_requests == []
@@ -0,0 +1,135 @@
+import pytest
+import asyncio
+import time
+
+import fakeredis
+
+from middleware.rate_limit import HybridRateLimiter
+
+class TestHybridRateLimiterSync:
+    """Test cases for hybrid limiter reconciliation"""
+
+    @pytest.mark.asyncio
+    async def test_failed_sync_requeues_rolled_over_lease(self):
+        """Counts of a lease that rolled over mid-sync are kept for the next sync"""
+        limiter = HybridRateLimiter(fakeredis.aioredis.FakeRedis(), lease_size=10)
+        now = time.time()
+        window_start = now - now % 60
+        for _ in range(3):
+            assert await limiter.is_allowed("client", 100, 60, window_start)
+        old_lease = limiter.leases["client"]
+
+        async def redis_down(keys, args):
+            raise ConnectionError("redis down")
+
+        async def failing_script(keys, args):
+            # The next window starts while the script call is in flight
+            limiter.script = redis_down
+            await limiter.is_allowed("client", 100, 60, window_start + 60)
+            raise ConnectionError("redis down")
+
+        limiter.script = failing_script
+        with pytest.raises(ConnectionError):
+            await limiter.sync()
+
+        assert limiter.leases["client"] is not old_lease
+        assert old_lease.pending == 3
+        assert [lease for _, lease in limiter.closed_windows] == [old_lease]
+
+        reported = {}
+
+        async def recording_script(keys, args):
+            reported.update(zip(keys, args[::2]))
+            return [0] * len(keys)
+
+        limiter.script = recording_script
+        await limiter.sync()
+
+        assert reported[f"rate_limit:hybrid:client:{int(window_start)}"] == 3
+        assert reported[f"rate_limit:hybrid:client:{int(window_start + 60)}"] == 1
+        assert limiter.closed_windows == []
+
+    @pytest.mark.asyncio
+    async def test_failed_sync_keeps_current_lease_live(self):
+        """A lease still in its window is not also queued as closed"""
+        limiter = HybridRateLimiter(fakeredis.aioredis.FakeRedis(), lease_size=10)
+        now = time.time()
+        assert await limiter.is_allowed("client", 100, 60, now)
+
+        async def failing_script(keys, args):
+            raise ConnectionError("redis down")
+
+        limiter.script = failing_script
+        with pytest.raises(ConnectionError):
+            await limiter.sync()
+
+        assert limiter.leases["client"].pending == 1
+        assert limiter.closed_windows == []
+
+class TestHybridRateLimiterAdmission:
+    """Test cases for admitting requests against leases"""
+
+    @pytest.mark.asyncio
+    async def test_burst_above_lease_size_is_admitted(self):
+        """A drained lease is refilled from Redis instead of rejecting"""
+        limiter = HybridRateLimiter(fakeredis.aioredis.FakeRedis(), lease_size=20)
+        now = time.time()
+
+        results = await asyncio.gather(*[limiter.is_allowed("client", 1000, 60, now) for _ in range(50)])
+        assert all(results)
+        results = [await limiter.is_allowed("client", 1000, 60, now) for _ in range(50)]
+        assert all(results)
+
+    @pytest.mark.asyncio
+    async def test_global_limit_holds_across_replicas(self):
+        """Replicas sharing Redis stop within one lease each of the limit"""
+        shared_redis = fakeredis.aioredis.FakeRedis()
+        replicas = [HybridRateLimiter(shared_redis, lease_size=5) for _ in range(2)]
+        now = time.time()
+
+        admitted = 0
+        for _ in range(20):
+            for limiter in replicas:
+                admitted += await limiter.is_allowed("client", 30, 60, now)
+
+        assert 30 <= admitted <= 30 + 5 * len(replicas)
+        for limiter in replicas:
+            await limiter.sync()
+            assert not await limiter.is_allowed("client", 30, 60, now)
+
+    @pytest.mark.asyncio
+    async def test_redis_outage_fails_open(self):
+        """Requests are allowed while Redis is down and counted for later"""
+        limiter = HybridRateLimiter(fakeredis.aioredis.FakeRedis(), lease_size=5)
+        now = time.time()
+
+        async def failing_script(keys, args):
+            raise ConnectionError("redis down")
+
+        limiter.script = failing_script
+        results = [await limiter.is_allowed("client", 10, 60, now) for _ in range(25)]
+
+        assert all(results)
+        assert limiter.leases["client"].pending == 25
+        assert limiter.closed_windows == []
+
+    @pytest.mark.asyncio
+    async def test_sync_skips_idle_leases(self):
+        """Leases with nothing new to report are not sent to Redis"""
+        limiter = HybridRateLimiter(fakeredis.aioredis.FakeRedis(), lease_size=10)
+        now = time.time()
+        assert await limiter.is_allowed("busy", 100, 60, now)
+        assert await limiter.is_allowed("idle", 100, 60, now)
+        await limiter.sync()
+
+        assert await limiter.is_allowed("busy", 100, 60, now)
+        reported = []
+
+        async def recording_script(keys, args):
+            reported.extend(keys)
+            return [0] * len(keys)
+
+        limiter.script = recording_script
+        await limiter.sync()
+
+        assert reported == [f"rate_limit:hybrid:busy:{int(now - now % 60)}"]
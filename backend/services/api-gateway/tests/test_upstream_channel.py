@@ -0,0 +1,190 @@
+import pytest
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import httpx
+import websockets
+
+from routes.communication import forward_websocket_message
+from utils.upstream_channel import ChannelUnavailable, UpstreamChannel
+
+class FakeService:
+    """Websocket end of the channel; replies to held frames in reverse order"""
+
+    def __init__(self, hold: int = 1):
+        self.hold = hold
+        self.frames = []
+        self.connections = []
+        self.server = None
+
+    async def handler(self, websocket):
+        self.connections.append(websocket)
+        held = []
+        async for raw in websocket:
+            frame = json.loads(raw)
+            self.frames.append(frame)
+            held.append(frame)
+            if len(held) < self.hold:
+                continue
+            for frame in reversed(held):
+                await websocket.send(json.dumps({
+                    "id": frame["id"],
+                    "status": 200,
+                    "body": {"echo": frame["payload"], "user_id": frame["user_id"]}
+                }))
+            held = []
+
+    async def __aenter__(self) -> str:
+        self.server = await websockets.serve(self.handler, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        return f"ws://127.0.0.1:{port}/ws/gateway"
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+        await self.server.wait_closed()
+
+async def connected(url: str, **kwargs) -> UpstreamChannel:
+    channel = UpstreamChannel(url, **kwargs)
+    await channel.start()
+    await asyncio.wait_for(channel.connected.wait(), 5)
+    return channel
+
+class TestUpstreamChannel:
+    """Test cases for the multiplexed gateway -> service channel"""
+
+    @pytest.mark.asyncio
+    async def test_replies_are_matched_by_id(self):
+        """Out-of-order replies reach the callers that sent the frames"""
+        async with FakeService(hold=3) as url:
+            channel = await connected(url)
+            try:
+                results = await asyncio.gather(*[
+                    channel.request(f"user-{i}", {"content": i}) for i in range(3)
+                ])
+            finally:
+                await channel.close()
+
+        for i, (status, body) in enumerate(results):
+            assert status == 200
+            assert json.loads(body) == {"echo": {"content": i}, "user_id": f"user-{i}"}
+        assert channel.stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_drop_fails_pending_requests(self):
+        """Requests in flight when the connection drops fail with ChannelUnavailable"""
+        service = FakeService(hold=2)
+        async with service as url:
+            channel = await connected(url, reconnect_max=0.1)
+            try:
+                pending = asyncio.create_task(channel.request("user-1", {"content": "hi"}))
+                while not service.frames:
+                    await asyncio.sleep(0.01)
+                await service.connections[0].close()
+
+                with pytest.raises(ChannelUnavailable):
+                    await pending
+                assert channel.stats()["failures"] == 1
+                # Reconnects once the service is reachable again
+                await asyncio.wait_for(channel.connected.wait(), 5)
+                assert channel.stats()["reconnects"] >= 1
+            finally:
+                await channel.close()
+
+    @pytest.mark.asyncio
+    async def test_waiting_for_slot_rechecks_connection(self):
+        """A caller that gets a slot after the channel dropped fails fast"""
+        async with FakeService(hold=2) as url:
+            channel = await connected(url, max_in_flight=1)
+            try:
+                first = asyncio.create_task(channel.request("user-1", {"content": 1}))
+                await asyncio.sleep(0.05)
+                second = asyncio.create_task(channel.request("user-2", {"content": 2}, timeout=5))
+                await asyncio.sleep(0.01)
+
+                channel._drop()
+                with pytest.raises(ChannelUnavailable):
+                    await first
+                with pytest.raises(ChannelUnavailable):
+                    await asyncio.wait_for(second, 1)
+            finally:
+                await channel.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_send_fails_pending_and_reconnects(self, monkeypatch):
+        """A frame that can't be sent fails its caller at once and the channel reconnects"""
+        connect = websockets.connect
+        sends = []
+
+        class FirstSendFails:
+            def __init__(self, ws):
+                self.ws = ws
+
+            def __aiter__(self):
+                return self.ws.__aiter__()
+
+            async def send(self, frame):
+                sends.append(frame)
+                if len(sends) == 1:
+                    raise ConnectionError("send failed")
+                await self.ws.send(frame)
+
+        @asynccontextmanager
+        async def flaky_connect(url):
+            async with connect(url) as ws:
+                yield FirstSendFails(ws)
+
+        monkeypatch.setattr(websockets, "connect", flaky_connect)
+        service = FakeService()
+        async with service as url:
+            channel = await connected(url, timeout=5, reconnect_max=0.1)
+            try:
+                with pytest.raises(ChannelUnavailable):
+                    await asyncio.wait_for(channel.request("user-1", {"content": 1}), 1)
+
+                await asyncio.wait_for(channel.connected.wait(), 5)
+                status, body = await channel.request("user-2", {"content": 2})
+                assert status == 200
+                assert json.loads(body)["echo"] == {"content": 2}
+                assert channel.stats()["reconnects"] >= 1
+                assert len(service.connections) == 2
+            finally:
+                await channel.close()
+
+class TestForwardWebsocketMessage:
+    """Test cases for channel-or-HTTP forwarding of websocket frames"""
+
+    @staticmethod
+    def http_client(posted: list) -> httpx.AsyncClient:
+        def handle(request: httpx.Request) -> httpx.Response:
+            posted.append(json.loads(request.content))
+            return httpx.Response(202, json={"via": "http"})
+        return httpx.AsyncClient(transport=httpx.MockTransport(handle))
+
+    @pytest.mark.asyncio
+    async def test_uses_channel_when_connected(self):
+        """Frames go over the channel while it is up"""
+        posted = []
+        async with FakeService() as url, self.http_client(posted) as client:
+            channel = await connected(url)
+            try:
+                status, body = await forward_websocket_message({"content": "hi"}, "user-1", channel, client)
+            finally:
+                await channel.close()
+
+        assert status == 200
+        assert json.loads(body)["echo"] == {"content": "hi"}
+        assert posted == []
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_http(self):
+        """Without a connected channel the frame is POSTed to the service"""
+        posted = []
+        async with self.http_client(posted) as client:
+            disconnected = UpstreamChannel("ws://127.0.0.1:9/ws/gateway")
+            for channel in (None, disconnected):
+                status, body = await forward_websocket_message({"content": "hi"}, "user-1", channel, client)
+                assert status == 202
+                assert json.loads(body) == {"via": "http"}
+
+        assert posted == [{"content": "hi", "user_id": "user-1"}] * 2
@@ -0,0 +1,60 @@
+/**
+ * Gateway Channel
+ * Service end of the API gateway's persistent upstream channel (/ws/gateway)
+ * Every gateway worker keeps one websocket open and multiplexes all client frames over it
+ */
+
+// The parts of a `ws` WebSocket the channel uses
+export interface GatewaySocket {
+  on(event: 'message', listener: (data: Buffer | string) => void): void;
+  on(event: 'close', listener: () => void): void;
+  send(data: string): void;
+}
+
+export interface GatewayReply {
+  status: number;
+  body: unknown;
+}
+
+// Same contract as POST /websocket-message: the client frame plus its user_id
+export type GatewayHandler = (payload: Record<string, unknown>, userId: string) => Promise<GatewayReply>;
+
+/**
+ * Serve one gateway connection
+ *
+ * Frames arrive as {"id", "user_id", "payload"} and each is answered with
+ * {"id", "status", "body"} as soon as its handler finishes, so replies may
+ * leave in any order. The gateway bounds how many frames are in flight.
+ */
+export function serveGatewayChannel(socket: GatewaySocket, handle: GatewayHandler): void {
+  let open = true;
+  socket.on('close', () => {
+    open = false;
+  });
+
+  socket.on('message', async (data) => {
+    let frame: { id?: unknown; user_id?: unknown; payload?: unknown };
+    try {
+      frame = JSON.parse(data.toString());
+    } catch {
+      console.warn('Gateway channel dropped a malformed frame');
+      return;
+    }
+    if (typeof frame.id !== 'string') {
+      console.warn('Gateway channel dropped a frame without an id');
+      return;
+    }
+
+    let reply: GatewayReply;
+    try {
+      reply = await handle((frame.payload ?? {}) as Record<string, unknown>, String(frame.user_id ?? ''));
+    } catch (error) {
+      reply = { status: 500, body: { error: error instanceof Error ? error.message : String(error) } };
+    }
+
+    // The gateway already failed the request if the connection dropped meanwhile
+    if (open) {
+      socket.send(JSON.stringify({ id: frame.id, ...reply }));
+    }
+  });
+}
@@ -13,6 +13,15 @@ import random
 import string
 from datetime import datetime
 import hashlib
+from fastapi import APIRouter, HTTPException
+
+# Add shared modules to path
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../../..'))
+
+from shared.config import settings
+from shared.session_store import SessionStore, create_session_backend
 
 logger = logging.getLogger(__name__)
 
@@ -35,37 +44,57 @@ class CreativityType(Enum):
     BRAINSTORMING = "brainstorming"
     PROBLEM_SOLVING = "problem_solving"
     CONCEPTUAL = "conceptual"
+    # Answer formats
+    TEXT = "text"
+    CHOICE = "choice"
+    MULTIPLE_CHOICE = "multiple_choice"
+    FILE_UPLOAD = "file_upload"
+    SLIDER = "slider"
+    DATE = "date"
 
+@dataclass
 class GenesisQuestion:
     """Genesis flow question"""
     id: int
     phase: GenesisPhase
     text: str
     type: CreativityType
-    prompt: str
+    prompt: str = ""
     context: Dict[str, Any] = field(default_factory=dict)
     required: bool = True
     options: Optional[List[str]] = None
     min_length: Optional[int] = None
     max_length: Optional[int] = None
+    min_value: Optional[int] = None
+    max_value: Optional[int] = None
     file_types: Optional[List[str]] = None
     validation_rules: Optional[Dict[str, Any]] = None
     follow_up_questions: Optional[List[int]] = None
 
+@dataclass
 class GenesisResponse:
     """Response from genesis flow"""
     success: bool
-    next_question: Optional[Dict[str, Any]] = None
+    next_question: Optional[GenesisQuestion] = None
     progress: Optional[Dict[str, Any]] = None
     creative_output: Optional[Any] = None
+    creative_outputs: Optional[List[Any]] = None
     insights: Optional[List[str]] = None
+    summary: Optional[Dict[str, Any]] = None
+    completed: bool = False
+    question_id: Optional[int] = None
     error: Optional[str] = None
 
 class GenesisEngine:
     """Advanced genesis flow for creative collaboration"""
     
+    _questions: Optional[List[GenesisQuestion]] = None
+    
     def __init__(self):
-        self.questions = self._generate_genesis_questions()
+        # The question set is static, so every user's engine shares one copy
+        if GenesisEngine._questions is None:
+            GenesisEngine._questions = self._generate_genesis_questions()
+        self.questions = GenesisEngine._questions
         self.current_phase = GenesisPhase.EXPLORATION
         self.current_question = None
         self.answers = {}
@@ -73,6 +102,28 @@ class GenesisEngine:
         self.insights = []
         self.session_id = None
         self.user_preferences = {}
+    
+    def to_state(self) -> Dict[str, Any]:
+        """Per-user state for the session store"""
+        return {
+            "current_phase": self.current_phase.value,
+            "current_question": self.current_question,
+            "answers": self.answers,
+            "creative_outputs": self.creative_outputs,
+            "insights": self.insights,
+            "session_id": self.session_id,
+            "user_preferences": self.user_preferences
+        }
+    
+    def load_state(self, state: Dict[str, Any]):
+        self.current_phase = GenesisPhase(state["current_phase"])
+        self.current_question = state["current_question"]
+        # JSON keys are strings; question ids are ints
+        self.answers = {int(question_id): answer for question_id, answer in state["answers"].items()}
+        self.creative_outputs = state["creative_outputs"]
+        self.insights = state["insights"]
+        self.session_id = state["session_id"]
+        self.user_preferences = state["user_preferences"]
         
     def _generate_genesis_questions(self) -> List[GenesisQuestion]:
         """Generate all 29 genesis questions"""
@@ -115,7 +166,7 @@ class GenesisEngine:
             ),
             GenesisQuestion(
                 id=4,
-                phase=GenesiPhase.EXPLORATION,
+                phase=GenesisPhase.EXPLORATION,
                 text="Describe your creative process or workflow when starting a project.",
                 type=CreativityType.TEXT,
                 prompt="How do you typically begin a creative project?",
@@ -126,7 +177,7 @@ class GenesisEngine:
                 id=5,
                 phase=GenesisPhase.EXPLORATION,
                 text="What creative challenges or obstacles are you currently facing?",
-                type=Creativity.TEXT,
+                type=CreativityType.TEXT,
                 prompt="What creative challenges are you currently facing?",
                 required=False,
                 validation_rules={"min_length": 50, "max_length": 1000}
@@ -149,7 +200,7 @@ class GenesisEngine:
                 id=7,
                 phase=GenesisPhase.EXPLORATION,
                 text="What creative environment helps you feel most inspired?",
-                type=Creativity.TEXT,
+                type=CreativityType.TEXT,
                 prompt="What creative environment helps you feel most inspired?",
                 required=False,
                 validation_rules={"min_length": 30, "max_length": 500}
@@ -171,7 +222,7 @@ class GenesisEngine:
                 id=9,
                 phase=GenesisPhase.IDEATION,
                 text="What kind of collaboration would enhance your creative process?",
-                type=Creativity.TEXT,
+                type=CreativityType.TEXT,
                 prompt="How would collaboration enhance your creative process?",
                 required=False,
                 validation_rules={"min_length": 50, "max_length": 1000}
@@ -180,7 +231,7 @@ class GenesisEngine:
                 id=10,
                 phase=GenesisPhase.IDEATION,
                 text="What constraints or limitations would you like to remove from your creative process?",
-                type=Creativity.TEXT,
+                type=CreativityType.TEXT,
                 prompt="What constraints would you like to remove?",
                 required=False,
                 validation_rules={"min_length": 30, "max_length": 1000}
@@ -189,7 +240,7 @@ class GenesisEngine:
                 id=11,
                 phase=GenesisPhase.IDEATION,
                 text="What would enable your most creative self to emerge?",
-                type=Creativity.TEXT,
+                type=CreativityType.TEXT,
                 prompt="What would enable your most creative self?",
                 required=True,
                 validation_rules={"min_length": 50, "max_length": 1000}
@@ -198,7 +249,7 @@ class GenesisEngine:
                 id=12,
                 phase=GenesisPhase.IDEATION,
                 text="What patterns or themes would you like to explore in your creative work?",
-                type=Creativity.MULTIPLE_CHOICE,
+                type=CreativityType.MULTIPLE_CHOICE,
                 options=[
                     "Geometric patterns and sacred geometry",
                     "Natural patterns and organic forms",
@@ -215,7 +266,7 @@ class GenesisEngine:
                 id=13,
                 phase=GenesisPhase.IDEATION,
                 text="What emotions or feelings would you like to express through your creative work?",
-                type=Creativity.TEXT,
+                type=CreativityType.TEXT,
                 prompt="What emotions or feelings would you like to express?",
                 required=False,
                 validation_rules={"min_length": 30, "max_length": 1000}
@@ -224,7 +275,7 @@ class GenesisEngine:
                 id=14,
                 phase=GenesisPhase.IDEATION,
                 text="What would make your creative process feel effortless and natural?",
-                type=Creativity.TEXT,
+                type=CreativityType.TEXT,
                 prompt="What would make your creative process feel effortless and natural?",
                 required=False,
                 validation_rules={"min_length": 30, "max_length": 1000}
@@ -256,7 +307,7 @@ class GenesisEngine:
                 id=16,
                 phase=GenesisPhase.CREATION,
                 text="What style or aesthetic would best represent this creative work?",
-                type=Creativity.TEXT,
+                type=CreativityType.TEXT,
                 prompt="What style or aesthetic would best represent this creative work?",
                 required=True,
                 validation_rules={"min_length": 50, "max_length": 1000}
@@ -265,7 +316,7 @@ class GenesisEngine:
                 id=17,
                 phase=GenesisPhase.CREATION,
                 text="What title or heading would capture the essence of this project?",
-                type=Creativity.TEXT,
+                type=CreativityType.TEXT,
                 prompt="What title or heading would capture the essence of this project?",
                 required=True,
                 validation_rules={"min_length": 10, "max_length": 200}
@@ -274,7 +325,7 @@ class GenesisEngine:
                 id=18,
                 phase=GenesisPhase.CREATION,
                 text="What audience or user group would benefit most from this work?",
-                type=Creativity.TEXT,
+                type=CreativityType.TEXT,
                 prompt="What audience or user group would benefit most from this work?",
                 required=False,
                 validation_rules={"min_length": 30, "max_length": 1000}
@@ -283,16 +334,16 @@ class GenesisEngine:
                 id=19,
                 phase=GenesisPhase.CREATION,
                 text="What impact or change would you like this work to create?",
-                type=Creativity.TEXT,
+                type=CreativityType.TEXT,
                 prompt="What impact or change would you like this work to create?",
                 required=False,
                 validation_rules={"min_length": 30, "max_length": 1000}
             ),
             GenesisQuestion(
                 id=20,
-                phase=Phase3.CREATION,
+                phase=GenesisPhase.CREATION,
                 text="What resources or support would accelerate your creative process?",
-                type=Creativity.TEXT,
+                type=CreativityType.TEXT,
                 prompt="What resources or support would accelerate your creative process?",
                 required=False,
                 validation_rules={"min_length": 30, "max_length": 1000}
@@ -301,7 +352,7 @@ class GenesisEngine:
                 id=21,
                 phase=GenesisPhase.CREATION,
                 text="What would make this creative work feel meaningful to you personally?",
-                type=Creativity.TEXT,
+                type=CreativityType.TEXT,
                 prompt="What would make this creative work feel meaningful to you personally?",
                 required=True,
                 validation_rules={"min_length": 30, "max_length": 1000}
@@ -314,7 +365,7 @@ class GenesisEngine:
                 id=22,
                 phase=GenesisPhase.REFINEMENT,
                 text="How could this creative work be improved or enhanced?",
-                type=Creativity.TEXT,
+                type=CreativityType.TEXT,
                 prompt="How could this creative work be improved or enhanced?",
                 required=False,
                 validation_rules={"min_length": 50, "max_length": 1000}
@@ -323,7 +374,7 @@ class GenesisEngine:
                 id=23,
                 phase=GenesisPhase.REFINEMENT,
                 text="What additional features or capabilities would enhance this work?",
-                type=Creativity.TEXT,
+                type=CreativityType.TEXT,
                 prompt="What additional features or capabilities would enhance this work?",
                 required=False,
                 validation_rules={"min_length": 30, "max_length": 1000}
@@ -332,7 +383,7 @@ class GenesisEngine:
                 id=24,
                 phase=GenesisPhase.REFINEMENT,
                 text="How could this creative work be shared or distributed?",
-                type=Creativity.TEXT,
+                type=CreativityType.TEXT,
                 prompt="How could this creative work be shared or distributed?",
                 required=False,
                 validation_rules={"min_length": 30, "max_length": 1000}
@@ -341,7 +392,7 @@ class GenesisEngine:
                 id=25,
                 phase=GenesisPhase.REFINEMENT,
                 text="What would make this creative work more sustainable or maintainable?",
-                type=Creativity.TEXT,
+                type=CreativityType.TEXT,
                 prompt="What would make this creative work more sustainable or maintainable?",
                 required=False,
                 validation_rules={"min_length": 30, "max_length": 1000}
@@ -350,7 +401,7 @@ class GenesisEngine:
                 id=26,
                 phase=GenesisPhase.REFINEMENT,
                 text="What would make this creative work more accessible or inclusive?",
-                type=Creativity.TEXT,
+                type=CreativityType.TEXT,
                 prompt="What would make this creative work more accessible or inclusive?",
                 required=False,
                 validation_rules={"min_length": 30, "max_length": 1000}
@@ -359,7 +410,7 @@ class GenesisEngine:
                 id=27,
                 phase=GenesisPhase.REFINEMENT,
                 text="What would make this creative work more innovative or groundbreaking?",
-                type=Creativity.TEXT,
+                type=CreativityType.TEXT,
                 prompt="What would make this creative work more innovative or groundbreaking?",
                 required=False,
                 validation_rules={"min_length": 30, "max_length": 1000}
@@ -368,7 +419,7 @@ class GenesisEngine:
                 id=28,
                 phase=GenesisPhase.REFINEMENT,
                 text="What would make this creative work more efficient or automated?",
-                type=Creativity.TEXT,
+                type=CreativityType.TEXT,
                 prompt="What would make this creative work more efficient or automated?",
                 required=False,
                 validation_rules={"min_length": 30, "max_length": 1000}
@@ -377,7 +428,7 @@ class GenesisEngine:
                 id=29,
                 phase=GenesisPhase.REFINEMENT,
                 text="What would make this creative work more personalized or adaptive?",
-                type=Creativity.TEXT,
+                type=CreativityType.TEXT,
                 prompt="What would make this creative work more personalized or adaptive?",
                 required=False,
                 validation_rules={"min_length": 30, "max_length": 1000}
@@ -388,11 +439,26 @@ class GenesisEngine:
     
     def get_current_question(self) -> Optional[GenesisQuestion]:
         """Get current genesis question"""
-        if 0 <= self.current_question < len(self.questions):
+        if self.current_question is not None and 0 <= self.current_question < len(self.questions):
             return self.questions[self.current_question]
         return None
     
-    def submit_genesis_answer(self, question_id: int, answer: Any) -> GenesisResponse:
+    def get_progress(self) -> Dict[str, Any]:
+        """Get current progress"""
+        total_questions = len(self.questions)
+        answered_questions = len(self.answers)
+        current_question = self.current_question or 0
+        
+        return {
+            "current_question": current_question + 1,
+            "phase": self.current_phase.value,
+            "total_questions": total_questions,
+            "answered_questions": answered_questions,
+            "progress_percentage": (answered_questions / total_questions) * 100,
+            "completed": current_question >= total_questions
+        }
+    
+    async def submit_genesis_answer(self, question_id: int, answer: Any) -> GenesisResponse:
         """Submit answer to genesis question"""
         try:
             # Validate answer
@@ -418,10 +484,15 @@ class GenesisEngine:
             
             # Generate creative output if applicable
             creative_output = await self._generate_creative_output(question, answer)
+            if creative_output is not None:
+                self.answers[question_id]["creative_output"] = creative_output
+                self.creative_outputs.append(creative_output)
             
             # Move to next question or complete
-            if self.current_question < len(self.questions) - 1:
-                self.current_question += 1
+            current_question = self.current_question or 0
+            if current_question < len(self.questions) - 1:
+                self.current_question = current_question + 1
+                self.current_phase = self.get_current_question().phase
                 return GenesisResponse(
                     success=True,
                     next_question=self.get_current_question(),
@@ -431,7 +502,8 @@ class GenesisEngine:
             else:
                 # Complete genesis flow
                 self.current_phase = GenesisPhase.MANIFESTATION
-                summary = self._generate_genesis_summary()
+                self.current_question = len(self.questions)
+                summary = _generate_genesis_summary(self)
                 
                 return GenesisResponse(
                     success=True,
@@ -488,15 +560,15 @@ class GenesisEngine:
                 
                 # Additional file validation would go here
             
-            elif question.type == Creativity_type.SLIDER:
+            elif question.type == CreativityType.SLIDER:
                 if not isinstance(answer, (int, float)):
                     return {"valid": False, "error": "Slider answer must be a number"}
                 
                 if question.min_value is not None and answer < question.min_value:
-                    return {"valid": False, f"Answer must be at least {question.min_value}"}
+                    return {"valid": False, "error": f"Answer must be at least {question.min_value}"}
                 
                 if question.max_value is not None and answer > question.max_value:
-                    return {"valid": False, f"Answer must be no more than {question.max_value}"}
+                    return {"valid": False, "error": f"Answer must be no more than {question.max_value}"}
             
             return {"valid": True, "error": None}
             
@@ -506,7 +578,7 @@ class GenesisEngine:
     async def _generate_creative_output(self, question: GenesisQuestion, answer: Any) -> Optional[Any]:
         """Generate creative output based on question and answer"""
         try:
-            if question.type == Creativity.TEXT:
+            if question.type == CreativityType.TEXT:
                 # Generate creative text response
                 if question.id == 22:  # Creative improvement
                     return f"I'll help enhance your creative work by suggesting improvements like: {answer}"
@@ -519,7 +591,7 @@ class GenesisEngine:
                 else:
                     return f"I understand and will remember your creative input: {answer}"
             
-            elif question.type == Creativity.CHOICE:
+            elif question.type == CreativityType.CHOICE:
                 # Generate creative choice response
                 if question.id == 2:  # Creative medium preference
                     return f"I'll support your {answer} preference with appropriate tools and features."
@@ -530,7 +602,7 @@ class GenesisEngine:
                 else:
                     return f"I'll support your {answer} choice in our interactions."
             
-            elif question.type == Creativity.MULTIPLE_CHOICE:
+            elif question.type == CreativityType.MULTIPLE_CHOICE:
                 # Generate multiple choice response
                 selected_options = [opt for opt in answer if opt in (question.options or [])]
                 if selected_options:
@@ -538,14 +610,14 @@ class GenesisEngine:
                 else:
                     return "I'll support your creative choices with appropriate tools."
             
-            elif question.type == Creativity.FILE_UPLOAD:
+            elif question.type == CreativityType.FILE_UPLOAD:
                 # Handle file upload
                 if answer and question.file_types:
                     return f"I'll help you process your {answer} file using appropriate tools."
                 else:
                     return "I'll help you with file upload when you're ready."
             
-            elif question.type == Creativity.SLIDER:
+            elif question.type == CreativityType.SLIDER:
                 # Generate slider response
                 if question.id == 6:  # Privacy importance
                     return f"I'll respect your privacy setting of {answer}."
@@ -553,10 +625,8 @@ class GenesisEngine:
                     return f"I'll balance challenge and support according to your {answer}."
                 else:
                     return f"I'll adapt to your {answer} preference."
-                else:
-                    return f"I'll respect your {answer} setting."
             
-            elif question.type == Creativity.DATE:
+            elif question.type == CreativityType.DATE:
                 # Handle date input
                 if answer and question.required:
                     return f"I'll remember and respect your {answer} date preference."
@@ -582,18 +652,20 @@ class GenesisFlow:
         self.start_time = None
         self.completion_time = None
         
-    async def start_genesis(self, user_id: str = None) -> Dict[str, Any]:
+    async def start_genesis(self, user_id: str) -> Dict[str, Any]:
         """Start genesis flow"""
         try:
             self.session_id = f"genesis_{datetime.utcnow().timestamp()}"
-            self.user_id = user_id or "default_user"
+            self.user_id = user_id
             self.start_time = datetime.utcnow()
             self.current_phase = GenesisPhase.EXPLORATION
-            self.engine.current_index = 0
+            self.engine.current_phase = GenesisPhase.EXPLORATION
+            self.engine.current_question = 0
             self.engine.answers = {}
             self.engine.creative_outputs = []
             self.engine.insights = []
-            self.user_preferences = {}
+            self.engine.session_id = self.session_id
+            self.engine.user_preferences = {}
             
             logger.info(f"Genesis flow started for user {user_id}")
             
@@ -609,28 +681,74 @@ class GenesisFlow:
         except Exception as e:
             logger.error(f"Error starting genesis flow: {e}")
             raise HTTPException(status_code=500, detail="Failed to start genesis flow")
+    
+    def to_state(self) -> Dict[str, Any]:
+        """Per-user state for the session store"""
+        return {
+            "engine": self.engine.to_state(),
+            "session_id": self.session_id,
+            "user_id": self.user_id,
+            "current_phase": self.current_phase.value,
+            "start_time": self.start_time.isoformat() if self.start_time else None,
+            "completion_time": self.completion_time.isoformat() if self.completion_time else None
+        }
+    
+    @classmethod
+    def from_state(cls, state: Optional[Dict[str, Any]]) -> "GenesisFlow":
+        """Rebuild a flow from stored state, or start a fresh one"""
+        flow = cls()
+        if state:
+            flow.engine.load_state(state["engine"])
+            flow.session_id = state["session_id"]
+            flow.user_id = state["user_id"]
+            flow.current_phase = GenesisPhase(state["current_phase"])
+            flow.start_time = datetime.fromisoformat(state["start_time"]) if state["start_time"] else None
+            flow.completion_time = datetime.fromisoformat(state["completion_time"]) if state["completion_time"] else None
+        return flow
+
+router = APIRouter()
+
+# Per-user genesis flows, hydrated per request through genesis_session()
+genesis_sessions = SessionStore(
+    create_session_backend(settings.SESSION_STORE_URL, settings.SESSION_MEMORY_MAX_ENTRIES),
+    "genesis",
+    settings.SESSION_TTL
+)
+
+def genesis_session(user_id: Optional[str]):
+    """Load, yield and save back one user's GenesisFlow"""
+    if not user_id:
+        raise HTTPException(status_code=400, detail="user_id is required")
+    return genesis_sessions.session(user_id, GenesisFlow.from_state, GenesisFlow.to_state)
 
 @router.post("/start")
 async def start_genesis(request: Dict[str, Any]):
     """Start genesis flow"""
     try:
-        return await start_genesis(request.get("user_id"))
+        async with genesis_session(request.get("user_id")) as flow:
+            return await flow.start_genesis(request.get("user_id"))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in start_genesis: {e}")
         raise HTTPException(status_code=500, detail="Failed to start genesis flow")
 
 @router.get("/status")
-async def get_genesis_status():
+async def get_genesis_status(user_id: Optional[str] = None):
     """Get genesis status"""
     try:
-        return {
-            "success": True,
-            "current_phase": convergence_engine.current_phase.value,
-            "total_questions": len(convergence_engine.questions),
-            "answered_questions": len(convergence_engine.answers),
-            "completed": convergence_engine.current_index >= len(convergence_engine.questions),
-            "progress": convergence_engine.get_progress()
-        }
+        async with genesis_session(user_id) as flow:
+            engine = flow.engine
+            return {
+                "success": True,
+                "current_phase": engine.current_phase.value,
+                "total_questions": len(engine.questions),
+                "answered_questions": len(engine.answers),
+                "completed": (engine.current_question or 0) >= len(engine.questions),
+                "progress": engine.get_progress()
+            }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting genesis status: {e}")
         raise HTTPException(status_code=500, detail="Failed to get genesis status")
@@ -641,21 +759,19 @@ async def get_genesis_questions():
     try:
         questions_data = []
         
-        for question in convergence_engine.questions:
+        for question in GenesisEngine().questions:
             question_data = {
                 "id": question.id,
                 "phase": question.phase.value,
                 "text": question.text,
                 "type": question.type.value,
                 "prompt": question.prompt,
-                "category": question.category.value,
                 "required": question.required,
                 "options": question.options,
                 "min_length": question.min_length,
                 "max_length": question.max_length,
                 "file_types": question.file_types,
                 "validation_rules": question.validation_rules,
-                "weight": question.weight,
                 "follow_up_questions": question.follow_up_questions
             }
             questions_data.append(question_data)
@@ -664,8 +780,7 @@ async def get_genesis_questions():
             "success": True,
             "questions": questions_data,
             "total_questions": len(questions_data),
-            "phases": list(set(q.phase.value for q in questions_data),
-            "categories": list(set(q.category.value for q in questions_data)
+            "phases": list(dict.fromkeys(q["phase"] for q in questions_data))
         }
         
     except Exception as e:
@@ -676,87 +791,90 @@ async def get_genesis_questions():
 async def submit_genesis_answer(request: Dict[str, Any]):
     """Submit answer to genesis question"""
     try:
-        return await submit_genesis_answer(request.question_id, request.answer)
+        async with genesis_session(request.get("user_id")) as flow:
+            return await flow.engine.submit_genesis_answer(request["question_id"], request["answer"])
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error submitting genesis answer: {e}")
         raise HTTPException(status_code=500, detail="Failed to submit genesis answer")
 
 @router.post("/complete")
-async def complete_genesis():
+async def complete_genesis(request: Dict[str, Any]):
     """Complete genesis flow and generate summary"""
     try:
-        summary = convergence_engine.get_genesis_summary()
-        
-        # Mark as completed
-        convergence_engine.current_phase = GenesisPhase.MANIFESTATION
-        convergence_engine.current_index = len(convergence_engine.questions)
-        
-        logger.info("Genesis flow completed successfully")
-        
-        return {
-            "success": True,
-            "summary": summary,
-            "completed": True,
-            "message": "Genesis flow completed successfully",
-            "creative_outputs": convergence_engine.creative_outputs,
-            "insights": convergence_engine.insights,
-            "recommendations": self._generate_genesis_recommendations()
-        }
+        async with genesis_session(request.get("user_id")) as flow:
+            engine = flow.engine
+            summary = _generate_genesis_summary(engine)
+            
+            # Mark as completed
+            engine.current_phase = GenesisPhase.MANIFESTATION
+            engine.current_question = len(engine.questions)
+            flow.completion_time = datetime.utcnow()
+            
+            logger.info(f"Genesis flow completed for user {flow.user_id}")
+            
+            return {
+                "success": True,
+                "summary": summary,
+                "completed": True,
+                "message": "Genesis flow completed successfully",
+                "creative_outputs": engine.creative_outputs,
+                "insights": engine.insights,
+                "recommendations": _generate_genesis_recommendations(engine)
+            }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error completing genesis: {e}")
         raise HTTPException(status_code=500, detail="Failed to complete genesis")
 
 @router.get("/summary")
-async def get_genesis_summary():
+async def get_genesis_summary(user_id: Optional[str] = None):
     """Get comprehensive genesis summary"""
     try:
-        return convergence_engine.get_genesis_summary()
+        async with genesis_session(user_id) as flow:
+            return _generate_genesis_summary(flow.engine)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting genesis summary: {e}")
         raise HTTPException(status_code=500, detail="Failed to get genesis summary")
 
-def _generate_genesis_recommendations() -> List[str]:
+def _generate_genesis_recommendations(engine: GenesisEngine) -> List[str]:
     """Generate personalized recommendations based on genesis insights"""
     recommendations = []
-        
-        insights = convergence_engine.insights
-        
-        # Based on creative outputs
-        if len(convergence_engine.creative_outputs) > 0:
-            recommendations.append("Continue exploring creative possibilities with enhanced tools")
-        
-        # Based on insights
-        if "creative_patterns" in insights:
-            recommendations.append("Leverage creative patterns detected - consider automation")
-        
-        # Based on phase
-        if convergence_engine.current_phase == GenesisPhase.REFINEMENT:
-            recommendations.append("Consider exploring refinement and enhancement opportunities")
-        elif convergence_engine.current_phase == GenesisPhase.MANIFESTATION:
-            recommendations.append("Review and finalize creative outputs")
-        
-        return recommendations
+    
+    insights = engine.insights
+    
+    # Based on creative outputs
+    if len(engine.creative_outputs) > 0:
+        recommendations.append("Continue exploring creative possibilities with enhanced tools")
+    
+    # Based on insights
+    if "creative_patterns" in insights:
+        recommendations.append("Leverage creative patterns detected - consider automation")
+    
+    # Based on phase
+    if engine.current_phase == GenesisPhase.REFINEMENT:
+        recommendations.append("Consider exploring refinement and enhancement opportunities")
+    elif engine.current_phase == GenesisPhase.MANIFESTATION:
+        recommendations.append("Review and finalize creative outputs")
+    
+    return recommendations
 
-def _generate_genesis_summary() -> Dict[str, Any]:
+def _generate_genesis_summary(engine: GenesisEngine) -> Dict[str, Any]:
     """Generate comprehensive genesis summary"""
-        metrics = convergence_engine.get_limbic_metrics()
-        
-        return {
-            "timestamp": datetime.utcnow().isoformat(),
-            "phase": convergence_engine.current_phase.value,
-            "total_questions": len(convergence_engine.questions),
-            "answered_questions": len(convergence_engine.answers),
-            "completed": convergence_engine.current_index >= len(convergence_engine.questions),
-            "progress": convergence_engine.get_progress(),
-            "creative_outputs": convergence_engine.creative_outputs,
-            "insights": convergence_engine.insights,
-            "recommendations": self._generate_genesis_recommendations(),
-            "limbic_metrics": metrics,
-            "user_profile": convergence_engine.user_profile,
-            "convergence_strength": metrics["convergence_strength"],
-            "readiness_score": metrics["readiness_score"]
-        }
-
-# Global genesis engine instance
-genesis_engine = GenesisEngine()
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "phase": engine.current_phase.value,
+        "total_questions": len(engine.questions),
+        "answered_questions": len(engine.answers),
+        "completed": (engine.current_question or 0) >= len(engine.questions),
+        "progress": engine.get_progress(),
+        "creative_outputs": engine.creative_outputs,
+        "insights": engine.insights,
+        "recommendations": _generate_genesis_recommendations(engine),
+        "user_preferences": engine.user_preferences
+    }
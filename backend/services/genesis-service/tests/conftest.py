@@ -0,0 +1,5 @@
+import sys
+import os
+
+# Add the genesis service sources to the path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
@@ -0,0 +1,95 @@
+import pytest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routes import genesis
+from shared.session_store import MemorySessionBackend, SessionStore
+
+FIRST_ANSWER = "A short illustrated story about a lighthouse keeper who collects lost sounds."
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(genesis, "genesis_sessions", SessionStore(MemorySessionBackend(), "genesis"))
+    app = FastAPI()
+    app.include_router(genesis.router, prefix="/genesis")
+    return TestClient(app)
+
+def answer(client, user_id, question_id, value):
+    response = client.post("/genesis/answer", json={"user_id": user_id, "question_id": question_id, "answer": value})
+    assert response.status_code == 200
+    return response.json()
+
+class TestGenesisSessions:
+    """Test cases for genesis flows kept in the session store"""
+
+    def test_start_returns_first_question(self, client):
+        """Starting a flow resets it to the first exploration question"""
+        response = client.post("/genesis/start", json={"user_id": "user-1"})
+        assert response.status_code == 200
+
+        body = response.json()
+        assert body["success"] is True
+        assert body["phase"] == "exploration"
+        assert body["total_questions"] == 29
+        assert body["first_question"]["id"] == 1
+
+    def test_answer_advances_and_is_persisted(self, client):
+        """An accepted answer moves the flow on and is visible in later requests"""
+        client.post("/genesis/start", json={"user_id": "user-1"})
+
+        body = answer(client, "user-1", 1, FIRST_ANSWER)
+        assert body["success"] is True
+        assert body["next_question"]["id"] == 2
+        assert body["creative_output"]
+
+        status = client.get("/genesis/status", params={"user_id": "user-1"}).json()
+        assert status["answered_questions"] == 1
+        assert status["progress"]["current_question"] == 2
+        assert status["completed"] is False
+
+    def test_invalid_answer_is_rejected(self, client):
+        """A too-short answer is reported and does not advance the flow"""
+        client.post("/genesis/start", json={"user_id": "user-1"})
+
+        body = answer(client, "user-1", 1, "too short")
+        assert body["success"] is False
+        assert "at least 50" in body["error"]
+        assert body["question_id"] == 1
+
+        status = client.get("/genesis/status", params={"user_id": "user-1"}).json()
+        assert status["answered_questions"] == 0
+
+    def test_flows_are_per_user(self, client):
+        """One user's answers do not show up in another user's flow"""
+        client.post("/genesis/start", json={"user_id": "user-1"})
+        client.post("/genesis/start", json={"user_id": "user-2"})
+        answer(client, "user-1", 1, FIRST_ANSWER)
+
+        status = client.get("/genesis/status", params={"user_id": "user-2"}).json()
+        assert status["answered_questions"] == 0
+
+    def test_summary_after_answers(self, client):
+        """The summary reflects the stored answers and creative outputs"""
+        client.post("/genesis/start", json={"user_id": "user-1"})
+        answer(client, "user-1", 1, FIRST_ANSWER)
+
+        summary = client.get("/genesis/summary", params={"user_id": "user-1"}).json()
+        assert summary["answered_questions"] == 1
+        assert len(summary["creative_outputs"]) == 1
+
+    @pytest.mark.parametrize("method, path, payload", [
+        ("post", "/genesis/start", {}),
+        ("post", "/genesis/answer", {"question_id": 1, "answer": FIRST_ANSWER}),
+        ("post", "/genesis/complete", {}),
+        ("get", "/genesis/status", None),
+        ("get", "/genesis/summary", None)
+    ])
+    def test_user_id_is_required(self, client, method, path, payload):
+        """Requests without a user_id are rejected instead of sharing one flow"""
+        if method == "post":
+            response = client.post(path, json=payload)
+        else:
+            response = client.get(path)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "user_id is required"
@@ -1,8 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, AsyncIterator, Dict, List, Optional
+from datetime import datetime
+import json
 
-from ...core.database import get_db
+from ...core.database import get_async_db
 from ...core.security import get_current_user
 from ...services.ai_service import ai_service
 from ...schemas.conversation import (
@@ -16,13 +20,25 @@ from ...models.conversation import Conversation, Message
 
 router = APIRouter()
 
+async def server_sent_events(events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    """Format stream events as SSE frames"""
+    async for event in events:
+        yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
 @router.post("/chat", response_model=ChatResponse)
 async def chat_completion(
     request: ChatRequest,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Create a chat completion"""
+    """Create a chat completion; streams server-sent events when request.stream is set"""
+    if request.stream:
+        return StreamingResponse(
+            server_sent_events(ai_service.chat_stream(request, current_user["id"], db)),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
     try:
         response = await ai_service.chat(request, current_user["id"], db)
         return response
@@ -36,7 +52,7 @@ async def chat_completion(
 async def text_completion(
     request: CompletionRequest,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a text completion"""
     try:
@@ -52,7 +68,7 @@ async def text_completion(
 async def create_embeddings(
     request: EmbeddingRequest,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create text embeddings"""
     try:
@@ -68,7 +84,7 @@ async def create_embeddings(
 async def analyze_sentiment(
     request: SentimentRequest,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Analyze text sentiment"""
     try:
@@ -84,7 +100,7 @@ async def analyze_sentiment(
 async def extract_entities(
     request: EntityRequest,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Extract entities from text"""
     try:
@@ -100,7 +116,7 @@ async def extract_entities(
 async def summarize_text(
     request: SummaryRequest,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Summarize text"""
     try:
@@ -116,7 +132,7 @@ async def summarize_text(
 async def translate_text(
     request: TranslationRequest,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Translate text"""
     try:
@@ -133,22 +149,34 @@ async def get_conversations(
     limit: int = 20,
     offset: int = 0,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get user's conversations"""
     try:
-        conversations = db.query(Conversation).filter(
-            Conversation.user_id == current_user["id"]
-        ).order_by(Conversation.updated_at.desc()).offset(offset).limit(limit).all()
+        result = await db.execute(
+            select(Conversation)
+            .where(Conversation.user_id == current_user["id"])
+            .order_by(Conversation.updated_at.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+        conversations = result.scalars().all()
+        
+        # One query for every listed conversation's messages
+        messages_by_conversation = {conv.id: [] for conv in conversations}
+        if conversations:
+            result = await db.execute(
+                select(Message)
+                .where(Message.conversation_id.in_(list(messages_by_conversation)))
+                .order_by(Message.created_at)
+            )
+            for message in result.scalars():
+                messages_by_conversation[message.conversation_id].append(message)
         
         response = []
         for conv in conversations:
-            messages = db.query(Message).filter(
-                Message.conversation_id == conv.id
-            ).order_by(Message.created_at).all()
-            
             conv_response = ConversationResponse.from_orm(conv)
-            conv_response.messages = messages
+            conv_response.messages = messages_by_conversation[conv.id]
             response.append(conv_response)
         
         return response
@@ -162,7 +190,7 @@ async def get_conversations(
 async def create_conversation(
     conversation: ConversationCreate,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new conversation"""
     try:
@@ -171,8 +199,8 @@ async def create_conversation(
             **conversation.dict()
         )
         db.add(conv)
-        db.commit()
-        db.refresh(conv)
+        await db.commit()
+        await db.refresh(conv)
         
         return ConversationResponse.from_orm(conv)
     except Exception as e:
@@ -185,14 +213,17 @@ async def create_conversation(
 async def get_conversation(
     conversation_id: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific conversation"""
     try:
-        conversation = db.query(Conversation).filter(
-            Conversation.id == conversation_id,
-            Conversation.user_id == current_user["id"]
-        ).first()
+        result = await db.execute(
+            select(Conversation).where(
+                Conversation.id == conversation_id,
+                Conversation.user_id == current_user["id"]
+            )
+        )
+        conversation = result.scalar_one_or_none()
         
         if not conversation:
             raise HTTPException(
@@ -200,9 +231,12 @@ async def get_conversation(
                 detail="Conversation not found"
             )
         
-        messages = db.query(Message).filter(
-            Message.conversation_id == conversation.id
-        ).order_by(Message.created_at).all()
+        result = await db.execute(
+            select(Message)
+            .where(Message.conversation_id == conversation.id)
+            .order_by(Message.created_at)
+        )
+        messages = result.scalars().all()
         
         response = ConversationResponse.from_orm(conversation)
         response.messages = messages
@@ -221,14 +255,17 @@ async def update_conversation(
     conversation_id: str,
     conversation_update: ConversationUpdate,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a conversation"""
     try:
-        conversation = db.query(Conversation).filter(
-            Conversation.id == conversation_id,
-            Conversation.user_id == current_user["id"]
-        ).first()
+        result = await db.execute(
+            select(Conversation).where(
+                Conversation.id == conversation_id,
+                Conversation.user_id == current_user["id"]
+            )
+        )
+        conversation = result.scalar_one_or_none()
         
         if not conversation:
             raise HTTPException(
@@ -240,8 +277,8 @@ async def update_conversation(
         for field, value in update_data.items():
             setattr(conversation, field, value)
         
-        db.commit()
-        db.refresh(conversation)
+        await db.commit()
+        await db.refresh(conversation)
         
         return ConversationResponse.from_orm(conversation)
     except HTTPException:
@@ -256,14 +293,17 @@ async def update_conversation(
 async def delete_conversation(
     conversation_id: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a conversation"""
     try:
-        conversation = db.query(Conversation).filter(
-            Conversation.id == conversation_id,
-            Conversation.user_id == current_user["id"]
-        ).first()
+        result = await db.execute(
+            select(Conversation).where(
+                Conversation.id == conversation_id,
+                Conversation.user_id == current_user["id"]
+            )
+        )
+        conversation = result.scalar_one_or_none()
         
         if not conversation:
             raise HTTPException(
@@ -271,8 +311,8 @@ async def delete_conversation(
                 detail="Conversation not found"
             )
         
-        db.delete(conversation)
-        db.commit()
+        await db.delete(conversation)
+        await db.commit()
         
         return {"message": "Conversation deleted successfully"}
     except HTTPException:
@@ -282,3 +322,18 @@ async def delete_conversation(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
+
+@router.get("/usage")
+async def get_usage(
+    since: Optional[datetime] = None,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the user's request count, tokens and cost per model, including not-yet-flushed usage"""
+    try:
+        return await ai_service.usage_recorder.user_costs(db, current_user["id"], since)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from datetime import datetime
 import psutil
@@ -6,6 +7,7 @@ import asyncio
 
 from ...core.database import get_db, check_db_connection
 from ...core.config import settings
+from ...services.ai_service import ai_service
 
 router = APIRouter()
 
@@ -31,6 +33,7 @@ async def health_check(db: Session = Depends(get_db)):
         
         # Check AI services
         ai_services_healthy = await check_ai_services()
+        process_memory = psutil.Process().memory_info()
         
         # Determine overall status
         checks = {
@@ -61,7 +64,12 @@ async def health_check(db: Session = Depends(get_db)):
                     "disk_percent": disk.percent,
                     "memory_available": memory.available,
                     "disk_free": disk.free
-                }
+                },
+                "process": {
+                    "resident_memory_bytes": process_memory.rss
+                },
+                "startup": ai_service.get_startup_stats(),
+                "chat_providers": ai_service.provider_router.get_stats()
             }
         )
     except Exception as e:
@@ -140,19 +148,17 @@ async def check_ai_services() -> bool:
     try:
         # Check OpenAI
         if settings.OPENAI_API_KEY:
-            import openai
-            openai.Model.list()
+            await ai_service.openai_client.models.list()
         
         # Check Anthropic
         if settings.ANTHROPIC_API_KEY:
-            from ...services.ai_service import ai_service
             if hasattr(ai_service, 'anthropic_client'):
                 # Simple test call
                 pass
         
-        # Check local models
-        if hasattr(ai_service, 'local_models') and ai_service.local_models:
-            return True
+        # Local models load on demand; only a model that failed to load is unhealthy
+        if ai_service.local_models.get_stats()["errors"]:
+            return False
         
         return True
     except Exception:
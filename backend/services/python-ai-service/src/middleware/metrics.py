@@ -1,28 +1,39 @@
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import Response
 from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
+from starlette.routing import WebSocketRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import time
 import logging
+from typing import Dict, Optional, Tuple
 from ..core.config import settings
 
 logger = logging.getLogger(__name__)
 
-# Prometheus metrics
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def parse_buckets(value: str) -> Tuple[float, ...]:
+    """Parse comma-separated histogram bucket bounds from config"""
+    buckets = sorted(float(bound) for bound in value.split(",") if bound.strip())
+    return tuple(buckets) or DEFAULT_LATENCY_BUCKETS
+
+# Prometheus metrics; HTTP series are labelled by route template, never the raw path
 REQUEST_COUNT = Counter(
     'http_requests_total',
     'Total HTTP requests',
-    ['method', 'endpoint', 'status_code']
+    ['method', 'route', 'status_code']
 )
 
 REQUEST_DURATION = Histogram(
     'http_request_duration_seconds',
     'HTTP request duration in seconds',
-    ['method', 'endpoint']
+    ['method', 'route'],
+    buckets=parse_buckets(settings.METRICS_LATENCY_BUCKETS)
 )
 
-ACTIVE_CONNECTIONS = Gauge(
-    'active_connections',
-    'Number of active connections'
+REQUESTS_IN_PROGRESS = Gauge(
+    'http_requests_in_progress',
+    'HTTP requests currently being handled',
+    ['method', 'route']
 )
 
 MODEL_REQUESTS = Counter(
@@ -37,49 +48,114 @@ MODEL_RESPONSE_TIME = Histogram(
     ['model', 'request_type']
 )
 
-class MetricsMiddleware(BaseHTTPMiddleware):
-    """Middleware to collect Prometheus metrics"""
+CHAT_TIME_TO_FIRST_TOKEN = Histogram(
+    'chat_time_to_first_token_seconds',
+    'Time from a streaming chat request to its first generated token',
+    ['model'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+)
+
+RESPONSE_CACHE_REQUESTS = Counter(
+    'response_cache_requests_total',
+    'Analysis response cache lookups by result (exact, semantic or miss)',
+    ['kind', 'result']
+)
+
+KNOWN_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+UNMATCHED_ROUTE = "<unmatched>"
+OVERFLOW_ROUTE = "<other>"
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route request count, latency and in-flight requests
+
+    The route label is the matched route's path template (``/conversations/{conversation_id}``),
+    so ids in paths don't mint new series. Unmatched paths share one label, and once
+    ``max_routes`` distinct templates have been seen any further ones share another.
+    Label children are cached per (method, route), so a request costs a route match,
+    two gauge updates, one counter increment and one histogram observation.
+    """
+    
+    def __init__(self, app: ASGIApp, max_routes: int = settings.METRICS_MAX_ROUTES):
+        self.app = app
+        self.max_routes = max_routes
+        self.routes: set = set()
+        self.children: Dict[Tuple[str, str], Tuple[Gauge, Histogram]] = {}
+        self.counters: Dict[Tuple[str, str, int], Counter] = {}
     
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Increment active connections
-        ACTIVE_CONNECTIONS.inc()
+        method = scope["method"] if scope["method"] in KNOWN_METHODS else "OTHER"
+        route = self._route_label(scope)
+        in_progress, duration = self._children(method, route)
+        status_code = 500
         
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        in_progress.inc()
+        start_time = time.perf_counter()
         try:
-            response = await call_next(request)
-            
-            # Record request metrics
-            method = request.method
-            endpoint = request.url.path
-            status_code = str(response.status_code)
-            
-            REQUEST_COUNT.labels(
-                method=method,
-                endpoint=endpoint,
-                status_code=status_code
-            ).inc()
-            
-            duration = time.time() - start_time
-            REQUEST_DURATION.labels(
-                method=method,
-                endpoint=endpoint
-            ).observe(duration)
-            
-            return response
-            
-        except Exception as e:
-            # Record error metrics
-            REQUEST_COUNT.labels(
-                method=request.method,
-                endpoint=request.url.path,
-                status_code="500"
-            ).inc()
-            
-            raise e
+            await self.app(scope, receive, send_wrapper)
         finally:
-            # Decrement active connections
-            ACTIVE_CONNECTIONS.dec()
+            duration.observe(time.perf_counter() - start_time)
+            in_progress.dec()
+            self._counter(method, route, status_code).inc()
+    
+    def _route_label(self, scope: Scope) -> str:
+        template = self._match(scope)
+        if template is None:
+            return UNMATCHED_ROUTE
+        if template not in self.routes:
+            if len(self.routes) >= self.max_routes:
+                return OVERFLOW_ROUTE
+            self.routes.add(template)
+        return template
+    
+    @staticmethod
+    def _match(scope: Scope) -> Optional[str]:
+        """Path template of the route the router will dispatch to, if any"""
+        router = getattr(scope.get("app"), "router", None)
+        if router is None:
+            return None
+        # Same outcome as route.matches() without building a child scope per route
+        path, method = scope["path"], scope["method"]
+        partial = None
+        for route in router.routes:
+            path_regex = getattr(route, "path_regex", None)
+            if path_regex is None or isinstance(route, WebSocketRoute) or not path_regex.match(path):
+                continue
+            methods = getattr(route, "methods", None)
+            if methods is None or method in methods:
+                return route.path_format
+            if partial is None:
+                # Path matched but not the method; the router answers 405
+                partial = route.path_format
+        return partial
+    
+    def _children(self, method: str, route: str) -> Tuple[Gauge, Histogram]:
+        key = (method, route)
+        children = self.children.get(key)
+        if children is None:
+            children = (
+                REQUESTS_IN_PROGRESS.labels(method, route),
+                REQUEST_DURATION.labels(method, route)
+            )
+            self.children[key] = children
+        return children
+    
+    def _counter(self, method: str, route: str, status_code: int) -> Counter:
+        key = (method, route, status_code)
+        counter = self.counters.get(key)
+        if counter is None:
+            counter = REQUEST_COUNT.labels(method, route, str(status_code))
+            self.counters[key] = counter
+        return counter
     
     @staticmethod
     def record_model_request(model: str, request_type: str, status: str, duration: float):
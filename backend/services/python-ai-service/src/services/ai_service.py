@@ -1,85 +1,157 @@
-from typing import List, Dict, Any, Optional
+import time
+from typing import AsyncIterator, List, Dict, Any, Optional
 import openai
 import anthropic
-from transformers import pipeline, AutoTokenizer, AutoModel
-import torch
-import numpy as np
 from datetime import datetime
 import uuid
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..core import database
 from ..core.config import settings
-from ..models.conversation import Conversation, Message, ModelUsage
+from ..middleware.metrics import CHAT_TIME_TO_FIRST_TOKEN, MetricsMiddleware
+from ..models.conversation import Conversation, Message
 from ..schemas.conversation import (
     ChatRequest, ChatResponse, CompletionRequest, CompletionResponse,
     EmbeddingRequest, EmbeddingResponse, SentimentRequest, SentimentResponse,
     EntityRequest, EntityResponse, SummaryRequest, SummaryResponse,
     TranslationRequest, TranslationResponse
 )
+from .context_window import ContextWindow, count_tokens
+from .embeddings import EmbeddingBatcher, EmbeddingCache
+from .local_inference import LocalInferenceScheduler
+from .model_pool import ModelLoadError, ModelPool, parse_model_names
+from .provider_limits import ProviderLimiter
+from .provider_router import ProviderRouter, parse_fallbacks
+from .response_cache import ResponseCache
+from .usage_recorder import UsageRecorder
 
 class AIService:
-    def __init__(self):
+    def __init__(
+        self,
+        openai_client: Optional[openai.AsyncOpenAI] = None,
+        anthropic_client: Optional[anthropic.AsyncAnthropic] = None,
+        model_pool: Optional[ModelPool] = None
+    ):
+        init_start = time.perf_counter()
+        self.started_at = time.time()
+        self.openai_client = openai_client
+        self.anthropic_client = anthropic_client
+        self.limiter = ProviderLimiter({
+            "openai": settings.OPENAI_MAX_CONCURRENCY,
+            "anthropic": settings.ANTHROPIC_MAX_CONCURRENCY
+        })
+        # Hedged, circuit-broken routing of chat calls to fallback models
+        self.provider_router = ProviderRouter(
+            fallbacks=parse_fallbacks(settings.CHAT_MODEL_FALLBACKS),
+            hedge_delay=settings.CHAT_HEDGE_DELAY if settings.CHAT_HEDGE_DELAY > 0 else None,
+            hedge_quantile=settings.CHAT_HEDGE_QUANTILE,
+            timeout=settings.CHAT_MODEL_TIMEOUT,
+            failure_threshold=settings.CHAT_CIRCUIT_FAILURES,
+            reset_timeout=settings.CHAT_CIRCUIT_RESET_SECONDS
+        )
+        self.embedding_cache = EmbeddingCache(
+            max_entries=settings.EMBEDDING_CACHE_SIZE,
+            store_path=settings.EMBEDDING_STORE_PATH
+        )
+        self.embedding_batcher = EmbeddingBatcher(
+            self._embed_batch,
+            max_batch_size=settings.EMBEDDING_BATCH_SIZE,
+            max_wait=settings.EMBEDDING_BATCH_WAIT_MS / 1000
+        )
+        # Summaries are folded in the background in their own sessions. Session
+        # factories read database.AsyncSessionLocal on each call, since this
+        # service is built at import time, before the engine may be configured
+        self.context_window = ContextWindow(
+            self._summarize_context,
+            lambda: database.AsyncSessionLocal(),
+            token_budget=settings.CONTEXT_TOKEN_BUDGET,
+            page_size=settings.CONTEXT_PAGE_SIZE,
+            fold_batch=settings.CONTEXT_FOLD_BATCH,
+            fold_target=settings.CONTEXT_FOLD_TARGET
+        )
+        # Local pipelines load on first use and are evicted beyond the memory budget
+        self.local_models = model_pool if model_pool is not None else ModelPool(
+            memory_budget=settings.LOCAL_MODEL_MEMORY_BUDGET_MB * 1024 * 1024
+        )
+        # Local pipelines are CPU-bound and synchronous; batch them off the event loop
+        self.local_inference = LocalInferenceScheduler(
+            self.local_models,
+            max_batch_size=settings.LOCAL_INFERENCE_MAX_BATCH_SIZE,
+            max_wait=settings.LOCAL_INFERENCE_MAX_WAIT_MS / 1000
+        )
+        # Usage rows are buffered and bulk-inserted off the request path
+        self.usage_recorder = UsageRecorder(
+            lambda: database.AsyncSessionLocal(),
+            spool_dir=settings.USAGE_SPOOL_DIR,
+            batch_size=settings.USAGE_FLUSH_BATCH_SIZE,
+            flush_interval=settings.USAGE_FLUSH_INTERVAL
+        )
         self._setup_openai()
         self._setup_anthropic()
-        self._setup_local_models()
+        # Deterministic analysis results; near-duplicate lookup needs OpenAI embeddings
+        self.response_cache = ResponseCache(
+            max_entries=settings.RESPONSE_CACHE_SIZE,
+            ttl=settings.RESPONSE_CACHE_TTL,
+            embedder=self._response_cache_embedding if self.openai_client else None,
+            similarity_threshold=settings.RESPONSE_CACHE_SIMILARITY_THRESHOLD,
+            semantic_kinds=tuple(parse_model_names(settings.RESPONSE_CACHE_SEMANTIC_KINDS))
+        )
+        self.init_seconds = time.perf_counter() - init_start
+        self.warm_up_seconds: Optional[float] = None
     
     def _setup_openai(self):
         """Setup OpenAI client"""
-        if settings.OPENAI_API_KEY:
-            openai.api_key = settings.OPENAI_API_KEY
+        if self.openai_client is None and settings.OPENAI_API_KEY:
+            self.openai_client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
     
     def _setup_anthropic(self):
         """Setup Anthropic client"""
-        if settings.ANTHROPIC_API_KEY:
-            self.anthropic_client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+        if self.anthropic_client is None and settings.ANTHROPIC_API_KEY:
+            self.anthropic_client = anthropic.AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
     
-    def _setup_local_models(self):
-        """Setup local ML models"""
-        self.local_models = {}
-        try:
-            # Sentiment analysis
-            self.local_models['sentiment'] = pipeline(
-                "sentiment-analysis",
-                model="cardiffnlp/twitter-roberta-base-sentiment-latest"
-            )
-            
-            # Named entity recognition
-            self.local_models['ner'] = pipeline(
-                "ner",
-                model="dbmdz/bert-large-cased-finetuned-conll03-english",
-                aggregation_strategy="simple"
-            )
-            
-            # Summarization
-            self.local_models['summarization'] = pipeline(
-                "summarization",
-                model="facebook/bart-large-cnn"
-            )
-            
-            # Translation (example for English to German)
-            self.local_models['translation'] = pipeline(
-                "translation_en_to_de",
-                model="Helsinki-NLP/opus-mt-en-de"
-            )
-            
-        except Exception as e:
-            print(f"Warning: Failed to load local models: {e}")
+    async def warm_up(self, names: Optional[List[str]] = None) -> Dict[str, Optional[str]]:
+        """Startup hook: recover usage spools and pre-load local models (LOCAL_MODEL_PREWARM by default)"""
+        start = time.perf_counter()
+        await self.usage_recorder.start()
+        results = await self.local_models.warm(
+            names if names is not None else parse_model_names(settings.LOCAL_MODEL_PREWARM)
+        )
+        self.warm_up_seconds = time.perf_counter() - start
+        for name, error in results.items():
+            if error:
+                print(f"Warning: Failed to pre-load local model {name}: {error}")
+        return results
     
-    async def chat(self, request: ChatRequest, user_id: str, db: Session) -> ChatResponse:
+    def get_startup_stats(self) -> Dict[str, Any]:
+        """Startup timings and local model pool state for health reporting"""
+        return {
+            "init_seconds": round(self.init_seconds, 3),
+            "warm_up_seconds": round(self.warm_up_seconds, 3) if self.warm_up_seconds is not None else None,
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "local_models": self.local_models.get_stats()
+        }
+    
+    async def chat(self, request: ChatRequest, user_id: str, db: AsyncSession) -> ChatResponse:
         """Handle chat completion"""
         start_time = datetime.utcnow()
         
         try:
             # Get or create conversation
             if request.conversation_id:
-                conversation = db.query(Conversation).filter(
-                    Conversation.id == request.conversation_id,
-                    Conversation.user_id == user_id
-                ).first()
+                result = await db.execute(
+                    select(Conversation).where(
+                        Conversation.id == request.conversation_id,
+                        Conversation.user_id == user_id
+                    )
+                )
+                conversation = result.scalar_one_or_none()
                 if not conversation:
                     raise ValueError("Conversation not found")
             else:
+                # Id assigned client-side so no flush is needed before the history is read
                 conversation = Conversation(
+                    id=uuid.uuid4(),
                     user_id=user_id,
                     title=request.message[:50] + "..." if len(request.message) > 50 else request.message,
                     model=request.model or settings.DEFAULT_CHAT_MODEL,
@@ -87,28 +159,22 @@ class AIService:
                     max_tokens=request.max_tokens or settings.MAX_TOKENS
                 )
                 db.add(conversation)
-                db.commit()
-                db.refresh(conversation)
+            
+            # Token-budgeted history: rolling summary plus the most recent turns
+            api_messages = await self.context_window.build(db, conversation, request.message)
+            # Hand the connection back to the pool for the model call; only a new
+            # conversation or newly cached token counts are written here
+            await db.commit()
             
             # Add user message
             user_message = Message(
                 conversation_id=conversation.id,
                 role="user",
-                content=request.message
+                content=request.message,
+                token_count=count_tokens(request.message)
             )
             db.add(user_message)
             
-            # Get conversation history
-            messages = db.query(Message).filter(
-                Message.conversation_id == conversation.id
-            ).order_by(Message.created_at).all()
-            
-            # Format messages for API
-            api_messages = [
-                {"role": msg.role, "content": msg.content}
-                for msg in messages
-            ]
-            
             # Call AI model
             response = await self._call_chat_model(
                 messages=api_messages,
@@ -122,9 +188,10 @@ class AIService:
                 conversation_id=conversation.id,
                 role="assistant",
                 content=response["content"],
-                model=conversation.model,
+                model=response["model"],
                 tokens_used=response["usage"]["total_tokens"],
-                cost=self._calculate_cost(conversation.model, response["usage"])
+                token_count=count_tokens(response["content"]),
+                cost=self._calculate_cost(response["model"], response["usage"])
             )
             db.add(assistant_message)
             
@@ -132,24 +199,24 @@ class AIService:
             conversation.updated_at = datetime.utcnow()
             
             # Record usage
-            usage = ModelUsage(
+            self.usage_recorder.record(
                 user_id=user_id,
-                model=conversation.model,
+                model=response["model"],
                 request_type="chat",
                 tokens_used=response["usage"]["total_tokens"],
                 cost=assistant_message.cost,
                 response_time=(datetime.utcnow() - start_time).total_seconds(),
                 status="success"
             )
-            db.add(usage)
             
-            db.commit()
+            await db.commit()
+            self.context_window.schedule_fold(conversation.id)
             
             return ChatResponse(
                 id=assistant_message.id,
                 conversation_id=conversation.id,
                 message=response["content"],
-                model=conversation.model,
+                model=response["model"],
                 usage=response["usage"],
                 metadata={
                     "processing_time": (datetime.utcnow() - start_time).total_seconds()
@@ -160,7 +227,7 @@ class AIService:
         except Exception as e:
             # Record error usage
             if 'conversation' in locals():
-                usage = ModelUsage(
+                self.usage_recorder.record(
                     user_id=user_id,
                     model=request.model or settings.DEFAULT_CHAT_MODEL,
                     request_type="chat",
@@ -170,12 +237,160 @@ class AIService:
                     status="error",
                     error_message=str(e)
                 )
-                db.add(usage)
-                db.commit()
             
             raise e
     
-    async def complete(self, request: CompletionRequest, user_id: str, db: Session) -> CompletionResponse:
+    async def chat_stream(self, request: ChatRequest, user_id: str, db: AsyncSession) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a chat completion as start/delta/done (or error) events
+        
+        Nothing is written to the database until generation finishes, so the
+        first token is never held up behind commits. The user message, the
+        assistant message and the usage row are persisted together at the end.
+        """
+        start_time = datetime.utcnow()
+        started = time.perf_counter()
+        
+        if request.conversation_id:
+            result = await db.execute(
+                select(Conversation).where(
+                    Conversation.id == request.conversation_id,
+                    Conversation.user_id == user_id
+                )
+            )
+            conversation = result.scalar_one_or_none()
+            if not conversation:
+                yield {"type": "error", "error": "Conversation not found"}
+                return
+            
+            api_messages = await self.context_window.build(db, conversation, request.message)
+            # Don't hold a pooled connection for the length of the stream
+            await db.commit()
+        else:
+            conversation = Conversation(
+                id=uuid.uuid4(),
+                user_id=user_id,
+                title=request.message[:50] + "..." if len(request.message) > 50 else request.message,
+                model=request.model or settings.DEFAULT_CHAT_MODEL,
+                temperature=request.temperature or settings.TEMPERATURE,
+                max_tokens=request.max_tokens or settings.MAX_TOKENS
+            )
+            api_messages = [{"role": "user", "content": request.message}]
+        
+        model = conversation.model
+        
+        yield {"type": "start", "conversation_id": str(conversation.id), "model": model}
+        
+        chunks = []
+        usage = None
+        time_to_first_token = None
+        
+        try:
+            async for event in self._stream_chat_model(
+                messages=api_messages,
+                model=model,
+                temperature=conversation.temperature,
+                max_tokens=conversation.max_tokens
+            ):
+                if "usage" in event:
+                    usage = event["usage"]
+                    continue
+                
+                if time_to_first_token is None:
+                    time_to_first_token = time.perf_counter() - started
+                    CHAT_TIME_TO_FIRST_TOKEN.labels(model=model).observe(time_to_first_token)
+                
+                chunks.append(event["delta"])
+                yield {"type": "delta", "content": event["delta"]}
+                
+        except Exception as e:
+            MetricsMiddleware.record_model_request(model, "chat_stream", "error", time.perf_counter() - started)
+            self.usage_recorder.record(
+                user_id=user_id,
+                model=model,
+                request_type="chat",
+                tokens_used=0,
+                cost=0.0,
+                response_time=(datetime.utcnow() - start_time).total_seconds(),
+                status="error",
+                error_message=str(e)
+            )
+            
+            yield {"type": "error", "error": str(e)}
+            return
+        
+        content = "".join(chunks)
+        usage = usage or self._estimate_usage(api_messages, content)
+        cost = self._calculate_cost(model, usage)
+        
+        # Persist the whole turn in one transaction
+        try:
+            if not request.conversation_id:
+                db.add(conversation)
+            db.add(Message(
+                conversation_id=conversation.id,
+                role="user",
+                content=request.message,
+                token_count=count_tokens(request.message),
+                created_at=start_time
+            ))
+            assistant_message = Message(
+                conversation_id=conversation.id,
+                role="assistant",
+                content=content,
+                model=model,
+                tokens_used=usage["total_tokens"],
+                token_count=count_tokens(content),
+                cost=cost,
+                created_at=datetime.utcnow()
+            )
+            db.add(assistant_message)
+            conversation.updated_at = datetime.utcnow()
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            MetricsMiddleware.record_model_request(model, "chat_stream", "error", time.perf_counter() - started)
+            # The tokens were generated and billed even though the turn is lost
+            self.usage_recorder.record(
+                user_id=user_id,
+                model=model,
+                request_type="chat",
+                tokens_used=usage["total_tokens"],
+                cost=cost,
+                response_time=(datetime.utcnow() - start_time).total_seconds(),
+                status="error",
+                error_message=f"Failed to save conversation: {e}"
+            )
+            
+            yield {"type": "error", "error": f"Failed to save conversation: {e}"}
+            return
+        
+        self.context_window.schedule_fold(conversation.id)
+        self.usage_recorder.record(
+            user_id=user_id,
+            model=model,
+            request_type="chat",
+            tokens_used=usage["total_tokens"],
+            cost=cost,
+            response_time=(datetime.utcnow() - start_time).total_seconds(),
+            status="success"
+        )
+        
+        processing_time = time.perf_counter() - started
+        MetricsMiddleware.record_model_request(model, "chat_stream", "success", processing_time)
+        
+        yield {
+            "type": "done",
+            "id": str(assistant_message.id),
+            "conversation_id": str(conversation.id),
+            "model": model,
+            "usage": usage,
+            "metadata": {
+                "processing_time": processing_time,
+                "time_to_first_token": time_to_first_token
+            }
+        }
+    
+    async def complete(self, request: CompletionRequest, user_id: str, db: AsyncSession) -> CompletionResponse:
         """Handle text completion"""
         start_time = datetime.utcnow()
         
@@ -191,7 +406,7 @@ class AIService:
             )
             
             # Record usage
-            usage = ModelUsage(
+            self.usage_recorder.record(
                 user_id=user_id,
                 model=model,
                 request_type="completion",
@@ -200,8 +415,6 @@ class AIService:
                 response_time=(datetime.utcnow() - start_time).total_seconds(),
                 status="success"
             )
-            db.add(usage)
-            db.commit()
             
             return CompletionResponse(
                 id=uuid.uuid4(),
@@ -216,7 +429,7 @@ class AIService:
             
         except Exception as e:
             # Record error usage
-            usage = ModelUsage(
+            self.usage_recorder.record(
                 user_id=user_id,
                 model=request.model or settings.DEFAULT_CHAT_MODEL,
                 request_type="completion",
@@ -226,12 +439,10 @@ class AIService:
                 status="error",
                 error_message=str(e)
             )
-            db.add(usage)
-            db.commit()
             
             raise e
     
-    async def embed(self, request: EmbeddingRequest, user_id: str, db: Session) -> EmbeddingResponse:
+    async def embed(self, request: EmbeddingRequest, user_id: str, db: AsyncSession) -> EmbeddingResponse:
         """Handle text embedding"""
         start_time = datetime.utcnow()
         
@@ -244,7 +455,7 @@ class AIService:
             )
             
             # Record usage
-            usage = ModelUsage(
+            self.usage_recorder.record(
                 user_id=user_id,
                 model=model,
                 request_type="embedding",
@@ -253,8 +464,6 @@ class AIService:
                 response_time=(datetime.utcnow() - start_time).total_seconds(),
                 status="success"
             )
-            db.add(usage)
-            db.commit()
             
             return EmbeddingResponse(
                 id=uuid.uuid4(),
@@ -264,14 +473,15 @@ class AIService:
                 embedding=response["embedding"],
                 usage=response["usage"],
                 metadata={
-                    "processing_time": (datetime.utcnow() - start_time).total_seconds()
+                    "processing_time": (datetime.utcnow() - start_time).total_seconds(),
+                    "cached": response["cached"]
                 },
                 created_at=datetime.utcnow()
             )
             
         except Exception as e:
             # Record error usage
-            usage = ModelUsage(
+            self.usage_recorder.record(
                 user_id=user_id,
                 model=request.model or settings.DEFAULT_EMBEDDING_MODEL,
                 request_type="embedding",
@@ -281,45 +491,24 @@ class AIService:
                 status="error",
                 error_message=str(e)
             )
-            db.add(usage)
-            db.commit()
             
             raise e
     
-    async def analyze_sentiment(self, request: SentimentRequest, user_id: str, db: Session) -> SentimentResponse:
+    async def analyze_sentiment(self, request: SentimentRequest, user_id: str, db: AsyncSession) -> SentimentResponse:
         """Handle sentiment analysis"""
         start_time = datetime.utcnow()
         
         try:
-            # Use local model for sentiment analysis
-            if 'sentiment' in self.local_models:
-                result = self.local_models['sentiment'](request.text)[0]
-                
-                # Map labels to standard format
-                label_map = {
-                    'LABEL_0': 'negative',
-                    'LABEL_1': 'neutral', 
-                    'LABEL_2': 'positive'
-                }
-                
-                sentiment = label_map.get(result['label'], 'neutral')
-                confidence = result['score']
-                
-                scores = {
-                    'negative': result['score'] if result['label'] == 'LABEL_0' else 0.0,
-                    'neutral': result['score'] if result['label'] == 'LABEL_1' else 0.0,
-                    'positive': result['score'] if result['label'] == 'LABEL_2' else 0.0,
-                }
-                
-            else:
-                # Fallback to OpenAI
-                response = await self._call_sentiment_model(request.text)
-                sentiment = response['sentiment']
-                confidence = response['confidence']
-                scores = response['scores']
+            result, cached = await self.response_cache.get_or_compute(
+                "sentiment",
+                self._analysis_model('sentiment'),
+                {},
+                request.text,
+                lambda: self._analyze_sentiment(request.text)
+            )
             
             # Record usage
-            usage = ModelUsage(
+            self.usage_recorder.record(
                 user_id=user_id,
                 model="local/sentiment",
                 request_type="sentiment",
@@ -328,17 +517,16 @@ class AIService:
                 response_time=(datetime.utcnow() - start_time).total_seconds(),
                 status="success"
             )
-            db.add(usage)
-            db.commit()
             
             return SentimentResponse(
                 id=uuid.uuid4(),
                 text=request.text,
-                sentiment=sentiment,
-                confidence=confidence,
-                scores=scores,
+                sentiment=result['sentiment'],
+                confidence=result['confidence'],
+                scores=result['scores'],
                 metadata={
-                    "processing_time": (datetime.utcnow() - start_time).total_seconds()
+                    "processing_time": (datetime.utcnow() - start_time).total_seconds(),
+                    "cached": cached
                 },
                 created_at=datetime.utcnow()
             )
@@ -346,31 +534,21 @@ class AIService:
         except Exception as e:
             raise e
     
-    async def extract_entities(self, request: EntityRequest, user_id: str, db: Session) -> EntityResponse:
+    async def extract_entities(self, request: EntityRequest, user_id: str, db: AsyncSession) -> EntityResponse:
         """Handle entity extraction"""
         start_time = datetime.utcnow()
         
         try:
-            # Use local model for NER
-            if 'ner' in self.local_models:
-                results = self.local_models['ner'](request.text)
-                
-                entities = []
-                for entity in results:
-                    entities.append({
-                        'text': entity['word'],
-                        'label': entity['entity_group'],
-                        'confidence': entity['score'],
-                        'start': entity.get('start', 0),
-                        'end': entity.get('end', len(entity['word']))
-                    })
-            else:
-                # Fallback to OpenAI
-                response = await self._call_entity_model(request.text)
-                entities = response['entities']
+            result, cached = await self.response_cache.get_or_compute(
+                "entities",
+                self._analysis_model('ner'),
+                {},
+                request.text,
+                lambda: self._extract_entities(request.text)
+            )
             
             # Record usage
-            usage = ModelUsage(
+            self.usage_recorder.record(
                 user_id=user_id,
                 model="local/ner",
                 request_type="entity",
@@ -379,15 +557,14 @@ class AIService:
                 response_time=(datetime.utcnow() - start_time).total_seconds(),
                 status="success"
             )
-            db.add(usage)
-            db.commit()
             
             return EntityResponse(
                 id=uuid.uuid4(),
                 text=request.text,
-                entities=entities,
+                entities=result['entities'],
                 metadata={
-                    "processing_time": (datetime.utcnow() - start_time).total_seconds()
+                    "processing_time": (datetime.utcnow() - start_time).total_seconds(),
+                    "cached": cached
                 },
                 created_at=datetime.utcnow()
             )
@@ -395,27 +572,22 @@ class AIService:
         except Exception as e:
             raise e
     
-    async def summarize(self, request: SummaryRequest, user_id: str, db: Session) -> SummaryResponse:
+    async def summarize(self, request: SummaryRequest, user_id: str, db: AsyncSession) -> SummaryResponse:
         """Handle text summarization"""
         start_time = datetime.utcnow()
         
         try:
-            # Use local model for summarization
-            if 'summarization' in self.local_models:
-                result = self.local_models['summarization'](
-                    request.text,
-                    max_length=request.max_length or 200,
-                    do_sample=False
-                )[0]
-                
-                summary = result['summary_text']
-            else:
-                # Fallback to OpenAI
-                response = await self._call_summary_model(request)
-                summary = response['summary']
+            result, cached = await self.response_cache.get_or_compute(
+                "summary",
+                self._analysis_model('summarization'),
+                {"max_length": request.max_length, "style": request.style},
+                request.text,
+                lambda: self._summarize(request)
+            )
+            summary = result['summary']
             
             # Record usage
-            usage = ModelUsage(
+            self.usage_recorder.record(
                 user_id=user_id,
                 model="local/summarization",
                 request_type="summary",
@@ -424,8 +596,6 @@ class AIService:
                 response_time=(datetime.utcnow() - start_time).total_seconds(),
                 status="success"
             )
-            db.add(usage)
-            db.commit()
             
             return SummaryResponse(
                 id=uuid.uuid4(),
@@ -439,7 +609,8 @@ class AIService:
                 },
                 usage={"tokens": 0},
                 metadata={
-                    "processing_time": (datetime.utcnow() - start_time).total_seconds()
+                    "processing_time": (datetime.utcnow() - start_time).total_seconds(),
+                    "cached": cached
                 },
                 created_at=datetime.utcnow()
             )
@@ -447,26 +618,22 @@ class AIService:
         except Exception as e:
             raise e
     
-    async def translate(self, request: TranslationRequest, user_id: str, db: Session) -> TranslationResponse:
+    async def translate(self, request: TranslationRequest, user_id: str, db: AsyncSession) -> TranslationResponse:
         """Handle text translation"""
         start_time = datetime.utcnow()
         
         try:
-            # Use local model for translation (if available for the language pair)
             translation_key = f"translation_{request.source_language}_to_{request.target_language}"
-            
-            if translation_key in self.local_models:
-                result = self.local_models[translation_key](request.text)[0]
-                translated_text = result['translation_text']
-                confidence = 0.9  # Placeholder
-            else:
-                # Fallback to OpenAI
-                response = await self._call_translation_model(request)
-                translated_text = response['translated_text']
-                confidence = response.get('confidence', 0.9)
+            result, cached = await self.response_cache.get_or_compute(
+                "translation",
+                self._analysis_model(translation_key),
+                {"source": request.source_language, "target": request.target_language},
+                request.text,
+                lambda: self._translate(request, translation_key)
+            )
             
             # Record usage
-            usage = ModelUsage(
+            self.usage_recorder.record(
                 user_id=user_id,
                 model="local/translation",
                 request_type="translation",
@@ -475,20 +642,19 @@ class AIService:
                 response_time=(datetime.utcnow() - start_time).total_seconds(),
                 status="success"
             )
-            db.add(usage)
-            db.commit()
             
             return TranslationResponse(
                 id=uuid.uuid4(),
                 original_text=request.text,
-                translated_text=translated_text,
+                translated_text=result['translated_text'],
                 source_language=request.source_language,
                 target_language=request.target_language,
                 model="local/translation",
-                confidence=confidence,
+                confidence=result['confidence'],
                 usage={"tokens": 0},
                 metadata={
-                    "processing_time": (datetime.utcnow() - start_time).total_seconds()
+                    "processing_time": (datetime.utcnow() - start_time).total_seconds(),
+                    "cached": cached
                 },
                 created_at=datetime.utcnow()
             )
@@ -496,39 +662,153 @@ class AIService:
         except Exception as e:
             raise e
     
+    def _analysis_model(self, name: str) -> str:
+        """Model that serves an analysis: the local pipeline if available, else the OpenAI fallback"""
+        return f"local/{name}" if name in self.local_models else "gpt-3.5-turbo"
+    
+    async def _analyze_sentiment(self, text: str) -> Dict:
+        """Run sentiment analysis"""
+        # Use local model for sentiment analysis
+        result = await self._run_local_model('sentiment', text)
+        if result is not None:
+            # Map labels to standard format
+            label_map = {
+                'LABEL_0': 'negative',
+                'LABEL_1': 'neutral', 
+                'LABEL_2': 'positive'
+            }
+            
+            return {
+                'sentiment': label_map.get(result['label'], 'neutral'),
+                'confidence': result['score'],
+                'scores': {
+                    'negative': result['score'] if result['label'] == 'LABEL_0' else 0.0,
+                    'neutral': result['score'] if result['label'] == 'LABEL_1' else 0.0,
+                    'positive': result['score'] if result['label'] == 'LABEL_2' else 0.0,
+                }
+            }
+        
+        # Fallback to OpenAI
+        response = await self._call_sentiment_model(text)
+        return {
+            'sentiment': response['sentiment'],
+            'confidence': response['confidence'],
+            'scores': response['scores']
+        }
+    
+    async def _extract_entities(self, text: str) -> Dict:
+        """Run entity extraction"""
+        # Use local model for NER
+        results = await self._run_local_model('ner', text)
+        if results is not None:
+            entities = []
+            for entity in results:
+                entities.append({
+                    'text': entity['word'],
+                    'label': entity['entity_group'],
+                    'confidence': entity['score'],
+                    'start': entity.get('start', 0),
+                    'end': entity.get('end', len(entity['word']))
+                })
+            return {'entities': entities}
+        
+        # Fallback to OpenAI
+        response = await self._call_entity_model(text)
+        return {'entities': response['entities']}
+    
+    async def _summarize(self, request: SummaryRequest) -> Dict:
+        """Run summarization"""
+        # Use local model for summarization
+        result = await self._run_local_model(
+            'summarization',
+            request.text,
+            max_length=request.max_length or 200,
+            do_sample=False
+        )
+        if result is not None:
+            return {'summary': result['summary_text']}
+        
+        # Fallback to OpenAI
+        return await self._call_summary_model(request)
+    
+    async def _translate(self, request: TranslationRequest, translation_key: str) -> Dict:
+        """Run translation"""
+        # Use local model for translation (if available for the language pair)
+        result = await self._run_local_model(translation_key, request.text)
+        if result is not None:
+            return {
+                'translated_text': result['translation_text'],
+                'confidence': 0.9  # Placeholder
+            }
+        
+        # Fallback to OpenAI
+        response = await self._call_translation_model(request)
+        return {
+            'translated_text': response['translated_text'],
+            'confidence': response.get('confidence', 0.9)
+        }
+    
+    async def _run_local_model(self, name: str, text: str, **kwargs) -> Optional[Any]:
+        """Run one text through a local pipeline via the batching scheduler
+        
+        Returns None when the model is not available locally, including when
+        it fails to load on this request, so the caller falls back to OpenAI.
+        """
+        if name not in self.local_models:
+            return None
+        try:
+            return await self.local_inference.submit(name, text, **kwargs)
+        except ModelLoadError as e:
+            print(f"Warning: {e}; falling back to OpenAI")
+            return None
+    
+    async def _openai_chat(self, messages: List[Dict], model: str = "gpt-3.5-turbo", **kwargs) -> Any:
+        """Call the OpenAI chat completions API within the provider limit"""
+        if self.openai_client is None:
+            raise ValueError("OpenAI API key not configured")
+        
+        async with self.limiter.acquire("openai"):
+            return await self.openai_client.chat.completions.create(
+                model=model,
+                messages=messages,
+                **kwargs
+            )
+    
     async def _call_chat_model(self, messages: List[Dict], model: str, temperature: float, max_tokens: int) -> Dict:
+        """Call a chat model through the provider router; "model" in the result is the one that answered"""
+        served, response = await self.provider_router.route(
+            model,
+            lambda candidate: self._call_provider_chat_model(messages, candidate, temperature, max_tokens)
+        )
+        return {**response, "model": served}
+    
+    async def _call_provider_chat_model(self, messages: List[Dict], model: str, temperature: float, max_tokens: int) -> Dict:
         """Call chat model (OpenAI or Anthropic)"""
         if model.startswith("gpt"):
-            response = openai.ChatCompletion.create(
+            response = await self._openai_chat(
+                messages,
                 model=model,
-                messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens
             )
             return {
                 "content": response.choices[0].message.content,
-                "usage": response.usage.dict()
+                "usage": response.usage.model_dump()
             }
         elif model.startswith("claude"):
-            # Convert messages to Claude format
-            claude_messages = []
-            system_message = None
-            
-            for msg in messages:
-                if msg["role"] == "system":
-                    system_message = msg["content"]
-                elif msg["role"] == "user":
-                    claude_messages.append({"role": "user", "content": msg["content"]})
-                elif msg["role"] == "assistant":
-                    claude_messages.append({"role": "assistant", "content": msg["content"]})
-            
-            response = self.anthropic_client.messages.create(
-                model=model,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                system=system_message,
-                messages=claude_messages
-            )
+            if self.anthropic_client is None:
+                raise ValueError("Anthropic API key not configured")
+            
+            system_message, claude_messages = self._to_claude_messages(messages)
+            
+            async with self.limiter.acquire("anthropic"):
+                response = await self.anthropic_client.messages.create(
+                    model=model,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    system=system_message,
+                    messages=claude_messages
+                )
             
             return {
                 "content": response.content[0].text,
@@ -541,38 +821,167 @@ class AIService:
         else:
             raise ValueError(f"Unsupported model: {model}")
     
+    async def _stream_chat_model(self, messages: List[Dict], model: str, temperature: float, max_tokens: int) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a chat model, yielding {"delta": text} events and, when the provider reports it, a final {"usage": ...}"""
+        if model.startswith("gpt"):
+            if self.openai_client is None:
+                raise ValueError("OpenAI API key not configured")
+            
+            async with self.limiter.acquire("openai"):
+                stream = await self.openai_client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=True
+                )
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield {"delta": chunk.choices[0].delta.content}
+        elif model.startswith("claude"):
+            if self.anthropic_client is None:
+                raise ValueError("Anthropic API key not configured")
+            
+            system_message, claude_messages = self._to_claude_messages(messages)
+            input_tokens = output_tokens = 0
+            
+            async with self.limiter.acquire("anthropic"):
+                stream = await self.anthropic_client.messages.create(
+                    model=model,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    system=system_message,
+                    messages=claude_messages,
+                    stream=True
+                )
+                async for event in stream:
+                    if event.type == "message_start":
+                        input_tokens = event.message.usage.input_tokens
+                    elif event.type == "content_block_delta" and event.delta.text:
+                        yield {"delta": event.delta.text}
+                    elif event.type == "message_delta":
+                        output_tokens = event.usage.output_tokens
+            
+            yield {
+                "usage": {
+                    "prompt_tokens": input_tokens,
+                    "completion_tokens": output_tokens,
+                    "total_tokens": input_tokens + output_tokens
+                }
+            }
+        else:
+            raise ValueError(f"Unsupported model: {model}")
+    
+    async def _summarize_context(self, summary: Optional[str], messages: List[Dict]) -> str:
+        """Fold older turns into a conversation's rolling summary"""
+        transcript = "\n".join(f"{msg['role']}: {msg['content']}" for msg in messages)
+        response = await self._call_chat_model(
+            messages=[
+                {"role": "system", "content": "Update the running summary of a conversation with the new turns below. Keep names, facts, preferences, decisions and open questions. Reply with the updated summary only, in under 200 words."},
+                {"role": "user", "content": f"Current summary:\n{summary or '(none)'}\n\nNew turns:\n{transcript}"}
+            ],
+            model=settings.CONTEXT_SUMMARY_MODEL,
+            temperature=0.2,
+            max_tokens=400
+        )
+        return response["content"]
+    
+    @staticmethod
+    def _to_claude_messages(messages: List[Dict]) -> tuple:
+        """Split chat messages into Claude's system prompt and message list"""
+        claude_messages = []
+        system_message = None
+        
+        for msg in messages:
+            if msg["role"] == "system":
+                system_message = msg["content"]
+            elif msg["role"] == "user":
+                claude_messages.append({"role": "user", "content": msg["content"]})
+            elif msg["role"] == "assistant":
+                claude_messages.append({"role": "assistant", "content": msg["content"]})
+        
+        return system_message, claude_messages
+    
+    @staticmethod
+    def _estimate_usage(messages: List[Dict], content: str) -> Dict[str, int]:
+        """Rough token usage (~4 characters per token) for streams that report none"""
+        prompt_tokens = sum(len(msg["content"]) for msg in messages) // 4 + 1
+        completion_tokens = len(content) // 4 + 1 if content else 0
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    
     async def _call_completion_model(self, prompt: str, model: str, temperature: float, max_tokens: int, stop: List[str]) -> Dict:
         """Call completion model"""
-        response = openai.Completion.create(
-            model=model,
-            prompt=prompt,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            stop=stop
-        )
+        if self.openai_client is None:
+            raise ValueError("OpenAI API key not configured")
+        
+        async with self.limiter.acquire("openai"):
+            response = await self.openai_client.completions.create(
+                model=model,
+                prompt=prompt,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stop=stop
+            )
         
         return {
             "content": response.choices[0].text,
-            "usage": response.usage.dict()
+            "usage": response.usage.model_dump()
         }
     
     async def _call_embedding_model(self, text: str, model: str) -> Dict:
-        """Call embedding model"""
-        response = openai.Embedding.create(
-            model=model,
-            input=text
-        )
+        """Call embedding model through the embedding cache and micro-batcher"""
+        cached = self.embedding_cache.get(text, model)
+        if cached is not None:
+            embedding, tokens = cached.tolist(), 0
+        else:
+            embedding, tokens = await self.embedding_batcher.embed(text, model)
         
         return {
-            "embedding": response["data"][0]["embedding"],
-            "usage": response["usage"].dict()
+            "embedding": embedding,
+            "usage": {
+                "prompt_tokens": tokens,
+                "completion_tokens": 0,
+                "total_tokens": tokens
+            },
+            "cached": cached is not None
         }
     
+    async def _response_cache_embedding(self, text: str) -> List[float]:
+        """Embedding used for near-duplicate response cache lookups"""
+        response = await self._call_embedding_model(text, settings.DEFAULT_EMBEDDING_MODEL)
+        return response["embedding"]
+    
+    async def _embed_batch(self, texts: List[str], model: str) -> List[tuple]:
+        """Embed a batch of texts in one provider call and cache the results"""
+        if self.openai_client is None:
+            raise ValueError("OpenAI API key not configured")
+        
+        async with self.limiter.acquire("openai"):
+            response = await self.openai_client.embeddings.create(
+                model=model,
+                input=texts
+            )
+        
+        # Usage is reported per batch; attribute it to each text by length
+        total_chars = sum(len(text) for text in texts) or 1
+        results = []
+        for item in sorted(response.data, key=lambda item: item.index):
+            text = texts[item.index]
+            self.embedding_cache.put(text, model, item.embedding)
+            results.append((
+                item.embedding,
+                round(response.usage.prompt_tokens * len(text) / total_chars)
+            ))
+        return results
+    
     async def _call_sentiment_model(self, text: str) -> Dict:
         """Call sentiment analysis model (OpenAI fallback)"""
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
+        response = await self._openai_chat(
+            [
                 {"role": "system", "content": "Analyze the sentiment of the following text. Respond with JSON: {\"sentiment\": \"positive/negative/neutral\", \"confidence\": 0.0-1.0, \"scores\": {\"positive\": 0.0, \"negative\": 0.0, \"neutral\": 0.0}}"},
                 {"role": "user", "content": text}
             ],
@@ -584,9 +993,8 @@ class AIService:
     
     async def _call_entity_model(self, text: str) -> Dict:
         """Call entity extraction model (OpenAI fallback)"""
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
+        response = await self._openai_chat(
+            [
                 {"role": "system", "content": "Extract entities from the following text. Respond with JSON: {\"entities\": [{\"text\": \"entity\", \"label\": \"PERSON/LOCATION/ORG\", \"confidence\": 0.0-1.0, \"start\": 0, \"end\": 0}]}"},
                 {"role": "user", "content": text}
             ],
@@ -598,9 +1006,8 @@ class AIService:
     
     async def _call_summary_model(self, request: SummaryRequest) -> Dict:
         """Call summarization model (OpenAI fallback)"""
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
+        response = await self._openai_chat(
+            [
                 {"role": "system", "content": f"Summarize the following text in a {request.style} manner. Maximum length: {request.max_length} characters."},
                 {"role": "user", "content": request.text}
             ],
@@ -613,9 +1020,8 @@ class AIService:
     
     async def _call_translation_model(self, request: TranslationRequest) -> Dict:
         """Call translation model (OpenAI fallback)"""
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
+        response = await self._openai_chat(
+            [
                 {"role": "system", "content": f"Translate the following text from {request.source_language} to {request.target_language}. Only return the translation."},
                 {"role": "user", "content": request.text}
             ],
@@ -0,0 +1,221 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.conversation import Conversation, Message
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except ImportError:
+    _ENCODING = None
+
+# (current summary, messages to fold in) -> new summary
+Summarizer = Callable[[Optional[str], List[Dict[str, str]]], Awaitable[str]]
+
+def count_tokens(text: str) -> int:
+    """Token count via tiktoken when installed, else ~4 characters per token"""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return len(text) // 4 + 1
+
+class ContextWindow:
+    """Token-budgeted rolling context for a conversation
+
+    Only the newest messages that fit in ``token_budget`` are sent to the
+    model, fetched newest-first with keyset pagination so a turn never loads
+    the whole history. Building the window never waits on the summarizer:
+    once the unsummarized history outgrows the budget, ``schedule_fold``
+    folds the oldest messages into ``Conversation.context_summary`` in the
+    background, leaving about ``fold_target`` tokens of recent history
+    (``fold_batch`` messages at most per fold). The gap between the two
+    marks lets several turns pass between folds. Folded messages are skipped
+    via the ``(Conversation.summary_until, Conversation.summary_until_id)``
+    keyset of the last folded message, and per-message token counts are
+    cached in ``Message.token_count``.
+    """
+
+    def __init__(
+        self,
+        summarizer: Summarizer,
+        session_factory: Callable[[], AsyncSession],
+        token_budget: int = 3000,
+        page_size: int = 20,
+        fold_batch: int = 50,
+        fold_target: Optional[int] = None
+    ):
+        self.summarizer = summarizer
+        self.session_factory = session_factory
+        self.token_budget = token_budget
+        self.page_size = page_size
+        self.fold_batch = fold_batch
+        self.fold_target = fold_target if fold_target is not None else token_budget // 2
+        self.overflowed: Set[Any] = set()  # conversation ids whose last window dropped history
+        self.folds: Dict[Any, asyncio.Task] = {}
+
+    async def build(self, db: AsyncSession, conversation: Conversation, new_message: str) -> List[Dict[str, str]]:
+        """API messages for the next turn: summary, recent history, then the new message"""
+        budget = self.token_budget - count_tokens(new_message) - count_tokens(conversation.context_summary)
+
+        window: List[Message] = []
+        overflow = False
+        # Cached token counts stay pending until the turn commits; flushing them
+        # here would hold a write transaction open across the model call
+        with db.no_autoflush:
+            async for message in self._tail(db, conversation):
+                tokens = self.token_count(message)
+                if tokens > budget:
+                    overflow = True
+                    break
+                budget -= tokens
+                window.append(message)
+        window.reverse()
+
+        if overflow:
+            # Older turns are left out of this window until schedule_fold summarizes them
+            self.overflowed.add(conversation.id)
+
+        api_messages = []
+        if conversation.context_summary:
+            api_messages.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation:\n{conversation.context_summary}"
+            })
+        api_messages.extend({"role": msg.role, "content": msg.content} for msg in window)
+        api_messages.append({"role": "user", "content": new_message})
+        return api_messages
+
+    def schedule_fold(self, conversation_id) -> Optional[asyncio.Task]:
+        """Start a background fold if the conversation's last window overflowed
+
+        Call once the turn has committed. At most one fold per conversation
+        runs in a process at a time.
+        """
+        if conversation_id not in self.overflowed or conversation_id in self.folds:
+            return None
+        self.overflowed.discard(conversation_id)
+
+        task = asyncio.create_task(self._fold(conversation_id))
+        self.folds[conversation_id] = task
+        task.add_done_callback(lambda _: self.folds.pop(conversation_id, None))
+        return task
+
+    @staticmethod
+    def token_count(message: Message) -> int:
+        """Cached token count; filled in on first use and saved with the next commit"""
+        if message.token_count is None:
+            message.token_count = count_tokens(message.content)
+        return message.token_count
+
+    def _unsummarized(self, conversation: Conversation):
+        query = select(Message).where(Message.conversation_id == conversation.id)
+        if conversation.summary_until is None:
+            return query
+        if conversation.summary_until_id is None:
+            # Folded before the boundary carried an id
+            return query.where(Message.created_at > conversation.summary_until)
+        # Same keyset as the fold, so a batch ending inside a run of equal
+        # timestamps doesn't skip the rest of the run
+        return query.where(or_(
+            Message.created_at > conversation.summary_until,
+            and_(
+                Message.created_at == conversation.summary_until,
+                Message.id > conversation.summary_until_id
+            )
+        ))
+
+    async def _tail(self, db: AsyncSession, conversation: Conversation) -> AsyncIterator[Message]:
+        """Unsummarized messages newest first, one keyset page at a time"""
+        cursor: Optional[Message] = None
+        while True:
+            query = self._unsummarized(conversation)
+            if cursor is not None:
+                query = query.where(or_(
+                    Message.created_at < cursor.created_at,
+                    and_(Message.created_at == cursor.created_at, Message.id < cursor.id)
+                ))
+            result = await db.execute(
+                query.order_by(Message.created_at.desc(), Message.id.desc()).limit(self.page_size)
+            )
+            page = result.scalars().all()
+
+            for message in page:
+                yield message
+            if len(page) < self.page_size:
+                return
+            cursor = page[-1]
+
+    async def _fold(self, conversation_id):
+        """Fold the oldest messages beyond ``fold_target`` into the rolling summary
+
+        The history is read and the summary written in two short sessions,
+        so no connection is held while the summarizer runs.
+        """
+        try:
+            async with self.session_factory() as db:
+                conversation = await db.get(Conversation, conversation_id)
+                if conversation is None:
+                    return
+
+                budget = self.fold_target
+                oldest_kept: Optional[Message] = None
+                async for message in self._tail(db, conversation):
+                    tokens = self.token_count(message)
+                    if tokens > budget:
+                        break
+                    budget -= tokens
+                    oldest_kept = message
+                else:
+                    # Already back under the low-water mark
+                    return
+
+                query = self._unsummarized(conversation)
+                if oldest_kept is not None:
+                    query = query.where(or_(
+                        Message.created_at < oldest_kept.created_at,
+                        and_(Message.created_at == oldest_kept.created_at, Message.id < oldest_kept.id)
+                    ))
+                result = await db.execute(query.order_by(Message.created_at, Message.id).limit(self.fold_batch))
+                messages = result.scalars().all()
+                if not messages:
+                    return
+
+                summary = conversation.context_summary
+                summary_until = conversation.summary_until
+                summary_until_id = conversation.summary_until_id
+                folded_until = messages[-1].created_at
+                folded_until_id = messages[-1].id
+                to_fold = [{"role": msg.role, "content": msg.content} for msg in messages]
+                # Saves the token counts cached above
+                await db.commit()
+
+            summary = await self.summarizer(summary, to_fold)
+
+            async with self.session_factory() as db:
+                # Skip the write if another fold moved the summary on meanwhile
+                unchanged = and_(
+                    Conversation.summary_until.is_(None) if summary_until is None
+                    else Conversation.summary_until == summary_until,
+                    Conversation.summary_until_id.is_(None) if summary_until_id is None
+                    else Conversation.summary_until_id == summary_until_id
+                )
+                await db.execute(
+                    update(Conversation)
+                    .where(Conversation.id == conversation_id, unchanged)
+                    .values(
+                        context_summary=summary,
+                        summary_until=folded_until,
+                        summary_until_id=folded_until_id
+                    )
+                )
+                await db.commit()
+        except Exception as e:
+            # Windows stay within budget either way; the next overflow retries
+            logger.warning(f"Failed to summarize conversation {conversation_id}: {e}")
@@ -0,0 +1,328 @@
+import asyncio
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+# (texts, model) -> one (embedding, prompt_tokens) per text, in input order
+EmbedBatchFn = Callable[[List[str], str], Awaitable[List[Tuple[List[float], int]]]]
+
+class EmbeddingBatcher:
+    """Coalesces concurrent embed requests into batched provider calls
+
+    Requests for the same model are collected for at most ``max_wait``
+    seconds (or until ``max_batch_size`` distinct texts are queued) and sent
+    to ``embed_batch`` in one call. Identical texts in the same window share
+    a single input slot.
+    """
+
+    def __init__(self, embed_batch: EmbedBatchFn, max_batch_size: int = 64, max_wait: float = 0.005):
+        self.embed_batch = embed_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.pending: Dict[str, Dict[str, List[asyncio.Future]]] = {}
+        self.timers: Dict[str, asyncio.TimerHandle] = {}
+        self.tasks: Set[asyncio.Task] = set()
+        self.requests = 0
+        self.batches = 0
+        self.batched_texts = 0
+
+    async def embed(self, text: str, model: str) -> Tuple[List[float], int]:
+        """Queue a text and wait for its (embedding, prompt_tokens)"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.requests += 1
+
+        batch = self.pending.setdefault(model, {})
+        batch.setdefault(text, []).append(future)
+
+        if len(batch) >= self.max_batch_size:
+            self._flush(model)
+        elif model not in self.timers:
+            self.timers[model] = loop.call_later(self.max_wait, self._flush, model)
+
+        return await future
+
+    def _flush(self, model: str):
+        """Send everything queued for a model as one batch"""
+        timer = self.timers.pop(model, None)
+        if timer:
+            timer.cancel()
+
+        batch = self.pending.pop(model, None)
+        if batch:
+            task = asyncio.create_task(self._run(model, batch))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def _run(self, model: str, batch: Dict[str, List[asyncio.Future]]):
+        texts = list(batch)
+        self.batches += 1
+        self.batched_texts += len(texts)
+
+        try:
+            results = await self.embed_batch(texts, model)
+        except Exception as e:
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        for text, result in zip(texts, results):
+            for future in batch[text]:
+                if not future.done():
+                    future.set_result(result)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get batching metrics"""
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "provider_inputs": self.batched_texts,
+            "average_batch_size": self.batched_texts / self.batches if self.batches else 0.0
+        }
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, so give each worker its own store path
+    fcntl = None
+
+@contextmanager
+def _exclusive(f: IO):
+    """Hold an exclusive lock on an open file across worker processes"""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+@dataclass
+class _ModelStore:
+    dimensions: int
+    matrix: np.memmap
+    rows: Dict[str, int]
+    index_file: IO[bytes]
+    index_offset: int
+    lines: int = 0
+
+class MmapEmbeddingStore:
+    """Append-only on-disk float32 embedding store
+
+    Each model gets a ``<model>.f32`` matrix, memory-mapped so lookups only
+    page in the rows they touch, and a ``<model>.idx`` text file whose first
+    line is the dimension count and whose following lines are the row keys.
+
+    Worker processes may share a store path: appends happen under an
+    ``flock`` on the index after reading the keys other workers appended,
+    so every process agrees on which row holds which key. Within a process,
+    ``put`` and index catch-up are serialized by ``lock``.
+    """
+
+    GROWTH_ROWS = 1024
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.models: Dict[str, _ModelStore] = {}
+        self.lock = threading.Lock()
+
+    def _paths(self, model: str) -> Tuple[Path, Path]:
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", model)
+        return self.path / f"{name}.f32", self.path / f"{name}.idx"
+
+    def _open(self, model: str, dimensions: Optional[int] = None) -> Optional[_ModelStore]:
+        """Open a model's files (lock held); None if it has no store yet and no dimensions"""
+        store = self.models.get(model)
+        if store is not None:
+            return store
+
+        data_path, index_path = self._paths(model)
+        if dimensions is None and not index_path.exists():
+            return None
+
+        index_file = index_path.open("a+b")
+        with _exclusive(index_file):
+            index_file.seek(0)
+            header = index_file.readline()
+            if not header.endswith(b"\n"):
+                if dimensions is None:
+                    index_file.close()
+                    return None
+                header = f"{dimensions}\n".encode()
+                index_file.write(header)
+                index_file.flush()
+
+            dimensions = int(header)
+            store = _ModelStore(
+                dimensions=dimensions,
+                matrix=self._map(data_path, dimensions, self.GROWTH_ROWS),
+                rows={},
+                index_file=index_file,
+                index_offset=len(header)
+            )
+            self._catch_up(model, store)
+
+        self.models[model] = store
+        return store
+
+    def _catch_up(self, model: str, store: _ModelStore):
+        """Index keys appended since the last read, by this or another worker (lock held)"""
+        store.index_file.seek(store.index_offset)
+        appended = store.index_file.read()
+        # A line without its newline is still being written
+        complete = appended[:appended.rfind(b"\n") + 1]
+        for key in complete.split():
+            store.rows.setdefault(key.decode(), store.lines)
+            store.lines += 1
+        store.index_offset += len(complete)
+
+        if store.lines > store.matrix.shape[0]:
+            # Another worker grew the matrix; its rows are written before their keys
+            data_path, _ = self._paths(model)
+            store.matrix = self._map(data_path, store.dimensions, 0, grow=False)
+
+    @staticmethod
+    def _map(data_path: Path, dimensions: int, min_rows: int, grow: bool = True) -> np.memmap:
+        """Map the matrix file, first extending it to min_rows (index lock held) if grow"""
+        row_bytes = dimensions * 4
+        size = data_path.stat().st_size if data_path.exists() else 0
+        rows = max(size // row_bytes, min_rows) if grow else size // row_bytes
+        if grow:
+            with data_path.open("ab") as f:
+                f.truncate(rows * row_bytes)
+        return np.memmap(data_path, dtype=np.float32, mode="r+", shape=(rows, dimensions))
+
+    def get(self, model: str, key: str) -> Optional[np.ndarray]:
+        store = self.models.get(model)
+        row = store.rows.get(key) if store is not None else None
+        if row is not None:
+            return np.array(store.matrix[row])
+
+        # Look for keys other workers added, unless a write holds the lock
+        if not self.lock.acquire(blocking=False):
+            return None
+        try:
+            store = self._open(model)
+            if store is None:
+                return None
+            self._catch_up(model, store)
+            row = store.rows.get(key)
+            return None if row is None else np.array(store.matrix[row])
+        finally:
+            self.lock.release()
+
+    def put(self, model: str, key: str, embedding: np.ndarray):
+        """Append one embedding; blocking file I/O, so EmbeddingCache runs it off the event loop"""
+        with self.lock:
+            store = self._open(model, len(embedding))
+            if key in store.rows or len(embedding) != store.dimensions:
+                return
+
+            with _exclusive(store.index_file):
+                self._catch_up(model, store)
+                if key in store.rows:
+                    return
+
+                row = store.lines
+                if row >= store.matrix.shape[0]:
+                    store.matrix.flush()
+                    data_path, _ = self._paths(model)
+                    store.matrix = self._map(data_path, store.dimensions, row + self.GROWTH_ROWS)
+
+                # Row data lands before its key, so a crash never indexes a torn row
+                store.matrix[row] = embedding
+                line = f"{key}\n".encode()
+                store.index_file.write(line)
+                store.index_file.flush()
+                store.index_offset += len(line)
+                store.lines += 1
+                store.rows[key] = row
+
+    def close(self):
+        with self.lock:
+            for store in self.models.values():
+                store.matrix.flush()
+                store.index_file.close()
+            self.models.clear()
+
+class EmbeddingCache:
+    """Content-hash keyed embedding cache: in-memory LRU over an optional mmap store"""
+
+    def __init__(self, max_entries: int = 10000, store_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self.store = MmapEmbeddingStore(store_path) if store_path else None
+        # Disk appends run on one thread so put() never blocks the event loop
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-store") if self.store else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text: str, model: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    def get(self, text: str, model: str) -> Optional[np.ndarray]:
+        """Get a cached embedding, promoting disk hits into memory"""
+        key = self.key(text, model)
+
+        embedding = self.entries.get(key)
+        if embedding is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+        if self.store is not None:
+            embedding = self.store.get(model, key)
+            if embedding is not None:
+                self._remember(key, embedding)
+                self.disk_hits += 1
+                return embedding
+
+        self.misses += 1
+        return None
+
+    def put(self, text: str, model: str, embedding: List[float]):
+        key = self.key(text, model)
+        vector = np.asarray(embedding, dtype=np.float32)
+        self._remember(key, vector)
+        if self.store is not None:
+            self.writer.submit(self.store.put, model, key, vector).add_done_callback(self._report_write)
+
+    @staticmethod
+    def _report_write(future: Future):
+        if future.exception() is not None:
+            print(f"Warning: Failed to store embedding: {future.exception()}")
+
+    def _remember(self, key: str, embedding: np.ndarray):
+        self.entries[key] = embedding
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get cache metrics"""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0
+        }
+
+    def close(self):
+        if self.store is not None:
+            # Let queued appends finish before the files are closed
+            self.writer.shutdown(wait=True)
+            self.store.close()
@@ -0,0 +1,138 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Tuple
+
+from .model_pool import ModelLoadError
+
+@dataclass
+class InferenceRequest:
+    text: str
+    kwargs: Dict[str, Any]
+    future: asyncio.Future
+
+class LocalInferenceScheduler:
+    """Dynamic micro-batching for local transformers pipelines
+
+    Requests are queued per pipeline. A worker per pipeline takes the first
+    queued request, keeps collecting until ``max_batch_size`` requests are
+    queued or ``max_wait`` seconds pass, and runs them as one batched
+    forward pass on that pipeline's dedicated thread. Requests that arrive
+    while a pass is running are picked up by the next one, so batches grow
+    with load. Requests with different pipeline kwargs never share a pass.
+    """
+
+    def __init__(self, pipelines: Mapping[str, Any], max_batch_size: int = 16, max_wait: float = 0.01):
+        self.pipelines = pipelines
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.queues: Dict[str, asyncio.Queue] = {}
+        self.workers: Dict[str, asyncio.Task] = {}
+        self.executors: Dict[str, ThreadPoolExecutor] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    async def submit(self, name: str, text: str, **kwargs) -> Any:
+        """Queue one text for a pipeline and wait for its result"""
+        if name not in self.pipelines:
+            raise KeyError(f"Local model not available: {name}")
+
+        if name not in self.workers:
+            self.queues[name] = asyncio.Queue()
+            self.executors[name] = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"local-{name}")
+            self.stats[name] = {"requests": 0, "batches": 0}
+            self.workers[name] = asyncio.create_task(self._worker(name))
+
+        future = asyncio.get_running_loop().create_future()
+        await self.queues[name].put(InferenceRequest(text, kwargs, future))
+        return await future
+
+    async def _collect(self, queue: asyncio.Queue) -> List[InferenceRequest]:
+        """Wait for one request, then gather more until full or max_wait passes"""
+        loop = asyncio.get_running_loop()
+        batch = [await queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _worker(self, name: str):
+        queue = self.queues[name]
+
+        while True:
+            batch = await self._collect(queue)
+
+            groups: Dict[Tuple, List[InferenceRequest]] = {}
+            for request in batch:
+                if not request.future.cancelled():
+                    key = tuple(sorted(request.kwargs.items()))
+                    groups.setdefault(key, []).append(request)
+
+            for requests in groups.values():
+                self.stats[name]["requests"] += len(requests)
+                self.stats[name]["batches"] += 1
+                try:
+                    await self._run_batch(name, requests)
+                except Exception as e:
+                    if len(requests) == 1 or isinstance(e, ModelLoadError):
+                        # A load failure fails the whole batch; retrying would reload per request
+                        for request in requests:
+                            if not request.future.done():
+                                request.future.set_exception(e)
+                        continue
+                    # Retry one at a time so a single bad input only fails its own request
+                    for request in requests:
+                        try:
+                            await self._run_batch(name, [request])
+                        except Exception as e:
+                            if not request.future.done():
+                                request.future.set_exception(e)
+
+    async def _run_batch(self, name: str, requests: List[InferenceRequest]):
+        results = await asyncio.get_running_loop().run_in_executor(
+            self.executors[name],
+            self._forward,
+            name,
+            [request.text for request in requests],
+            requests[0].kwargs
+        )
+        for request, result in zip(requests, results):
+            if not request.future.done():
+                request.future.set_result(result)
+
+    def _forward(self, name: str, texts: List[str], kwargs: Dict[str, Any]) -> List[Any]:
+        """Run one batched pass; executes on the pipeline's worker thread"""
+        return self.pipelines[name](texts, batch_size=len(texts), **kwargs)
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Queue depth and average batch size per pipeline"""
+        return {
+            name: {
+                "queued": self.queues[name].qsize(),
+                "requests": stats["requests"],
+                "batches": stats["batches"],
+                "average_batch_size": stats["requests"] / stats["batches"] if stats["batches"] else 0.0
+            }
+            for name, stats in self.stats.items()
+        }
+
+    async def close(self):
+        """Stop the workers and release their threads"""
+        for worker in self.workers.values():
+            worker.cancel()
+        await asyncio.gather(*self.workers.values(), return_exceptions=True)
+        for executor in self.executors.values():
+            executor.shutdown(wait=False)
+        self.workers.clear()
+        self.queues.clear()
+        self.executors.clear()
@@ -0,0 +1,170 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional
+
+@dataclass
+class ModelSpec:
+    task: str
+    model: str
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+# Local pipelines by the name AIService asks for them
+LOCAL_MODEL_SPECS: Dict[str, ModelSpec] = {
+    "sentiment": ModelSpec("sentiment-analysis", "cardiffnlp/twitter-roberta-base-sentiment-latest"),
+    "ner": ModelSpec("ner", "dbmdz/bert-large-cased-finetuned-conll03-english", {"aggregation_strategy": "simple"}),
+    "summarization": ModelSpec("summarization", "facebook/bart-large-cnn"),
+    "translation_en_to_de": ModelSpec("translation_en_to_de", "Helsinki-NLP/opus-mt-en-de"),
+}
+
+class ModelLoadError(Exception):
+    """A local pipeline could not be loaded; callers fall back to a hosted model"""
+
+def load_pipeline(spec: ModelSpec) -> Any:
+    """Build a transformers pipeline; transformers/torch are only imported here"""
+    from transformers import pipeline
+    return pipeline(spec.task, model=spec.model, **spec.kwargs)
+
+def pipeline_memory_bytes(pipe: Any) -> int:
+    """Parameter and buffer bytes held by a pipeline's model"""
+    model = getattr(pipe, "model", None)
+    if model is None:
+        return 0
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+@dataclass
+class ResidentModel:
+    pipeline: Any
+    memory_bytes: int
+    load_seconds: float
+    last_used: float
+
+class ModelPool(Mapping[str, Any]):
+    """Lazily loaded, LRU-bounded pool of local pipelines
+
+    Looking a model up loads it on first use (on the caller's thread, which
+    is a scheduler worker rather than the event loop). Once the resident
+    models exceed ``memory_budget`` bytes the least recently used ones are
+    dropped; the model just requested is never evicted.
+    """
+
+    def __init__(
+        self,
+        specs: Mapping[str, ModelSpec] = LOCAL_MODEL_SPECS,
+        memory_budget: int = 4 * 1024 ** 3,
+        loader: Callable[[ModelSpec], Any] = load_pipeline,
+        measure: Callable[[Any], int] = pipeline_memory_bytes
+    ):
+        self.specs = dict(specs)
+        self.memory_budget = memory_budget
+        self.loader = loader
+        self.measure = measure
+        self.resident: OrderedDict[str, ResidentModel] = OrderedDict()
+        self.lock = threading.Lock()
+        self.load_locks = {name: threading.Lock() for name in self.specs}
+        self.loads = 0
+        self.evictions = 0
+        self.errors: Dict[str, str] = {}
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self.specs:
+            raise KeyError(name)
+
+        with self.lock:
+            entry = self.resident.get(name)
+            if entry is not None:
+                self.resident.move_to_end(name)
+                entry.last_used = time.time()
+                return entry.pipeline
+
+        # Only one thread loads a given model; others wait for it
+        with self.load_locks[name]:
+            with self.lock:
+                entry = self.resident.get(name)
+            if entry is None:
+                entry = self._load(name)
+            return entry.pipeline
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.specs)
+
+    def __len__(self) -> int:
+        return len(self.specs)
+
+    def __contains__(self, name: object) -> bool:
+        # A model that failed to load is reported missing so callers fall back
+        return name in self.specs and name not in self.errors
+
+    def _load(self, name: str) -> ResidentModel:
+        start = time.perf_counter()
+        try:
+            pipe = self.loader(self.specs[name])
+        except Exception as e:
+            self.errors[name] = str(e)
+            raise ModelLoadError(f"Failed to load local model {name}: {e}") from e
+        self.errors.pop(name, None)
+
+        entry = ResidentModel(
+            pipeline=pipe,
+            memory_bytes=self.measure(pipe),
+            load_seconds=time.perf_counter() - start,
+            last_used=time.time()
+        )
+        with self.lock:
+            self.resident[name] = entry
+            self.loads += 1
+            self._evict(keep=name)
+        return entry
+
+    def _evict(self, keep: str):
+        """Drop least recently used models until within budget (lock held)"""
+        for name in list(self.resident):
+            if self.resident_bytes() <= self.memory_budget:
+                break
+            if name != keep:
+                del self.resident[name]
+                self.evictions += 1
+
+    def resident_bytes(self) -> int:
+        return sum(entry.memory_bytes for entry in self.resident.values())
+
+    async def warm(self, names: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Load models ahead of traffic without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        results: Dict[str, Optional[str]] = {}
+        for name in names:
+            try:
+                await loop.run_in_executor(None, self.__getitem__, name)
+                results[name] = None
+            except Exception as e:
+                results[name] = str(e)
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Resident models, memory use and load history"""
+        with self.lock:
+            resident = {
+                name: {
+                    "memory_bytes": entry.memory_bytes,
+                    "load_seconds": round(entry.load_seconds, 3),
+                    "last_used": entry.last_used
+                }
+                for name, entry in self.resident.items()
+            }
+            resident_bytes = self.resident_bytes()
+        return {
+            "available": list(self.specs),
+            "resident": resident,
+            "resident_bytes": resident_bytes,
+            "memory_budget_bytes": self.memory_budget,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "errors": dict(self.errors)
+        }
+
+def parse_model_names(value: str) -> List[str]:
+    """Split a comma-separated model list from config"""
+    return [name.strip() for name in value.split(",") if name.strip()]
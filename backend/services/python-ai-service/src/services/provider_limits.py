@@ -0,0 +1,45 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+
+class ProviderLimiter:
+    """Bounds in-flight model calls per provider
+
+    Requests over a provider's limit wait on its semaphore instead of piling
+    more concurrent calls onto an upstream that is already saturated.
+    """
+
+    def __init__(self, limits: Dict[str, int]):
+        self.limits = dict(limits)
+        self.semaphores = {provider: asyncio.Semaphore(limit) for provider, limit in limits.items()}
+        self.in_flight = {provider: 0 for provider in limits}
+        self.waiting = {provider: 0 for provider in limits}
+
+    @asynccontextmanager
+    async def acquire(self, provider: str) -> AsyncIterator[None]:
+        """Hold one of the provider's slots for the duration of a call"""
+        semaphore = self.semaphores[provider]
+
+        self.waiting[provider] += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting[provider] -= 1
+
+        self.in_flight[provider] += 1
+        try:
+            yield
+        finally:
+            self.in_flight[provider] -= 1
+            semaphore.release()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """In-flight and queued calls per provider"""
+        return {
+            provider: {
+                "in_flight": self.in_flight[provider],
+                "waiting": self.waiting[provider],
+                "limit": limit
+            }
+            for provider, limit in self.limits.items()
+        }
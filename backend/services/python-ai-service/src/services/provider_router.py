@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class RouteStats:
+    """Rolling latency and error rate over a model's most recent calls"""
+
+    def __init__(self, window: int = 200):
+        self.samples: Deque[Tuple[float, bool]] = deque(maxlen=window)
+
+    def record(self, latency: float, ok: bool):
+        self.samples.append((latency, ok))
+
+    def quantile(self, q: float) -> Optional[float]:
+        latencies = sorted(latency for latency, ok in self.samples if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+class CircuitBreaker:
+    """Opens after consecutive failures; half-opens after ``reset_timeout``
+
+    While half-open, calls go through again; the first result closes the
+    circuit on success or re-opens it for another timeout on failure.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def record(self, ok: bool):
+        if ok:
+            self.failures = 0
+            self.opened_at = None
+            return
+        self.failures += 1
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+class ProviderRouter:
+    """Latency-aware routing of model calls across a primary and fallback models
+
+    A call goes to the requested model unless its circuit is open. If it has
+    not answered within the hedge delay a second attempt is started on the
+    next fallback and whichever succeeds first wins; the other is cancelled.
+    The hedge delay is ``hedge_delay`` seconds until the model has
+    ``min_samples`` calls, then its rolling ``hedge_quantile`` latency, so
+    only its slowest few percent of calls are hedged. Errors fail over to the next candidate immediately. Every
+    attempt feeds the per-model latency/error stats and circuit breaker.
+    """
+
+    def __init__(
+        self,
+        fallbacks: Optional[Dict[str, List[str]]] = None,
+        hedge_delay: Optional[float] = 2.0,
+        hedge_quantile: Optional[float] = 0.95,
+        min_samples: int = 20,
+        timeout: float = 60.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        window: int = 200
+    ):
+        self.fallbacks = fallbacks or {}
+        self.hedge_delay = hedge_delay
+        self.hedge_quantile = hedge_quantile
+        self.min_samples = min_samples
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.window = window
+        self.stats: Dict[str, RouteStats] = {}
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+
+    def _stats(self, model: str) -> RouteStats:
+        if model not in self.stats:
+            self.stats[model] = RouteStats(self.window)
+        return self.stats[model]
+
+    def _breaker(self, model: str) -> CircuitBreaker:
+        if model not in self.breakers:
+            self.breakers[model] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return self.breakers[model]
+
+    def candidates(self, model: str) -> List[str]:
+        """The model and its fallbacks, skipping any whose circuit is open"""
+        ordered = [model] + [fallback for fallback in self.fallbacks.get(model, []) if fallback != model]
+        allowed = [candidate for candidate in ordered if self._breaker(candidate).state != "open"]
+        # With every circuit open, still try the requested model rather than failing outright
+        return allowed or [model]
+
+    def hedge_after(self, model: str) -> Optional[float]:
+        """Seconds to wait on ``model`` before hedging; None disables hedging"""
+        if self.hedge_delay is None:
+            return None
+        stats = self.stats.get(model)
+        if self.hedge_quantile is not None and stats is not None and len(stats.samples) >= self.min_samples:
+            observed = stats.quantile(self.hedge_quantile)
+            if observed is not None:
+                return observed
+        return self.hedge_delay
+
+    async def route(self, model: str, call: Callable[[str], Awaitable[Any]]) -> Tuple[str, Any]:
+        """Run ``call(model)`` with hedging and failover; returns (model that answered, result)"""
+        candidates = self.candidates(model)
+        hedge_delay = self.hedge_after(candidates[0])
+        pending: Dict[asyncio.Task, str] = {}
+        hedged: set = set()
+        last_error: Optional[BaseException] = None
+
+        def launch() -> asyncio.Task:
+            candidate = candidates.pop(0)
+            task = asyncio.create_task(self._attempt(candidate, call))
+            pending[task] = candidate
+            return task
+
+        launch()
+        try:
+            while pending:
+                hedge = hedge_delay is not None and candidates and len(pending) == 1
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=hedge_delay if hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    # Still waiting after the hedge delay: race the next candidate
+                    self.hedges += 1
+                    hedged.add(launch())
+                    continue
+
+                for task in done:
+                    served = pending.pop(task)
+                    if task.exception() is None:
+                        if task in hedged:
+                            self.hedge_wins += 1
+                        return served, task.result()
+
+                    last_error = task.exception()
+                    logger.warning(f"Model call to {served} failed: {last_error}")
+                    if candidates and not pending:
+                        self.failovers += 1
+                        launch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise last_error
+
+    async def _attempt(self, model: str, call: Callable[[str], Awaitable[Any]]) -> Any:
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(call(model), timeout=self.timeout)
+        except asyncio.CancelledError:
+            # Lost the hedge race; says nothing about the model's health
+            raise
+        except Exception:
+            self._stats(model).record(time.perf_counter() - start, False)
+            self._breaker(model).record(False)
+            raise
+        self._stats(model).record(time.perf_counter() - start, True)
+        self._breaker(model).record(True)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Rolling p50/p99 latency, error rate and circuit state per model"""
+        return {
+            "models": {
+                model: {
+                    "p50": stats.quantile(0.5),
+                    "p99": stats.quantile(0.99),
+                    "hedge_after": self.hedge_after(model),
+                    "error_rate": stats.error_rate(),
+                    "samples": len(stats.samples),
+                    "circuit": self._breaker(model).state
+                }
+                for model, stats in self.stats.items()
+            },
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers
+        }
+
+def parse_fallbacks(value: str) -> Dict[str, List[str]]:
+    """Parse "model:fallback[|fallback...],..." from config"""
+    fallbacks: Dict[str, List[str]] = {}
+    for entry in value.split(","):
+        if ":" not in entry:
+            continue
+        model, targets = entry.split(":", 1)
+        fallbacks[model.strip()] = [target.strip() for target in targets.split("|") if target.strip()]
+    return fallbacks
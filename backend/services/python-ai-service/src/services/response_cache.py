@@ -0,0 +1,206 @@
+import hashlib
+import json
+import logging
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..middleware.metrics import RESPONSE_CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+Embedder = Callable[[str], Awaitable[List[float]]]
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_text(text: str) -> str:
+    """Unicode- and whitespace-normalized text; case is kept since it matters for NER and translation"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+@dataclass
+class CachedResponse:
+    value: Dict[str, Any]
+    namespace: str
+    expires_at: float
+    slot: Optional[int] = None
+
+class SemanticIndex:
+    """Unit-normalized embeddings of cached inputs, one growable matrix per namespace"""
+
+    GROWTH_ROWS = 256
+
+    def __init__(self):
+        self.matrices: Dict[str, np.ndarray] = {}
+        self.keys: Dict[str, List[Optional[str]]] = {}
+        self.free: Dict[str, List[int]] = {}
+
+    def add(self, namespace: str, key: str, vector: np.ndarray) -> int:
+        vector = vector / (np.linalg.norm(vector) or 1.0)
+        matrix = self.matrices.get(namespace)
+        if matrix is None:
+            matrix = np.zeros((0, vector.shape[0]), dtype=np.float32)
+            self.keys[namespace] = []
+            self.free[namespace] = []
+
+        if self.free[namespace]:
+            slot = self.free[namespace].pop()
+        else:
+            slot = len(self.keys[namespace])
+            self.keys[namespace].append(None)
+            if slot >= matrix.shape[0]:
+                grown = np.zeros((matrix.shape[0] + self.GROWTH_ROWS, matrix.shape[1]), dtype=np.float32)
+                grown[:matrix.shape[0]] = matrix
+                matrix = grown
+        matrix[slot] = vector
+        self.matrices[namespace] = matrix
+        self.keys[namespace][slot] = key
+        return slot
+
+    def remove(self, namespace: str, slot: int):
+        # A zeroed row scores 0 and can never clear the threshold
+        self.matrices[namespace][slot] = 0.0
+        self.keys[namespace][slot] = None
+        self.free[namespace].append(slot)
+
+    def nearest(self, namespace: str, vector: np.ndarray) -> Tuple[Optional[str], float]:
+        matrix = self.matrices.get(namespace)
+        if matrix is None:
+            return None, 0.0
+        vector = vector / (np.linalg.norm(vector) or 1.0)
+        scores = matrix[:len(self.keys[namespace])] @ vector
+        if not len(scores):
+            return None, 0.0
+        best = int(np.argmax(scores))
+        return self.keys[namespace][best], float(scores[best])
+
+class ResponseCache:
+    """TTL- and size-bounded cache for deterministic analysis responses
+
+    Entries are keyed on the kind of analysis, the model, its parameters and
+    the normalized input text. With ``similarity_threshold`` set and an
+    ``embedder`` given, a miss for one of ``semantic_kinds`` falls back to
+    the nearest cached input with the same kind/model/parameters whose
+    cosine similarity clears the threshold.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl: float = 86400.0,
+        embedder: Optional[Embedder] = None,
+        similarity_threshold: float = 0.0,
+        semantic_kinds: Tuple[str, ...] = ("sentiment",)
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+        self.semantic_kinds = set(semantic_kinds)
+        self.entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self.index = SemanticIndex()
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def namespace(kind: str, model: str, params: Dict[str, Any]) -> str:
+        return f"{kind}\0{model}\0{json.dumps(params, sort_keys=True, default=str)}"
+
+    @staticmethod
+    def key(namespace: str, text: str) -> str:
+        return hashlib.sha256(f"{namespace}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+    async def get_or_compute(
+        self,
+        kind: str,
+        model: str,
+        params: Dict[str, Any],
+        text: str,
+        compute: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Cached response and how it was found ("exact", "semantic" or None for a fresh result)"""
+        namespace = self.namespace(kind, model, params)
+        key = self.key(namespace, text)
+
+        value = self._get(key)
+        if value is not None:
+            self.hits += 1
+            RESPONSE_CACHE_REQUESTS.labels(kind=kind, result="exact").inc()
+            return value, "exact"
+
+        vector = None
+        if self._semantic_enabled(kind):
+            vector = await self._embed(text)
+            if vector is not None:
+                nearest, score = self.index.nearest(namespace, vector)
+                if nearest is not None and score >= self.similarity_threshold:
+                    value = self._get(nearest)
+                    if value is not None:
+                        self.semantic_hits += 1
+                        RESPONSE_CACHE_REQUESTS.labels(kind=kind, result="semantic").inc()
+                        return value, "semantic"
+
+        self.misses += 1
+        RESPONSE_CACHE_REQUESTS.labels(kind=kind, result="miss").inc()
+        value = await compute()
+        self._put(namespace, key, value, vector)
+        return value, None
+
+    def _semantic_enabled(self, kind: str) -> bool:
+        return self.embedder is not None and self.similarity_threshold > 0 and kind in self.semantic_kinds
+
+    async def _embed(self, text: str) -> Optional[np.ndarray]:
+        try:
+            return np.asarray(await self.embedder(normalize_text(text)), dtype=np.float32)
+        except Exception as e:
+            # The exact tier still works without embeddings
+            logger.warning(f"Response cache embedding failed: {e}")
+            return None
+
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            self._drop(key)
+            self.expirations += 1
+            return None
+        self.entries.move_to_end(key)
+        return entry.value
+
+    def _put(self, namespace: str, key: str, value: Dict[str, Any], vector: Optional[np.ndarray]):
+        if key in self.entries:
+            self._drop(key)
+        entry = CachedResponse(value=value, namespace=namespace, expires_at=time.time() + self.ttl)
+        if vector is not None:
+            entry.slot = self.index.add(namespace, key, vector)
+        self.entries[key] = entry
+
+        while len(self.entries) > self.max_entries:
+            self._drop(next(iter(self.entries)))
+            self.evictions += 1
+
+    def _drop(self, key: str):
+        entry = self.entries.pop(key)
+        if entry.slot is not None:
+            self.index.remove(entry.namespace, entry.slot)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get cache metrics"""
+        lookups = self.hits + self.semantic_hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": (self.hits + self.semantic_hits) / lookups if lookups else 0.0
+        }
@@ -0,0 +1,304 @@
+import asyncio
+import json
+import logging
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: another process can't rename or delete a file that is open,
+    # which stands in for the lock (see _claim)
+    fcntl = None
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.conversation import ModelUsage
+
+logger = logging.getLogger(__name__)
+
+class UsageRecorder:
+    """Write-behind recorder for ModelUsage rows
+
+    ``record`` appends to an in-memory buffer and a local JSON-lines spool
+    and returns immediately. A background task bulk-inserts the buffer in
+    its own session when ``batch_size`` records are waiting or every
+    ``flush_interval`` seconds.
+    Each flush rotates the spool first and deletes the rotated file only
+    after the insert commits, so records survive a crash and are replayed
+    (skipping rows that already made it in) on the next start.
+    Every process writes its own spool in ``spool_dir`` and holds a lock
+    on each of its spool files, so a starting worker only recovers files
+    left by processes that are gone. Recovery runs on ``start()`` (or the
+    first record), not at construction, which happens at import time.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        spool_dir: str,
+        batch_size: int = 200,
+        flush_interval: float = 2.0
+    ):
+        self.session_factory = session_factory
+        self.spool_dir = Path(spool_dir)
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.buffer: List[Dict[str, Any]] = []
+        self.flushing: List[Dict[str, Any]] = []
+        self.spool_path = self.spool_dir / f"usage-{os.getpid()}-{uuid.uuid4().hex[:8]}.spool"
+        self.spool: Optional[IO[str]] = None
+        # Rotated or recovered spools whose rows are buffered, locked until inserted
+        self.claimed: Dict[Path, IO[str]] = {}
+        self.flush_task: Optional[asyncio.Task] = None
+        self.flush_requested: Optional[asyncio.Event] = None
+        self.flush_lock: Optional[asyncio.Lock] = None
+        self.recovered = False
+
+        self.recorded = 0
+        self.flushed = 0
+        self.flush_errors = 0
+
+    async def start(self):
+        """Recover spools left by dead workers and start flushing; call at startup"""
+        self._ensure_started()
+
+    def record(self, **fields) -> Dict[str, Any]:
+        """Queue one usage row; never touches the database"""
+        row = {
+            "id": str(uuid.uuid4()),
+            "created_at": datetime.utcnow().isoformat(),
+            **fields
+        }
+        self._ensure_started()
+
+        self.spool.write(json.dumps(row, default=str) + "\n")
+        self.spool.flush()
+        self.buffer.append(row)
+        self.recorded += 1
+
+        if len(self.buffer) >= self.batch_size:
+            self.flush_requested.set()
+        return row
+
+    def _ensure_started(self):
+        if not self.recovered:
+            # Before opening our own spool, so it is never a candidate
+            self.recovered = True
+            self._recover_spool()
+        if self.spool is None:
+            self._open_spool()
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_requested = asyncio.Event()
+            self.flush_lock = asyncio.Lock()
+            self.flush_task = asyncio.create_task(self._flush_loop())
+
+    def _open_spool(self):
+        """Open a fresh spool, locked before recovery in other workers can see it"""
+        if fcntl is None:
+            # Held open from creation, so other workers can't claim it
+            self.spool = self.spool_path.open("a")
+            return
+        staging = self.spool_path.with_name(f".{self.spool_path.name}")
+        self.spool = staging.open("a")
+        fcntl.flock(self.spool, fcntl.LOCK_EX)
+        staging.rename(self.spool_path)
+
+    def _recover_spool(self):
+        """Reload records left behind by processes that no longer hold their spools"""
+        for path in sorted(self.spool_dir.glob("usage*.spool*")):
+            claim = self._claim(path)
+            if claim is None:
+                continue
+            path, f = claim
+
+            for line in f:
+                try:
+                    self.buffer.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Torn final line from a crash mid-write
+                    continue
+            self.claimed[path] = f
+        if self.buffer:
+            logger.info(f"Recovered {len(self.buffer)} unflushed usage records from spool")
+
+    def _claim(self, path: Path) -> Optional[Tuple[Path, IO[str]]]:
+        """Take over a spool file unless a live worker still holds it"""
+        if fcntl is None:
+            # Renaming fails while the owner has the file open
+            try:
+                path = path.rename(path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}"))
+            except OSError:
+                return None
+            return path, path.open()
+
+        try:
+            f = path.open()
+        except FileNotFoundError:
+            return None
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            # Still owned by a live worker
+            f.close()
+            return None
+        if not path.exists():
+            # Inserted and deleted by its owner while we waited
+            f.close()
+            return None
+        return path, f
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.flush_requested.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.flush_requested.clear()
+
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Usage flush failed, will retry: {e}")
+
+    async def flush(self):
+        """Bulk insert everything buffered so far"""
+        if self.flush_lock is None:
+            self._ensure_started()
+
+        async with self.flush_lock:
+            if not self.buffer:
+                # Anything still claimed held no rows
+                self._release(list(self.claimed))
+                return
+
+            # Rotate the spool so new records land in a fresh file during the insert
+            rows, self.buffer = self.buffer, []
+            self.flushing = rows
+            if self.spool is not None:
+                self.spool.flush()
+                os.fsync(self.spool.fileno())
+                rotated = self.spool_path.with_name(f"{self.spool_path.name}.{uuid.uuid4().hex}.flushing")
+                if fcntl is None:
+                    # An open file can't be renamed on Windows
+                    self.spool.close()
+                    self.spool_path.rename(rotated)
+                    self.claimed[rotated] = rotated.open()
+                else:
+                    self.spool_path.rename(rotated)
+                    self.claimed[rotated] = self.spool
+                self._open_spool()
+            # Exactly the files whose rows are in this batch
+            inserted = list(self.claimed)
+
+            try:
+                await self._insert(rows)
+            except Exception:
+                self.flush_errors += 1
+                self.buffer = rows + self.buffer
+                raise
+            finally:
+                self.flushing = []
+
+            self.flushed += len(rows)
+            self._release(inserted)
+
+    def _release(self, paths: List[Path]):
+        """Delete spool files whose rows are committed, then drop their locks"""
+        for path in paths:
+            self._discard(path, self.claimed.pop(path))
+
+    @staticmethod
+    def _discard(path: Path, f: IO[str]):
+        if fcntl is None:
+            # Windows can't delete an open file; a replay in between skips committed rows
+            f.close()
+            path.unlink(missing_ok=True)
+        else:
+            path.unlink(missing_ok=True)
+            f.close()
+
+    async def _insert(self, rows: List[Dict[str, Any]]):
+        """Insert rows in one transaction"""
+        async with self.session_factory() as db:
+            # Replayed spool rows may already have been committed before a crash
+            result = await db.execute(
+                select(ModelUsage.id).where(ModelUsage.id.in_([uuid.UUID(row["id"]) for row in rows]))
+            )
+            existing = {str(row_id) for row_id in result.scalars().all()}
+            mappings = [
+                {**row, "id": uuid.UUID(row["id"]), "created_at": datetime.fromisoformat(row["created_at"])}
+                for row in rows
+                if row["id"] not in existing
+            ]
+            if mappings:
+                await db.execute(insert(ModelUsage), mappings)
+            await db.commit()
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Records not yet committed"""
+        return self.flushing + self.buffer
+
+    async def user_costs(self, db: AsyncSession, user_id: str, since: Optional[datetime] = None) -> Dict[str, Any]:
+        """Aggregated requests, tokens and cost per model for a user, including unflushed records"""
+        query = select(
+            ModelUsage.model,
+            func.count(ModelUsage.id),
+            func.coalesce(func.sum(ModelUsage.tokens_used), 0),
+            func.coalesce(func.sum(ModelUsage.cost), 0.0)
+        ).where(ModelUsage.user_id == user_id)
+        if since is not None:
+            query = query.where(ModelUsage.created_at >= since)
+
+        by_model: Dict[str, Dict[str, Any]] = {}
+        result = await db.execute(query.group_by(ModelUsage.model))
+        for model, requests, tokens, cost in result.all():
+            by_model[model] = {"requests": requests, "tokens": int(tokens), "cost": float(cost)}
+
+        for row in self.pending():
+            if row["user_id"] != user_id:
+                continue
+            if since is not None and datetime.fromisoformat(row["created_at"]) < since:
+                continue
+            totals = by_model.setdefault(row["model"], {"requests": 0, "tokens": 0, "cost": 0.0})
+            totals["requests"] += 1
+            totals["tokens"] += row.get("tokens_used") or 0
+            totals["cost"] += row.get("cost") or 0.0
+
+        return {
+            "user_id": user_id,
+            "since": since.isoformat() if since else None,
+            "requests": sum(totals["requests"] for totals in by_model.values()),
+            "tokens": sum(totals["tokens"] for totals in by_model.values()),
+            "cost": sum(totals["cost"] for totals in by_model.values()),
+            "by_model": by_model
+        }
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get recorder metrics"""
+        return {
+            "recorded": self.recorded,
+            "flushed": self.flushed,
+            "pending": len(self.pending()),
+            "flush_errors": self.flush_errors
+        }
+
+    async def close(self):
+        """Flush remaining records and stop the background task"""
+        if self.flush_task:
+            self.flush_task.cancel()
+            try:
+                await self.flush_task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+        if self.spool is not None:
+            # Everything it held was just inserted
+            self._discard(self.spool_path, self.spool)
+            self.spool = None
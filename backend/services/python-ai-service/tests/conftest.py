@@ -0,0 +1,16 @@
+import importlib.util
+import sys
+import os
+
+# Add the service root to the path so tests can import src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Fall back to stand-in ORM models where src/models is not available
+if importlib.util.find_spec("src.models") is None:
+    spec = importlib.util.spec_from_file_location(
+        "src.models.conversation",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "conversation_models.py"),
+    )
+    conversation = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(conversation)
+    sys.modules["src.models.conversation"] = conversation
@@ -0,0 +1,56 @@
+"""
+Stand-in for src.models.conversation, which is not part of this tree.
+Only the columns the services under test read and write are declared.
+"""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Text, Uuid
+from sqlalchemy.orm import declarative_base
+
+Base = declarative_base()
+
+
+class Conversation(Base):
+    __tablename__ = "conversations"
+
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    user_id = Column(String)
+    title = Column(String)
+    model = Column(String)
+    temperature = Column(Float)
+    max_tokens = Column(Integer)
+    context_summary = Column(Text)
+    summary_until = Column(DateTime)
+    summary_until_id = Column(Uuid)
+    updated_at = Column(DateTime)
+
+
+class Message(Base):
+    __tablename__ = "messages"
+
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    conversation_id = Column(Uuid, ForeignKey("conversations.id"))
+    role = Column(String)
+    content = Column(Text)
+    model = Column(String)
+    tokens_used = Column(Integer)
+    token_count = Column(Integer)
+    cost = Column(Float)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ModelUsage(Base):
+    __tablename__ = "model_usage"
+
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    user_id = Column(String)
+    model = Column(String)
+    request_type = Column(String)
+    tokens_used = Column(Integer)
+    cost = Column(Float)
+    response_time = Column(Float)
+    status = Column(String)
+    error_message = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
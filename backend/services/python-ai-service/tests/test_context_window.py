@@ -0,0 +1,71 @@
+import pytest
+import pytest_asyncio
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.models.conversation import Conversation, Message
+from src.services.context_window import ContextWindow, count_tokens
+
+CONTENT = "message content " * 4
+TOKENS = count_tokens(CONTENT)
+
+@pytest_asyncio.fixture
+async def sessions(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'context.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Conversation.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+class TestContextWindowFold:
+    """Test cases for folding old history into the rolling summary"""
+
+    @pytest.mark.asyncio
+    async def test_fold_boundary_inside_same_timestamp_run(self, sessions):
+        """A fold batch ending among equal timestamps leaves the rest of the run unsummarized"""
+        folded = []
+
+        async def summarize(summary, messages):
+            folded.extend(message["content"] for message in messages)
+            return f"{len(folded)} messages"
+
+        conversation_id = uuid.uuid4()
+        start = datetime(2024, 1, 1)
+        # Four messages share a timestamp (e.g. a bulk import); fold_batch splits them
+        timestamps = [start] * 4 + [start + timedelta(seconds=1), start + timedelta(seconds=2)]
+        async with sessions() as db:
+            db.add(Conversation(id=conversation_id, user_id="user-1"))
+            for i, created_at in enumerate(timestamps):
+                db.add(Message(
+                    id=uuid.UUID(int=i + 1),
+                    conversation_id=conversation_id,
+                    role="user",
+                    content=f"{i} {CONTENT}",
+                    created_at=created_at
+                ))
+            await db.commit()
+
+        window = ContextWindow(
+            summarize,
+            sessions,
+            token_budget=TOKENS * 3 + count_tokens("next") + 8,
+            fold_batch=2,
+            fold_target=TOKENS * 2 + 4
+        )
+        for _ in range(2):
+            async with sessions() as db:
+                conversation = await db.get(Conversation, conversation_id)
+                await window.build(db, conversation, "next")
+            task = window.schedule_fold(conversation_id)
+            assert task is not None
+            await task
+
+        assert [content.split()[0] for content in folded] == ["0", "1", "2", "3"]
+        async with sessions() as db:
+            conversation = await db.get(Conversation, conversation_id)
+            assert conversation.summary_until == start
+            assert conversation.summary_until_id == uuid.UUID(int=4)
+            api_messages = await window.build(db, conversation, "next")
+        assert [message["content"].split()[0] for message in api_messages[1:-1]] == ["4", "5"]
@@ -0,0 +1,87 @@
+import pytest
+import multiprocessing
+import threading
+
+import numpy as np
+
+from src.services.embeddings import EmbeddingCache, MmapEmbeddingStore
+
+MODEL = "text-embedding-ada-002"
+
+def vector(seed: int, dimensions: int = 8) -> np.ndarray:
+    return np.full(dimensions, seed, dtype=np.float32)
+
+def write_keys(path: str, worker: int, count: int):
+    """Runs in a separate worker process"""
+    store = MmapEmbeddingStore(path)
+    for i in range(count):
+        seed = worker * 1000 + i
+        store.put(MODEL, f"key-{seed}", vector(seed))
+    store.close()
+
+class TestSharedEmbeddingStore:
+    """Test cases for worker processes sharing one store path"""
+
+    def test_interleaved_writers_agree_on_rows(self, tmp_path):
+        """Keys appended by one store instance are read back correctly by another"""
+        first, second = MmapEmbeddingStore(str(tmp_path)), MmapEmbeddingStore(str(tmp_path))
+        first.put(MODEL, "a", vector(1))
+        second.put(MODEL, "b", vector(2))
+        first.put(MODEL, "c", vector(3))
+
+        for store in (first, second):
+            for key, seed in (("a", 1), ("b", 2), ("c", 3)):
+                np.testing.assert_array_equal(store.get(MODEL, key), vector(seed))
+        first.close()
+        second.close()
+
+        reopened = MmapEmbeddingStore(str(tmp_path))
+        assert reopened.get(MODEL, "b") is not None
+        np.testing.assert_array_equal(reopened.get(MODEL, "b"), vector(2))
+        reopened.close()
+
+    def test_concurrent_processes_do_not_collide(self, tmp_path):
+        """Processes appending at once past the growth size keep every key on its own row"""
+        MmapEmbeddingStore.GROWTH_ROWS, growth = 16, MmapEmbeddingStore.GROWTH_ROWS
+        try:
+            context = multiprocessing.get_context("fork")
+            workers = [context.Process(target=write_keys, args=(str(tmp_path), worker, 60)) for worker in range(4)]
+            for process in workers:
+                process.start()
+            for process in workers:
+                process.join(30)
+                assert process.exitcode == 0
+        finally:
+            MmapEmbeddingStore.GROWTH_ROWS = growth
+
+        store = MmapEmbeddingStore(str(tmp_path))
+        for worker in range(4):
+            for i in range(60):
+                seed = worker * 1000 + i
+                np.testing.assert_array_equal(store.get(MODEL, f"key-{seed}"), vector(seed))
+        assert store.models[MODEL].lines == 240
+        store.close()
+
+class TestEmbeddingCacheStore:
+    """Test cases for the disk tier behind the embedding cache"""
+
+    def test_disk_writes_leave_the_calling_thread(self, tmp_path, monkeypatch):
+        """put() hands the append to the writer thread and close() waits for it"""
+        cache = EmbeddingCache(store_path=str(tmp_path))
+        threads = []
+        put = cache.store.put
+
+        def recording_put(*args):
+            threads.append(threading.current_thread().name)
+            put(*args)
+
+        monkeypatch.setattr(cache.store, "put", recording_put)
+        cache.put("hello", MODEL, [0.5] * 8)
+        assert cache.get("hello", MODEL) is not None
+        cache.close()
+
+        assert len(threads) == 1 and threads[0].startswith("embedding-store")
+        restarted = EmbeddingCache(store_path=str(tmp_path))
+        np.testing.assert_array_equal(restarted.get("hello", MODEL), np.full(8, 0.5, dtype=np.float32))
+        assert restarted.get_metrics()["disk_hits"] == 1
+        restarted.close()
@@ -0,0 +1,70 @@
+import pytest
+import asyncio
+
+from src.services.local_inference import LocalInferenceScheduler
+from src.services.model_pool import ModelLoadError, ModelPool, ModelSpec
+
+SPECS = {"sentiment": ModelSpec("sentiment-analysis", "test/sentiment")}
+
+def echo_pipeline(texts, batch_size, **kwargs):
+    return [{"label": "LABEL_2", "score": 1.0, "text": text} for text in texts]
+
+class TestModelLoadFailure:
+    """Test cases for local models that fail to load"""
+
+    @pytest.mark.asyncio
+    async def test_load_failure_is_reported_as_model_load_error(self):
+        """The first request sees ModelLoadError and the model then reads as missing"""
+        attempts = []
+
+        def failing_loader(spec):
+            attempts.append(spec.model)
+            raise ImportError("No module named 'transformers'")
+
+        pool = ModelPool(SPECS, loader=failing_loader)
+        scheduler = LocalInferenceScheduler(pool, max_wait=0.01)
+        assert "sentiment" in pool
+        try:
+            with pytest.raises(ModelLoadError, match="transformers"):
+                await scheduler.submit("sentiment", "hello")
+        finally:
+            await scheduler.close()
+
+        assert "sentiment" not in pool
+        assert pool.get_stats()["errors"]["sentiment"] == "No module named 'transformers'"
+        assert attempts == ["test/sentiment"]
+
+    @pytest.mark.asyncio
+    async def test_batch_fails_without_reloading_per_request(self):
+        """A batch whose model fails to load is not retried one request at a time"""
+        attempts = []
+
+        def failing_loader(spec):
+            attempts.append(spec.model)
+            raise OSError("model files missing")
+
+        pool = ModelPool(SPECS, loader=failing_loader)
+        scheduler = LocalInferenceScheduler(pool, max_wait=0.05)
+        try:
+            results = await asyncio.gather(
+                *[scheduler.submit("sentiment", f"text {i}") for i in range(5)],
+                return_exceptions=True
+            )
+        finally:
+            await scheduler.close()
+
+        assert all(isinstance(result, ModelLoadError) for result in results)
+        assert len(attempts) == 1
+
+    @pytest.mark.asyncio
+    async def test_loaded_model_serves_batches(self):
+        """A model that loads serves every queued request"""
+        pool = ModelPool(SPECS, loader=lambda spec: echo_pipeline, measure=lambda pipe: 0)
+        scheduler = LocalInferenceScheduler(pool, max_wait=0.05)
+        try:
+            results = await asyncio.gather(*[scheduler.submit("sentiment", f"text {i}") for i in range(3)])
+            assert scheduler.get_metrics()["sentiment"]["batches"] == 1
+        finally:
+            await scheduler.close()
+
+        assert [result["text"] for result in results] == ["text 0", "text 1", "text 2"]
@@ -0,0 +1,115 @@
+import pytest
+import asyncio
+from typing import Dict, List
+
+from src.services.provider_router import ProviderRouter
+
+class FakeProvider:
+    """Answers per model after a fixed delay, or fails, and logs what happened"""
+
+    def __init__(self, delays: Dict[str, float], failing: List[str] = ()):
+        self.delays = delays
+        self.failing = set(failing)
+        self.started: List[str] = []
+        self.cancelled: List[str] = []
+
+    async def __call__(self, model: str) -> str:
+        self.started.append(model)
+        try:
+            await asyncio.sleep(self.delays.get(model, 0))
+        except asyncio.CancelledError:
+            self.cancelled.append(model)
+            raise
+        if model in self.failing:
+            raise ConnectionError(f"{model} unavailable")
+        return f"reply from {model}"
+
+class TestProviderRouter:
+    """Test cases for hedged, circuit-broken model routing"""
+
+    @pytest.mark.asyncio
+    async def test_fast_primary_is_not_hedged(self):
+        """A primary answering within the hedge delay never starts a fallback"""
+        router = ProviderRouter({"primary": ["fallback"]}, hedge_delay=0.2)
+        provider = FakeProvider({"primary": 0.01, "fallback": 0.01})
+
+        assert await router.route("primary", provider) == ("primary", "reply from primary")
+        assert provider.started == ["primary"]
+        assert router.hedges == 0
+
+    @pytest.mark.asyncio
+    async def test_hedge_fires_after_delay_and_loser_is_cancelled(self):
+        """A slow primary is hedged after the delay and cancelled once the hedge wins"""
+        router = ProviderRouter({"primary": ["fallback"]}, hedge_delay=0.05)
+        provider = FakeProvider({"primary": 5.0, "fallback": 0.01})
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        served, result = await router.route("primary", provider)
+        elapsed = loop.time() - start
+
+        assert (served, result) == ("fallback", "reply from fallback")
+        assert provider.started == ["primary", "fallback"]
+        assert 0.05 <= elapsed < 1.0
+        await asyncio.sleep(0.01)
+        assert provider.cancelled == ["primary"]
+        assert router.hedges == 1
+        assert router.hedge_wins == 1
+        # A cancelled loser says nothing about the primary's health
+        assert router.get_stats()["models"]["fallback"]["samples"] == 1
+        assert "primary" not in router.stats
+
+    @pytest.mark.asyncio
+    async def test_error_fails_over_immediately(self):
+        """A failing primary moves on to the fallback without waiting for the hedge"""
+        router = ProviderRouter({"primary": ["fallback"]}, hedge_delay=5.0)
+        provider = FakeProvider({}, failing=["primary"])
+
+        assert await router.route("primary", provider) == ("fallback", "reply from fallback")
+        assert router.failovers == 1
+        assert router.hedges == 0
+
+    @pytest.mark.asyncio
+    async def test_breaker_opens_then_half_opens(self):
+        """Consecutive failures open the circuit; after the reset timeout it is tried again"""
+        router = ProviderRouter(
+            {"primary": ["fallback"]},
+            hedge_delay=None,
+            failure_threshold=2,
+            reset_timeout=0.05
+        )
+        provider = FakeProvider({}, failing=["primary"])
+
+        for _ in range(2):
+            await router.route("primary", provider)
+        assert router.breakers["primary"].state == "open"
+
+        # While open, the primary is skipped entirely
+        provider.started.clear()
+        assert await router.route("primary", provider) == ("fallback", "reply from fallback")
+        assert provider.started == ["fallback"]
+
+        await asyncio.sleep(0.06)
+        assert router.breakers["primary"].state == "half_open"
+
+        # A failed trial call re-opens the circuit for another timeout
+        provider.started.clear()
+        await router.route("primary", provider)
+        assert provider.started == ["primary", "fallback"]
+        assert router.breakers["primary"].state == "open"
+
+        # A successful trial call closes it
+        await asyncio.sleep(0.06)
+        provider.failing.clear()
+        assert await router.route("primary", provider) == ("primary", "reply from primary")
+        assert router.breakers["primary"].state == "closed"
+        assert router.breakers["primary"].failures == 0
+
+    @pytest.mark.asyncio
+    async def test_all_candidates_failing_raises_last_error(self):
+        """When every candidate fails the last error is raised"""
+        router = ProviderRouter({"primary": ["fallback"]}, hedge_delay=None)
+        provider = FakeProvider({}, failing=["primary", "fallback"])
+
+        with pytest.raises(ConnectionError, match="fallback"):
+            await router.route("primary", provider)
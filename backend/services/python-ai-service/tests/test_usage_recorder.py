@@ -0,0 +1,145 @@
+import pytest
+import pytest_asyncio
+import json
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.models.conversation import ModelUsage
+from src.services import usage_recorder
+from src.services.usage_recorder import UsageRecorder
+
+USAGE = {
+    "user_id": "user-1",
+    "model": "gpt-4",
+    "request_type": "chat",
+    "tokens_used": 10,
+    "cost": 0.01,
+    "response_time": 0.5,
+    "status": "success"
+}
+
+@pytest_asyncio.fixture
+async def sessions(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'usage.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(ModelUsage.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+async def count_rows(sessions) -> int:
+    async with sessions() as db:
+        return (await db.execute(select(func.count(ModelUsage.id)))).scalar_one()
+
+def make_recorder(sessions, spool_dir) -> UsageRecorder:
+    # Flushes only when the test asks for one
+    return UsageRecorder(sessions, str(spool_dir), batch_size=1000, flush_interval=3600)
+
+class TestUsageRecorder:
+    """Test cases for the write-behind usage recorder"""
+
+    @pytest.mark.asyncio
+    async def test_replays_already_committed_spool(self, sessions, tmp_path):
+        """Rows committed before a crash are skipped when their spool is replayed"""
+        spool_dir = tmp_path / "spool"
+        recorder = make_recorder(sessions, spool_dir)
+        committed = [recorder.record(**USAGE) for _ in range(3)]
+        await recorder.close()
+        assert await count_rows(sessions) == 3
+
+        # A crash after the commit but before the spool was deleted
+        spool = spool_dir / "usage-999-deadbeef.spool.0.flushing"
+        lost = {**committed[0], "id": "00000000-0000-4000-8000-000000000001"}
+        spool.write_text("".join(json.dumps(row) + "\n" for row in committed + [lost]))
+
+        replay = make_recorder(sessions, spool_dir)
+        await replay.start()
+        assert len(replay.pending()) == 4
+        await replay.close()
+
+        assert await count_rows(sessions) == 4
+        assert replay.flush_errors == 0
+        assert list(spool_dir.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_live_worker_spool_is_left_alone(self, sessions, tmp_path):
+        """A starting worker neither recovers nor deletes another live worker's spool"""
+        spool_dir = tmp_path / "spool"
+        worker_a = make_recorder(sessions, spool_dir)
+        worker_a.record(**USAGE)
+
+        worker_b = make_recorder(sessions, spool_dir)
+        await worker_b.start()
+        assert worker_b.pending() == []
+        worker_b.record(**USAGE)
+        await worker_b.flush()
+
+        assert worker_a.spool_path != worker_b.spool_path
+        assert len(worker_a.spool_path.read_text().splitlines()) == 1
+
+        await worker_a.close()
+        await worker_b.close()
+        assert await count_rows(sessions) == 2
+        assert list(spool_dir.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_crashed_worker_spool_is_recovered(self, sessions, tmp_path):
+        """Records of a worker that died before flushing are inserted by the next one"""
+        spool_dir = tmp_path / "spool"
+        crashed = make_recorder(sessions, spool_dir)
+        row = crashed.record(**USAGE)
+        # Dying releases the lock on its spool
+        crashed.flush_task.cancel()
+        crashed.spool.close()
+
+        recovered = make_recorder(sessions, spool_dir)
+        assert recovered.pending() == []
+        await recovered.start()
+        assert [pending["id"] for pending in recovered.pending()] == [row["id"]]
+        await recovered.close()
+
+        assert await count_rows(sessions) == 1
+        assert list(spool_dir.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_recovery_without_fcntl(self, sessions, tmp_path, monkeypatch):
+        """Without file locks (Windows) spools are claimed by renaming them"""
+        monkeypatch.setattr(usage_recorder, "fcntl", None)
+        spool_dir = tmp_path / "spool"
+        crashed = make_recorder(sessions, spool_dir)
+        row = crashed.record(**USAGE)
+        crashed.flush_task.cancel()
+        crashed.spool.close()
+
+        recovered = make_recorder(sessions, spool_dir)
+        await recovered.start()
+        assert [pending["id"] for pending in recovered.pending()] == [row["id"]]
+        recovered.record(**USAGE)
+        await recovered.flush()
+        recovered.record(**USAGE)
+        await recovered.close()
+
+        assert await count_rows(sessions) == 3
+        assert list(spool_dir.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_failed_insert_keeps_spool(self, sessions, tmp_path):
+        """Rows stay buffered and spooled until an insert succeeds"""
+        spool_dir = tmp_path / "spool"
+        recorder = make_recorder(sessions, spool_dir)
+        recorder.record(**USAGE)
+
+        async def fail(rows):
+            raise ConnectionError("database down")
+
+        insert = recorder._insert
+        recorder._insert = fail
+        with pytest.raises(ConnectionError):
+            await recorder.flush()
+        assert len(recorder.pending()) == 1
+        assert len(list(spool_dir.glob("*.flushing"))) == 1
+
+        recorder._insert = insert
+        await recorder.close()
+        assert await count_rows(sessions) == 1
+        assert list(spool_dir.iterdir()) == []
@@ -7,7 +7,7 @@ import asyncio
 import time
 import functools
 import threading
-from typing import Any, Dict, List, Optional, Callable, Union
+from typing import Any, Awaitable, Dict, List, Optional, Callable, Union
 from dataclasses import dataclass
 from enum import Enum
 import heapq
@@ -15,8 +15,11 @@ import weakref
 import gc
 import psutil
 import logging
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
 import hashlib
+import math
+import random
+import sys
 import pickle
 import zlib
 import lzma
@@ -43,23 +46,75 @@ class PerformanceMetrics:
     active_connections: int
     queue_depth: int
 
+@dataclass
+class AccessSummary:
+    """Fixed-size access history for a single cache key"""
+    last_access: float
+    score: float = 1.0
+    
+    def touch(self, current_time: float, half_life: float):
+        """Decay the score to now and count one more access"""
+        self.score = self.decayed(current_time, half_life) + 1.0
+        self.last_access = current_time
+    
+    def decayed(self, current_time: float, half_life: float) -> float:
+        """Score halved for every half_life seconds since the last access"""
+        return self.score * 0.5 ** ((current_time - self.last_access) / half_life)
+
 class AdvancedCache:
-    """Advanced multi-strategy caching system"""
+    """Advanced multi-strategy caching system
+
+    Every strategy runs in O(1) per operation:
+
+    - LRU keeps ``cache`` in recency order and pops from the front.
+    - LFU keeps keys in per-frequency buckets and tracks the minimum frequency.
+    - TTL pops from an expiry heap with lazy deletion, falling back to LRU for
+      keys stored without a TTL.
+    - ADAPTIVE samples a handful of keys and evicts the lowest-scoring one,
+      the same approximation Redis uses for its eviction policies.
+
+    When ``max_bytes`` is set, entries are also evicted until the estimated
+    size of all cached values fits the byte budget.
+    """
     
-    def __init__(self, max_size: int = 10000, strategy: CacheStrategy = CacheStrategy.ADAPTIVE):
+    ADAPTIVE_SAMPLE_SIZE = 5
+    DECAY_HALF_LIFE = 300.0
+    
+    def __init__(self, max_size: int = 10000, strategy: CacheStrategy = CacheStrategy.ADAPTIVE,
+                 max_bytes: Optional[int] = None):
         self.max_size = max_size
+        self.max_bytes = max_bytes
         self.strategy = strategy
-        self.cache = {}
-        self.access_times = defaultdict(list)
+        self.cache = OrderedDict()
+        self.access_stats: Dict[str, AccessSummary] = {}
         self.access_counts = defaultdict(int)
+        self.entry_sizes: Dict[str, int] = {}
+        self.total_bytes = 0
         self.expiry_times = {}
         self.heap = []
         self.lock = threading.RLock()
         
+        # LFU frequency buckets: count -> keys in insertion order
+        self._freq_buckets = defaultdict(OrderedDict)
+        self._min_freq = 0
+        
+        # Dense key list for O(1) random sampling in adaptive mode
+        self._sample_keys = []
+        self._sample_index = {}
+        self._random = random.Random()
+        
+        # Counters reported by get_metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejections = 0
+        
     def get(self, key: str) -> Any:
         """Get value from cache with strategy-specific logic"""
         with self.lock:
             if key not in self.cache:
+                self.misses += 1
                 return None
             
             current_time = time.time()
@@ -67,22 +122,33 @@ class AdvancedCache:
             # Check TTL expiry
             if key in self.expiry_times and current_time > self.expiry_times[key]:
                 self._remove_key(key)
+                self.expirations += 1
+                self.misses += 1
                 return None
             
             # Update access metrics
-            self.access_times[key].append(current_time)
+            self.access_stats[key].touch(current_time, self.DECAY_HALF_LIFE)
             self.access_counts[key] += 1
+            self.hits += 1
             
             # Strategy-specific operations
-            if self.strategy == CacheStrategy.LRU:
+            if self.strategy == CacheStrategy.LRU or self.strategy == CacheStrategy.TTL:
                 self._update_lru(key)
             elif self.strategy == CacheStrategy.LFU:
                 self._update_lfu(key)
             
             return self.cache[key]
     
-    def put(self, key: str, value: Any, ttl: Optional[float] = None):
-        """Put value in cache with automatic eviction"""
+    def put(self, key: str, value: Any, ttl: Optional[float] = None, size: Optional[int] = None):
+        """Put value in cache with automatic eviction
+        
+        ``size`` overrides the estimated size of ``value`` in bytes. Values
+        larger than ``max_bytes`` on their own are not cached. Sizes are only
+        estimated when a byte budget is set.
+        """
+        if size is None:
+            size = self._estimate_size(value) if self.max_bytes is not None else 0
+        
         with self.lock:
             current_time = time.time()
             
@@ -90,33 +156,60 @@ class AdvancedCache:
             if key in self.cache:
                 self._remove_key(key)
             
+            if self.max_bytes is not None and size > self.max_bytes:
+                self.rejections += 1
+                return
+            
+            # Evict if necessary
+            while self.cache and (
+                len(self.cache) >= self.max_size
+                or (self.max_bytes is not None and self.total_bytes + size > self.max_bytes)
+            ):
+                self._evict()
+            
             # Add new key
             self.cache[key] = value
-            self.access_times[key].append(current_time)
+            self.access_stats[key] = AccessSummary(last_access=current_time)
             self.access_counts[key] = 1
+            self.entry_sizes[key] = size
+            self.total_bytes += size
             
             if ttl:
                 self.expiry_times[key] = current_time + ttl
+                heapq.heappush(self.heap, (self.expiry_times[key], key))
             
-            # Evict if necessary
-            while len(self.cache) >= self.max_size:
-                self._evict()
+            if self.strategy == CacheStrategy.LFU:
+                self._freq_buckets[1][key] = None
+                self._min_freq = 1
+            elif self.strategy == CacheStrategy.ADAPTIVE:
+                self._sample_index[key] = len(self._sample_keys)
+                self._sample_keys.append(key)
+    
+    def delete(self, key: str):
+        """Remove key from cache if present"""
+        with self.lock:
+            self._remove_key(key)
+    
+    def clear(self):
+        """Remove every key from cache"""
+        with self.lock:
+            for key in list(self.cache):
+                self._remove_key(key)
     
     def _update_lru(self, key: str):
         """Update LRU tracking"""
-        # Remove old entry from heap if exists
-        for i, (timestamp, k) in enumerate(self.heap):
-            if k == key:
-                heapq.heappop(self.heap)
-                break
-        
-        # Add new entry
-        heapq.heappush(self.heap, (time.time(), key))
+        self.cache.move_to_end(key)
     
     def _update_lfu(self, key: str):
-        """Update LFU tracking"""
-        # LFU uses access counts, no additional tracking needed
-        pass
+        """Move key from its frequency bucket to the next one"""
+        freq = self.access_counts[key] - 1
+        bucket = self._freq_buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._freq_buckets[freq]
+            if self._min_freq == freq:
+                self._min_freq = freq + 1
+        self._freq_buckets[freq + 1][key] = None
     
     def _evict(self):
         """Evict key based on strategy"""
@@ -124,61 +217,102 @@ class AdvancedCache:
             return
         
         if self.strategy == CacheStrategy.LRU:
-            if self.heap:
-                _, key = heapq.heappop(self.heap)
-                self._remove_key(key)
+            key = next(iter(self.cache))
         elif self.strategy == CacheStrategy.LFU:
-            # Evict least frequently used
-            key = min(self.access_counts.keys(), key=lambda k: self.access_counts[k])
-            self._remove_key(key)
+            key = self._lfu_victim()
         elif self.strategy == CacheStrategy.TTL:
-            # Evict expired keys first
-            current_time = time.time()
-            expired_keys = [k for k, expiry in self.expiry_times.items() if current_time > expiry]
-            if expired_keys:
-                self._remove_key(expired_keys[0])
-            else:
-                # Evict oldest
-                key = min(self.expiry_times.keys(), key=lambda k: self.expiry_times[k])
-                self._remove_key(key)
+            key = self._ttl_victim()
         else:  # ADAPTIVE
-            self._adaptive_evict()
-    
-    def _adaptive_evict(self):
-        """Adaptive eviction based on multiple factors"""
+            key = self._adaptive_victim()
+        
+        self._remove_key(key)
+        self.evictions += 1
+    
+    def _lfu_victim(self) -> str:
+        """Least frequently used key, oldest first within a frequency"""
+        if self._min_freq not in self._freq_buckets:
+            # Arbitrary removals can empty the minimum bucket; the number of
+            # distinct frequencies is small, so rescanning them is cheap.
+            self._min_freq = min(self._freq_buckets)
+        return next(iter(self._freq_buckets[self._min_freq]))
+    
+    def _ttl_victim(self) -> str:
+        """Earliest-expiring key, or least recently used if none have a TTL"""
+        while self.heap:
+            expiry, key = self.heap[0]
+            if self.expiry_times.get(key) == expiry:
+                return key
+            # Stale entry left behind by a removal or overwrite
+            heapq.heappop(self.heap)
+        return next(iter(self.cache))
+    
+    def _adaptive_victim(self) -> str:
+        """Lowest-scoring key out of a small random sample"""
         current_time = time.time()
+        sample_size = min(self.ADAPTIVE_SAMPLE_SIZE, len(self._sample_keys))
         
-        # Calculate scores for each key
-        scores = {}
-        for key in self.cache:
-            access_count = self.access_counts[key]
-            last_access = max(self.access_times[key])
-            age = current_time - last_access
+        victim = None
+        victim_score = None
+        for _ in range(sample_size):
+            key = self._sample_keys[self._random.randrange(len(self._sample_keys))]
             
-            # Score: higher access count and recent access = higher score
-            score = access_count / (1 + age)
-            scores[key] = score
+            # Decayed access count: frequent and recent keys score higher
+            score = self.access_stats[key].decayed(current_time, self.DECAY_HALF_LIFE)
+            if victim_score is None or score < victim_score:
+                victim, victim_score = key, score
         
-        # Evict key with lowest score
-        if scores:
-            key = min(scores.keys(), key=lambda k: scores[k])
-            self._remove_key(key)
+        return victim
     
     def _remove_key(self, key: str):
         """Remove key from all tracking structures"""
         if key in self.cache:
             del self.cache[key]
-        if key in self.access_times:
-            del self.access_times[key]
+        if key in self.access_stats:
+            del self.access_stats[key]
+        if key in self.entry_sizes:
+            self.total_bytes -= self.entry_sizes.pop(key)
         if key in self.access_counts:
-            del self.access_counts[key]
+            freq = self.access_counts.pop(key)
+            bucket = self._freq_buckets.get(freq)
+            if bucket is not None and key in bucket:
+                del bucket[key]
+                if not bucket:
+                    del self._freq_buckets[freq]
         if key in self.expiry_times:
+            # The heap entry is skipped lazily in _ttl_victim
             del self.expiry_times[key]
-        
-        # Remove from heap
-        self.heap = [(ts, k) for ts, k in self.heap if k != key]
+            if len(self.heap) > 2 * len(self.expiry_times) + 64:
+                self._compact_heap()
+        if key in self._sample_index:
+            # Swap with the last key so removal stays O(1)
+            index = self._sample_index.pop(key)
+            last_key = self._sample_keys.pop()
+            if last_key != key:
+                self._sample_keys[index] = last_key
+                self._sample_index[last_key] = index
+    
+    def _compact_heap(self):
+        """Drop stale expiry entries once they outnumber live ones"""
+        self.heap = [(expiry, k) for expiry, k in self.heap if self.expiry_times.get(k) == expiry]
         heapq.heapify(self.heap)
     
+    @staticmethod
+    def _estimate_size(value: Any) -> int:
+        """Estimate the memory footprint of a cached value in bytes"""
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return len(value)
+        if isinstance(value, str):
+            return len(value.encode('utf-8'))
+        try:
+            return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            return sys.getsizeof(value)
+    
+    def get_hit_rate(self) -> float:
+        """Get cache hit rate"""
+        total = self.hits + self.misses
+        return (self.hits / total * 100) if total > 0 else 0.0
+    
     def get_metrics(self) -> Dict[str, Any]:
         """Get cache performance metrics"""
         with self.lock:
@@ -186,11 +320,149 @@ class AdvancedCache:
             return {
                 'size': len(self.cache),
                 'max_size': self.max_size,
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
                 'total_accesses': total_accesses,
                 'unique_keys': len(self.access_counts),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.get_hit_rate(),
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'rejections': self.rejections,
                 'strategy': self.strategy.value
             }
 
+class ShardedCache:
+    """Lock-striped cache that spreads keys over independent AdvancedCache shards
+
+    Each shard has its own lock and eviction state, so threads working on
+    different keys rarely contend. Capacity limits are split evenly between
+    shards, which makes eviction approximate across the cache as a whole.
+    """
+    
+    def __init__(self, max_size: int = 10000, strategy: CacheStrategy = CacheStrategy.ADAPTIVE,
+                 max_bytes: Optional[int] = None, shards: int = 16):
+        if shards < 1:
+            raise ValueError(f"Shard count must be positive: {shards}")
+        
+        self.strategy = strategy
+        shard_size = max(1, -(-max_size // shards))
+        shard_bytes = -(-max_bytes // shards) if max_bytes is not None else None
+        self.shards = [AdvancedCache(shard_size, strategy, shard_bytes) for _ in range(shards)]
+    
+    @property
+    def max_size(self) -> int:
+        return sum(shard.max_size for shard in self.shards)
+    
+    def _shard_for(self, key: str) -> AdvancedCache:
+        """Shard owning the given key"""
+        return self.shards[hash(key) % len(self.shards)]
+    
+    def get(self, key: str) -> Any:
+        """Get value from the key's shard"""
+        return self._shard_for(key).get(key)
+    
+    def put(self, key: str, value: Any, ttl: Optional[float] = None, size: Optional[int] = None):
+        """Put value in the key's shard"""
+        self._shard_for(key).put(key, value, ttl, size)
+    
+    def delete(self, key: str):
+        """Remove key from its shard"""
+        self._shard_for(key).delete(key)
+    
+    def clear(self):
+        """Remove every key from every shard"""
+        for shard in self.shards:
+            shard.clear()
+    
+    def get_hit_rate(self) -> float:
+        """Get cache hit rate across all shards"""
+        hits = sum(shard.hits for shard in self.shards)
+        total = hits + sum(shard.misses for shard in self.shards)
+        return (hits / total * 100) if total > 0 else 0.0
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get cache performance metrics summed over all shards"""
+        shard_metrics = [shard.get_metrics() for shard in self.shards]
+        totals = {
+            field: sum(metrics[field] for metrics in shard_metrics)
+            for field in ('size', 'max_size', 'bytes', 'total_accesses', 'unique_keys',
+                          'hits', 'misses', 'evictions', 'expirations', 'rejections')
+        }
+        lookups = totals['hits'] + totals['misses']
+        totals.update({
+            'max_bytes': None if self.shards[0].max_bytes is None else sum(shard.max_bytes for shard in self.shards),
+            'hit_rate': (totals['hits'] / lookups * 100) if lookups > 0 else 0.0,
+            'strategy': self.strategy.value,
+            'shards': len(self.shards)
+        })
+        return totals
+
+@dataclass
+class CachedResult:
+    """Cached function result with the metadata needed for early refresh"""
+    value: Any
+    expires_at: Optional[float] = None
+    compute_time: float = 0.0
+    
+    def should_refresh(self, early_refresh_beta: float = 0.0, current_time: Optional[float] = None) -> bool:
+        """Whether the result is stale or due for a probabilistic early refresh
+        
+        Uses the XFetch rule: the closer the entry is to expiry and the longer
+        it took to compute, the more likely a reader is to refresh it early,
+        which spreads recomputation out instead of stampeding at expiry.
+        """
+        if self.expires_at is None:
+            return False
+        
+        current_time = current_time or time.time()
+        if current_time >= self.expires_at:
+            return True
+        if early_refresh_beta <= 0:
+            return False
+        
+        jitter = -self.compute_time * early_refresh_beta * math.log(1.0 - random.random())
+        return current_time + jitter >= self.expires_at
+
+def qualified_name(func: Callable) -> str:
+    """Module-qualified function name, so cache keys of same-named functions differ"""
+    return f"{func.__module__}.{func.__qualname__}"
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one in-flight task
+    
+    The work runs in its own task, so cancelling one waiter never cancels
+    the call the other waiters are sharing.
+    """
+    
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+    
+    def spawn(self, key: str, func: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Start func for key unless a call for key is already running"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._finish, key))
+        return task
+    
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run func for key, or wait for the call already in flight"""
+        return await asyncio.shield(self.spawn(key, func))
+    
+    def in_flight(self, key: str) -> bool:
+        """Whether a call for key is currently running"""
+        return key in self._inflight
+    
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception retrieved; waiters re-raise it themselves
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Single-flight call for {key} failed: {task.exception()}")
+
 class ConnectionPool:
     """Advanced connection pool with health monitoring"""
     
@@ -303,13 +575,21 @@ class PerformanceOptimizer:
         self.optimization_rules = []
         self.resource_monitor = ResourceMonitor()
         
-    def create_cache(self, name: str, max_size: int = 10000, strategy: CacheStrategy = CacheStrategy.ADAPTIVE) -> AdvancedCache:
-        """Create named cache with specified strategy"""
-        cache = AdvancedCache(max_size, strategy)
+    def create_cache(self, name: str, max_size: int = 10000, strategy: CacheStrategy = CacheStrategy.ADAPTIVE,
+                     max_bytes: Optional[int] = None, shards: int = 1) -> Union[AdvancedCache, ShardedCache]:
+        """Create named cache with specified strategy
+        
+        With ``shards`` > 1 keys are spread over independently locked shards
+        so multi-threaded callers of ``sync_cache`` do not serialize on one lock.
+        """
+        if shards > 1:
+            cache = ShardedCache(max_size, strategy, max_bytes, shards)
+        else:
+            cache = AdvancedCache(max_size, strategy, max_bytes)
         self.caches[name] = cache
         return cache
     
-    def get_cache(self, name: str) -> Optional[AdvancedCache]:
+    def get_cache(self, name: str) -> Optional[Union[AdvancedCache, ShardedCache]]:
         """Get cache by name"""
         return self.caches.get(name)
     
@@ -323,9 +603,20 @@ class PerformanceOptimizer:
         """Get connection pool by name"""
         return self.connection_pools.get(name)
     
-    def async_cache(self, cache_name: str, ttl: Optional[float] = None):
-        """Decorator for async function caching"""
+    def async_cache(self, cache_name: str, ttl: Optional[float] = None,
+                    stale_ttl: Optional[float] = None, early_refresh_beta: float = 0.0):
+        """Decorator for async function caching
+        
+        Concurrent misses for the same arguments share a single call. With
+        ``stale_ttl`` an expired result is still served for that many seconds
+        while one background call refreshes it, and ``early_refresh_beta`` > 0
+        enables probabilistic refresh shortly before expiry (1.0 is a good
+        default). Both need ``ttl`` to be set.
+        """
         def decorator(func):
+            # Per function, so same-named functions never share a call
+            single_flight = SingleFlight()
+            
             @functools.wraps(func)
             async def wrapper(*args, **kwargs):
                 cache = self.get_cache(cache_name)
@@ -333,20 +624,29 @@ class PerformanceOptimizer:
                     return await func(*args, **kwargs)
                 
                 # Generate cache key
-                cache_key = self._generate_cache_key(func.__name__, args, kwargs)
+                cache_key = self._generate_cache_key(qualified_name(func), args, kwargs)
                 
-                # Try to get from cache
-                result = cache.get(cache_key)
-                if result is not None:
+                async def compute():
+                    start_time = time.time()
+                    result = await func(*args, **kwargs)
+                    end_time = time.time()
+                    
+                    # Cache result, keeping it around for the stale window
+                    if result is not None:
+                        entry = CachedResult(result, end_time + ttl if ttl else None, end_time - start_time)
+                        cache.put(cache_key, entry, ttl + (stale_ttl or 0) if ttl else None)
+                    
                     return result
                 
-                # Execute function
-                result = await func(*args, **kwargs)
-                
-                # Cache result
-                cache.put(cache_key, result, ttl)
+                # Try to get from cache
+                entry = cache.get(cache_key)
+                if entry is not None:
+                    if entry.should_refresh(early_refresh_beta):
+                        single_flight.spawn(cache_key, compute)
+                    return entry.value
                 
-                return result
+                # Execute function once for all concurrent callers
+                return await single_flight.do(cache_key, compute)
             return wrapper
         return decorator
     
@@ -360,7 +660,7 @@ class PerformanceOptimizer:
                     return func(*args, **kwargs)
                 
                 # Generate cache key
-                cache_key = self._generate_cache_key(func.__name__, args, kwargs)
+                cache_key = self._generate_cache_key(qualified_name(func), args, kwargs)
                 
                 # Try to get from cache
                 result = cache.get(cache_key)
@@ -443,11 +743,12 @@ class PerformanceOptimizer:
         # Clear caches if memory pressure is high
         memory_percent = self.resource_monitor.get_memory_usage()
         if memory_percent > 80:
-            for cache in self.caches.values():
+            for cache in self._iter_cache_shards():
                 # Clear 50% of cache
-                keys_to_remove = list(cache.cache.keys())[:len(cache.cache) // 2]
-                for key in keys_to_remove:
-                    cache._remove_key(key)
+                with cache.lock:
+                    keys_to_remove = list(cache.cache.keys())[:len(cache.cache) // 2]
+                    for key in keys_to_remove:
+                        cache._remove_key(key)
     
     def get_performance_metrics(self) -> PerformanceMetrics:
         """Get comprehensive performance metrics"""
@@ -459,8 +760,8 @@ class PerformanceOptimizer:
         total_cache_requests = 0
         for cache in self.caches.values():
             metrics = cache.get_metrics()
-            total_cache_hits += metrics.get('total_accesses', 0)
-            total_cache_requests += metrics.get('unique_keys', 0)
+            total_cache_hits += metrics.get('hits', 0)
+            total_cache_requests += metrics.get('hits', 0) + metrics.get('misses', 0)
         
         cache_hit_rate = (total_cache_hits / max(total_cache_requests, 1)) * 100
         
@@ -495,8 +796,13 @@ class PerformanceOptimizer:
         
         if metrics.cache_hit_rate < 70:
             # Increase cache sizes
-            for cache in self.caches.values():
+            for cache in self._iter_cache_shards():
                 cache.max_size = int(cache.max_size * 1.2)
+    
+    def _iter_cache_shards(self):
+        """Yield every AdvancedCache, looking inside sharded caches"""
+        for cache in self.caches.values():
+            yield from getattr(cache, 'shards', [cache])
 
 class ResourceMonitor:
     """Monitor system resources"""
@@ -527,9 +833,10 @@ class ResourceMonitor:
 performance_optimizer = PerformanceOptimizer()
 
 # Decorators for easy use
-def async_cache(cache_name: str, ttl: Optional[float] = None):
+def async_cache(cache_name: str, ttl: Optional[float] = None,
+                stale_ttl: Optional[float] = None, early_refresh_beta: float = 0.0):
     """Async function caching decorator"""
-    return performance_optimizer.async_cache(cache_name, ttl)
+    return performance_optimizer.async_cache(cache_name, ttl, stale_ttl, early_refresh_beta)
 
 def sync_cache(cache_name: str, ttl: Optional[float] = None):
     """Sync function caching decorator"""
@@ -26,6 +26,10 @@ class Settings(BaseSettings):
         default="sqlite:///./sallie.db",
         env="DATABASE_URL"
     )
+    DB_POOL_SIZE: int = Field(default=10, env="DB_POOL_SIZE")  # async engine connections kept open
+    DB_MAX_OVERFLOW: int = Field(default=20, env="DB_MAX_OVERFLOW")  # extra connections under burst load
+    DB_POOL_TIMEOUT: float = Field(default=30.0, env="DB_POOL_TIMEOUT")  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = Field(default=1800, env="DB_POOL_RECYCLE")  # seconds before a connection is replaced
     
     # Redis Configuration (for caching and sessions)
     REDIS_URL: str = Field(
@@ -50,6 +54,8 @@ class Settings(BaseSettings):
     )
     JWT_ALGORITHM: str = Field(default="HS256", env="JWT_ALGORITHM")
     JWT_EXPIRE_MINUTES: int = Field(default=60 * 24 * 7, env="JWT_EXPIRE_MINUTES")  # 7 days
+    AUTH_TOKEN_CACHE_SIZE: int = Field(default=10000, env="AUTH_TOKEN_CACHE_SIZE")  # verified tokens kept by the gateway
+    AUTH_TOKEN_CACHE_TTL: float = Field(default=300.0, env="AUTH_TOKEN_CACHE_TTL")  # seconds, never past the token's exp
     
     # CORS Configuration
     CORS_ORIGINS: list = Field(
@@ -97,6 +103,39 @@ class Settings(BaseSettings):
     # Rate Limiting Configuration
     RATE_LIMIT_REQUESTS: int = Field(default=100, env="RATE_LIMIT_REQUESTS")
     RATE_LIMIT_WINDOW: int = Field(default=3600, env="RATE_LIMIT_WINDOW")  # 1 hour
+    RATE_LIMIT_ALGORITHM: str = Field(default="gcra", env="RATE_LIMIT_ALGORITHM")  # gcra, sliding_window
+    RATE_LIMIT_IDLE_SWEEP: int = Field(default=64, env="RATE_LIMIT_IDLE_SWEEP")  # idle keys dropped per check
+    RATE_LIMIT_MODE: str = Field(default="redis", env="RATE_LIMIT_MODE")  # redis, hybrid
+    RATE_LIMIT_LEASE_SIZE: int = Field(default=20, env="RATE_LIMIT_LEASE_SIZE")  # hybrid: local requests per key between syncs
+    RATE_LIMIT_SYNC_INTERVAL: float = Field(default=1.0, env="RATE_LIMIT_SYNC_INTERVAL")  # hybrid: seconds
+    
+    # Upstream HTTP Client Configuration (gateway -> services)
+    UPSTREAM_MAX_CONNECTIONS: int = Field(default=100, env="UPSTREAM_MAX_CONNECTIONS")  # per service
+    UPSTREAM_MAX_KEEPALIVE: int = Field(default=20, env="UPSTREAM_MAX_KEEPALIVE")  # per service
+    UPSTREAM_KEEPALIVE_EXPIRY: float = Field(default=30.0, env="UPSTREAM_KEEPALIVE_EXPIRY")  # seconds
+    UPSTREAM_TIMEOUT: float = Field(default=30.0, env="UPSTREAM_TIMEOUT")  # seconds
+    UPSTREAM_HTTP2: bool = Field(default=True, env="UPSTREAM_HTTP2")  # negotiated over TLS only
+    UPSTREAM_CHANNEL_MAX_IN_FLIGHT: int = Field(default=256, env="UPSTREAM_CHANNEL_MAX_IN_FLIGHT")  # frames awaiting a reply
+    UPSTREAM_CHANNEL_TIMEOUT: float = Field(default=10.0, env="UPSTREAM_CHANNEL_TIMEOUT")  # seconds per frame
+    UPSTREAM_CHANNEL_RECONNECT_MAX: float = Field(default=30.0, env="UPSTREAM_CHANNEL_RECONNECT_MAX")  # backoff cap, seconds
+    COMMUNICATION_CHANNEL_PATH: str = Field(default="", env="COMMUNICATION_CHANNEL_PATH")  # empty (disabled) until the communication service mounts serveGatewayChannel (src/services/gatewayChannel.ts) at e.g. /ws/gateway
+    
+    # Metrics Configuration
+    METRICS_LATENCY_BUCKETS: str = Field(
+        default="0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10,30,60",
+        env="METRICS_LATENCY_BUCKETS"
+    )  # request latency histogram bounds, seconds
+    METRICS_MAX_ROUTES: int = Field(default=200, env="METRICS_MAX_ROUTES")  # route labels before "<other>"
+    
+    # Flow Session Configuration (genesis / convergence onboarding state)
+    # Per-user locking is per worker; concurrent requests for one user on two workers are last-write-wins
+    SESSION_STORE_URL: str = Field(default="sqlite:///./flow_sessions.db", env="SESSION_STORE_URL")  # memory://, sqlite:///path, redis://host:port/db
+    SESSION_TTL: int = Field(default=7 * 24 * 3600, env="SESSION_TTL")  # seconds an idle session is kept
+    SESSION_MEMORY_MAX_ENTRIES: int = Field(default=10000, env="SESSION_MEMORY_MAX_ENTRIES")  # memory:// LRU size
+
+    # Request Batching Configuration
+    BATCH_MAX_OPERATIONS: int = Field(default=100, env="BATCH_MAX_OPERATIONS")
+    BATCH_MAX_CONCURRENCY: int = Field(default=10, env="BATCH_MAX_CONCURRENCY")
     
     class Config:
         env_file = ".env"
@@ -11,6 +11,9 @@ from enum import Enum
 import logging
 from datetime import datetime
 
+from .config import settings
+from .session_store import SessionStore, create_session_backend
+
 logger = logging.getLogger(__name__)
 
 class QuestionType(Enum):
@@ -58,12 +61,33 @@ class ConvergenceQuestion:
 class ConvergenceEngine:
     """Enhanced convergence engine with 29 questions"""
     
+    _questions: Optional[List[ConvergenceQuestion]] = None
+    
     def __init__(self):
-        self.questions = self._generate_complete_questions()
+        # The question set is static, so every user's engine shares one copy
+        if ConvergenceEngine._questions is None:
+            ConvergenceEngine._questions = self._generate_complete_questions()
+        self.questions = ConvergenceEngine._questions
         self.current_index = 0
         self.answers = {}
         self.convergence_state = {}
         self.user_profile = {}
+    
+    def to_state(self) -> Dict[str, Any]:
+        """Per-user state for the session store; profile and metrics are derived"""
+        return {"current_index": self.current_index, "answers": self.answers}
+    
+    @classmethod
+    def from_state(cls, state: Optional[Dict[str, Any]]) -> "ConvergenceEngine":
+        """Rebuild an engine from stored state, or start a fresh one"""
+        engine = cls()
+        if state:
+            engine.current_index = state["current_index"]
+            # JSON keys are strings; question ids are ints
+            engine.answers = {int(question_id): answer for question_id, answer in state["answers"].items()}
+            if engine.answers:
+                engine._update_convergence_state()
+        return engine
         
     def _generate_complete_questions(self) -> List[ConvergenceQuestion]:
         """Generate all 29 convergence questions"""
@@ -488,7 +512,7 @@ class ConvergenceEngine:
                 required=True,
                 validation_rules={
                     "min_length": 200,
-                    "max_length": 3000"
+                    "max_length": 3000
                 },
                 weight=2.0
             )
@@ -593,10 +617,10 @@ class ConvergenceEngine:
                     return {"valid": False, "error": "Slider answer must be a number"}
                 
                 if question.min_value is not None and answer < question.min_value:
-                    return {"valid": False, error": f"Answer must be at least {question.min_value}"}
+                    return {"valid": False, "error": f"Answer must be at least {question.min_value}"}
                 
                 if question.max_value is not None and answer > question.max_value:
-                    return {"valid": False, error": f"Answer must be no more than {question.max_value}"}
+                    return {"valid": False, "error": f"Answer must be no more than {question.max_value}"}
             
             elif question.type == QuestionType.RANKING:
                 if not isinstance(answer, list):
@@ -605,7 +629,7 @@ class ConvergenceEngine:
                 if question.options:
                     invalid_items = [item for item in answer if item not in question.options]
                     if invalid_items:
-                        return {"valid": False, error": f"Invalid ranking items: {invalid_items}"}
+                        return {"valid": False, "error": f"Invalid ranking items: {invalid_items}"}
             
             elif question.type == QuestionType.FILE_UPLOAD:
                 if question.required and not answer:
@@ -619,10 +643,10 @@ class ConvergenceEngine:
                 
                 if question.validation_rules:
                     if "min_length" in question.validation_rules and len(answer) < question.validation_rules["min_length"]:
-                        return {"valid": False, error": f"Answer must be at least {question.validation_rules['min_length']} characters"}
+                        return {"valid": False, "error": f"Answer must be at least {question.validation_rules['min_length']} characters"}
                     
                     if "max_length" in question.validation_rules and len(answer) > question.validation_rules["max_length"]:
-                        return {"valid": False, error": f"Answer must be no more than {question.validation_rules['max_length']} characters"}
+                        return {"valid": False, "error": f"Answer must be no more than {question.validation_rules['max_length']} characters"}
             
             return {"valid": True, "error": None}
             
@@ -731,9 +755,9 @@ class ConvergenceEngine:
         """Calculate convergence metrics"""
         total_weight = sum(q.weight for q in self.questions)
         answered_weight = sum(
-            self.questions[q.id - 1].weight 
-            for q in self.answers.keys()
-            if 1 <= q.id <= len(self.questions)
+            self.questions[question_id - 1].weight
+            for question_id in self.answers.keys()
+            if 1 <= question_id <= len(self.questions)
         )
         
         completion_rate = answered_weight / total_weight if total_weight > 0 else 0
@@ -752,8 +776,8 @@ class ConvergenceEngine:
             "completion_rate": completion_rate,
             "overall_alignment": overall_alignment,
             "alignment_scores": alignment_scores,
-            "convergence_strength": self._assess_convergence_strength(),
-            "readiness_score": self._calculate_readiness_score()
+            "convergence_strength": self._assess_convergence_strength(completion_rate, overall_alignment),
+            "readiness_score": self._calculate_readiness_score(completion_rate, overall_alignment)
         }
     
     def _calculate_identity_alignment(self) -> float:
@@ -809,32 +833,28 @@ class ConvergenceEngine:
         
         for q_id in growth_questions:
             if q_id in self.answers:
-                question = next(q for q in q.questions if q.id == q_id)
+                question = next(q for q in self.questions if q.id == q_id)
                 growth_weight += question.weight
         
         total_growth_weight = sum(q.weight for q in self.questions if q.category == QuestionCategory.GROWTH)
         
         return growth_weight / total_growth_weight if total_growth_weight > 0 else 0
     
-    def _assess_convergence_strength(self) -> float:
+    def _assess_convergence_strength(self, completion_rate: float, overall_alignment: float) -> float:
         """Assess overall convergence strength"""
-        metrics = self._calculate_convergence_metrics()
-        
         # Weighted combination of completion and alignment
-        strength = (metrics["completion_rate"] * 0.4 + 
-                     metrics["overall_alignment"] * 0.6)
+        strength = (completion_rate * 0.4 + 
+                     overall_alignment * 0.6)
         
         return strength
     
-    def _calculate_readiness_score(self) -> float:
+    def _calculate_readiness_score(self, completion_rate: float, overall_alignment: float) -> float:
         """Calculate readiness score for partnership"""
-        metrics = self._calculate_convergence_metrics()
-        
         # Consider completion rate, alignment, and question depth
         depth_factor = len(self.answers) / len(self.questions)
         
-        readiness = (metrics["completion_rate"] * 0.3 + 
-                    metrics["overall_alignment"] * 0.5 +
+        readiness = (completion_rate * 0.3 + 
+                    overall_alignment * 0.5 +
                     depth_factor * 0.2)
         
         return readiness
@@ -901,5 +921,13 @@ class ConvergenceEngine:
         
         return steps
 
-# Global convergence engine instance
-convergence_engine = ConvergenceEngine()
+# Per-user convergence flows, hydrated per request through convergence_session()
+convergence_sessions = SessionStore(
+    create_session_backend(settings.SESSION_STORE_URL, settings.SESSION_MEMORY_MAX_ENTRIES),
+    "convergence",
+    settings.SESSION_TTL
+)
+
+def convergence_session(user_id: str):
+    """Load, yield and save back one user's ConvergenceEngine"""
+    return convergence_sessions.session(user_id, ConvergenceEngine.from_state, ConvergenceEngine.to_state)
@@ -4,11 +4,18 @@ Shared database utilities and models
 
 import asyncio
 import logging
-from typing import AsyncGenerator, Optional
-from sqlalchemy import create_engine, MetaData
+import uuid
+from datetime import datetime
+from typing import AsyncGenerator, Generator, Optional
+from sqlalchemy import (
+    create_engine, select, MetaData, Column, String, Integer, Float, Boolean,
+    DateTime, Text, JSON, ForeignKey, Index
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import sessionmaker, relationship, Session
 from sqlalchemy.pool import StaticPool
 import redis.asyncio as redis
 from .config import settings, get_database_url
@@ -50,7 +57,11 @@ async def init_database():
         async_engine = create_async_engine(
             async_db_url,
             echo=settings.DEBUG,
-            pool_pre_ping=True
+            pool_pre_ping=True,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE
         )
         
         # Session makers
@@ -145,8 +156,11 @@ class User(Base):
     trust_records = relationship("TrustRecord", back_populates="user")
 
 class LimbicState(Base):
-    """Limbic engine state for user"""
+    """Append-only history of limbic state snapshots, for analytics"""
     __tablename__ = "limbic_states"
+    __table_args__ = (
+        Index("idx_limbic_states_user_timestamp", "user_id", "timestamp"),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -162,9 +176,25 @@ class LimbicState(Base):
     # Relationships
     user = relationship("User", back_populates="limbic_states")
 
+class LimbicCurrent(Base):
+    """Latest limbic state, one row per user"""
+    __tablename__ = "limbic_current"
+    
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    
+    trust = Column(Float, default=0.5)
+    warmth = Column(Float, default=0.5)
+    arousal = Column(Float, default=0.5)
+    valence = Column(Float, default=0.5)
+    posture = Column(String, default="companion")
+
 class TrustRecord(Base):
-    """Trust tier and permission records"""
+    """Append-only history of trust events"""
     __tablename__ = "trust_records"
+    __table_args__ = (
+        Index("idx_trust_records_user_timestamp", "user_id", "timestamp"),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -180,6 +210,16 @@ class TrustRecord(Base):
     # Relationships
     user = relationship("User", back_populates="trust_records")
 
+class TrustCurrent(Base):
+    """Latest trust score and tier, one row per user"""
+    __tablename__ = "trust_current"
+    
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    
+    trust_score = Column(Float, default=0.0)
+    trust_tier = Column(Integer, default=0)
+
 class MemoryEntry(Base):
     """Working memory entries"""
     __tablename__ = "memory_entries"
@@ -192,7 +232,8 @@ class MemoryEntry(Base):
     content = Column(Text, nullable=False)
     memory_type = Column(String, nullable=False)  # working, heritage, draft
     tags = Column(JSON)
-    metadata = Column(JSON)
+    # "metadata" is reserved on declarative models
+    metadata_ = Column("metadata", JSON)
     is_archived = Column(Boolean, default=False)
     expires_at = Column(DateTime, nullable=True)
 
@@ -231,37 +272,77 @@ async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
     result = await db.execute(select(User).where(User.email == email))
     return result.scalar_one_or_none()
 
+LIMBIC_FIELDS = ("trust", "warmth", "arousal", "valence", "posture")
+
+def _upsert(db: AsyncSession, model, values: dict):
+    """INSERT ... ON CONFLICT (user_id) DO UPDATE of ``values``, returning the row"""
+    insert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = insert(model).values(**values)
+    return stmt.on_conflict_do_update(
+        index_elements=[model.user_id],
+        set_={key: stmt.excluded[key] for key in values if key != "user_id"}
+    ).returning(model)
+
+async def get_limbic_state(db: AsyncSession, user_id: str) -> Optional[LimbicCurrent]:
+    """Get the current limbic state for user"""
+    result = await db.execute(select(LimbicCurrent).where(LimbicCurrent.user_id == user_id))
+    return result.scalar_one_or_none()
+
 async def update_limbic_state(db: AsyncSession, user_id: str, **kwargs) -> LimbicState:
-    """Update or create limbic state for user"""
-    # Get latest state
+    """Upsert the current limbic state for user and append it to the history"""
+    values = {key: value for key, value in kwargs.items() if key in LIMBIC_FIELDS}
+    now = datetime.utcnow()
+    
     result = await db.execute(
-        select(LimbicState)
-        .where(LimbicState.user_id == user_id)
-        .order_by(LimbicState.timestamp.desc())
+        _upsert(db, LimbicCurrent, {"user_id": user_id, "updated_at": now, **values}),
+        execution_options={"populate_existing": True}
     )
-    state = result.scalar_one_or_none()
+    current = result.scalar_one()
     
-    if state:
-        # Update existing
-        for key, value in kwargs.items():
-            if hasattr(state, key):
-                setattr(state, key, value)
-        state.timestamp = datetime.utcnow()
-    else:
-        # Create new
-        state = LimbicState(user_id=user_id, **kwargs)
-        db.add(state)
+    snapshot = LimbicState(
+        user_id=user_id,
+        timestamp=now,
+        **{field: getattr(current, field) for field in LIMBIC_FIELDS}
+    )
+    db.add(snapshot)
+    await db.commit()
+    return snapshot
+
+async def record_trust_event(
+    db: AsyncSession,
+    user_id: str,
+    action_type: str,
+    outcome: str,
+    trust_score: float,
+    trust_tier: int,
+    reason: Optional[str] = None
+) -> TrustRecord:
+    """Append a trust event and make its score and tier current for user"""
+    now = datetime.utcnow()
+    await db.execute(_upsert(db, TrustCurrent, {
+        "user_id": user_id,
+        "updated_at": now,
+        "trust_score": trust_score,
+        "trust_tier": trust_tier
+    }))
     
+    record = TrustRecord(
+        user_id=user_id,
+        timestamp=now,
+        trust_score=trust_score,
+        trust_tier=trust_tier,
+        action_type=action_type,
+        outcome=outcome,
+        reason=reason
+    )
+    db.add(record)
     await db.commit()
-    await db.refresh(state)
-    return state
+    return record
 
 async def get_trust_tier(db: AsyncSession, user_id: str) -> int:
     """Get current trust tier for user"""
     result = await db.execute(
-        select(TrustRecord.trust_tier)
-        .where(TrustRecord.user_id == user_id)
-        .order_by(TrustRecord.timestamp.desc())
+        select(TrustCurrent.trust_tier).where(TrustCurrent.user_id == user_id)
     )
     tier = result.scalar_one_or_none()
     return tier if tier is not None else settings.DEFAULT_TRUST_TIER
@@ -4,15 +4,15 @@ Enhanced Backend Performance Module
 """
 
 import asyncio
+import os
 import time
 import functools
 import threading
 from typing import Dict, List, Any, Optional, Callable, Union
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 import logging
 from collections import defaultdict, deque
-import heapq
 import weakref
 import gc
 import psutil
@@ -21,13 +21,17 @@ import pickle
 import zlib
 import lzma
 import hashlib
+import hmac
 from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import multiprocessing as mp
 from contextlib import asynccontextmanager
-import aioredis
+import uuid
+import redis.asyncio as redis
 import asyncpg
 from fastapi import Request, Response
 import uvicorn
+from .advanced_performance import AdvancedCache, CachedResult, SingleFlight, qualified_name
+from .advanced_performance import CacheStrategy as L1Strategy
 
 logger = logging.getLogger(__name__)
 
@@ -64,6 +68,12 @@ class PerformanceConfig:
     max_connections: int = 100
     cache_size: int = 10000
     cache_ttl: int = 3600
+    l1_cache_size: int = 1000
+    l1_ttl: int = 60
+    redis_url: str = "redis://localhost:6379"
+    invalidation_channel: str = "sallie:cache:invalidate"
+    # Shared by every replica; enables pickled Redis values
+    cache_signing_key: str = field(default_factory=lambda: os.getenv("CACHE_SIGNING_KEY", ""))
     enable_compression: bool = True
     enable_connection_pooling: bool = True
     enable_request_caching: bool = True
@@ -72,134 +82,175 @@ class PerformanceConfig:
     performance_level: PerformanceLevel = PerformanceLevel.STANDARD
 
 class AdvancedBackendCache:
-    """Advanced multi-strategy caching system for backend"""
+    """Two-tier cache: a small per-process L1 in front of shared Redis L2
+    
+    Hot keys are served from L1 without a Redis round-trip. Every write or
+    delete publishes the key on ``invalidation_channel`` so the other
+    gateway replicas drop their L1 copy, and L1 entries also expire after
+    ``l1_ttl`` seconds to bound staleness if a message is missed. Without
+    Redis the L1 tier works alone with the full TTL.
+    
+    Values are stored in Redis as JSON, so anyone able to write to Redis
+    can only plant data, not code. With ``cache_signing_key`` set they are
+    pickled (protocol 5) and HMAC-SHA256 signed instead, and payloads whose
+    signature doesn't verify are treated as misses. Values JSON can't encode
+    are kept in L1 only.
+    """
     
     def __init__(self, config: PerformanceConfig):
         self.config = config
-        self.cache = {}
-        self.access_times = defaultdict(list)
-        self.access_counts = defaultdict(int)
-        self.expiry_times = {}
-        self.heap = []
-        self.lock = threading.RLock()
+        self.l1 = AdvancedCache(config.l1_cache_size, L1Strategy.LRU)
         self.redis_client = None
+        self.pubsub = None
+        self.listener_task = None
+        self.node_id = uuid.uuid4().hex
         self.hit_count = 0
         self.miss_count = 0
+        self.l1_hit_count = 0
+        self.l2_hit_count = 0
+        self.invalidations_received = 0
+        
+    @property
+    def cache(self) -> Dict[str, Any]:
+        """Entries currently held in the in-process tier"""
+        return self.l1.cache
+    
+    @property
+    def lock(self) -> threading.RLock:
+        return self.l1.lock
         
-    async def initialize(self):
-        """Initialize cache with Redis backend"""
+    async def initialize(self, redis_client: Optional[redis.Redis] = None):
+        """Initialize cache with Redis backend
+        
+        ``redis_client`` may be any redis.asyncio-compatible client, such as
+        ``fakeredis.aioredis.FakeRedis`` for local runs.
+        """
         try:
-            self.redis_client = await aioredis.from_url(
-                "redis://localhost:6379",
-                encoding="utf-8",
-                decode_responses=True
-            )
+            self.redis_client = redis_client or redis.from_url(self.config.redis_url)
+            await self.redis_client.ping()
+            
+            self.pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            await self.pubsub.subscribe(self.config.invalidation_channel)
+            self.listener_task = asyncio.create_task(self._listen_for_invalidations())
             logger.info("Redis cache initialized")
         except Exception as e:
+            self.redis_client = None
             logger.warning(f"Redis not available, using in-memory cache: {e}")
     
     async def get(self, key: str) -> Any:
-        """Get value from cache with multi-tier strategy"""
-        start_time = time.time()
+        """Get value from L1, falling back to Redis"""
+        value = self.l1.get(key)
+        if value is not None:
+            self.l1_hit_count += 1
+            self.hit_count += 1
+            return value
         
-        # Try Redis first
         if self.redis_client:
             try:
-                value = await self.redis_client.get(key)
-                if value:
+                payload = await self.redis_client.get(key)
+                value = self._deserialize(payload) if payload is not None else None
+                if value is not None:
+                    self.l1.put(key, value, self.config.l1_ttl, size=len(payload))
+                    self.l2_hit_count += 1
                     self.hit_count += 1
-                    return json.loads(value)
+                    return value
             except Exception as e:
                 logger.warning(f"Redis get failed: {e}")
         
-        # Fallback to in-memory cache
-        with self.lock:
-            if key in self.cache:
-                current_time = time.time()
-                
-                # Check TTL expiry
-                if key in self.expiry_times and current_time > self.expiry_times[key]:
-                    self._remove_key(key)
-                    self.miss_count += 1
-                    return None
-                
-                # Update access metrics
-                self.access_times[key].append(current_time)
-                self.access_counts[key] += 1
-                
-                # Update LRU tracking
-                self._update_lru(key)
-                
-                self.hit_count += 1
-                return self.cache[key]
-        
         self.miss_count += 1
         return None
     
     async def put(self, key: str, value: Any, ttl: Optional[int] = None):
-        """Put value in cache with multi-tier storage"""
+        """Put value in both tiers and invalidate other replicas' L1"""
         ttl = ttl or self.config.cache_ttl
-        current_time = time.time()
         
-        # Serialize value
-        serialized_value = json.dumps(value, default=str)
-        
-        # Store in Redis
-        if self.redis_client:
+        payload = self._serialize(value) if self.redis_client else None
+        if payload is not None:
             try:
-                await self.redis_client.setex(key, ttl, serialized_value)
+                await self.redis_client.set(key, payload, ex=ttl)
+                await self._publish_invalidation(key)
             except Exception as e:
                 logger.warning(f"Redis set failed: {e}")
-        
-        # Store in memory cache
-        with self.lock:
-            if key in self.cache:
-                self._remove_key(key)
-            
-            self.cache[key] = value
-            self.access_times[key].append(current_time)
-            self.access_counts[key] = 1
-            self.expiry_times[key] = current_time + ttl
-            
-            # Evict if necessary
-            while len(self.cache) >= self.config.cache_size:
-                self._evict()
-    
-    def _update_lru(self, key: str):
-        """Update LRU tracking"""
-        # Remove old entry from heap if exists
-        for i, (timestamp, k) in enumerate(self.heap):
-            if k == key:
-                heapq.heappop(self.heap)
-                break
-        
-        # Add new entry
-        heapq.heappush(self.heap, (time.time(), key))
-    
-    def _evict(self):
-        """Evict key based on strategy"""
-        if not self.cache:
-            return
-        
-        if self.heap:
-            _, key = heapq.heappop(self.heap)
-            self._remove_key(key)
+            self.l1.put(key, value, min(ttl, self.config.l1_ttl), size=len(payload))
         else:
-            # Fallback to least recently used
-            oldest_key = min(self.access_times.keys(), 
-                           key=lambda k: max(self.access_times[k]) if self.access_times[k] else 0)
-            self._remove_key(oldest_key)
-    
-    def _remove_key(self, key: str):
-        """Remove key from all tracking structures"""
-        if key in self.cache:
-            del self.cache[key]
-        if key in self.access_times:
-            del self.access_times[key]
-        if key in self.access_counts:
-            del self.access_counts[key]
-        if key in self.expiry_times:
-            del self.expiry_times[key]
+            self.l1.put(key, value, ttl)
+    
+    async def delete(self, key: str):
+        """Remove key from both tiers on every replica"""
+        self.l1.delete(key)
+        
+        if self.redis_client:
+            try:
+                await self.redis_client.delete(key)
+                await self._publish_invalidation(key)
+            except Exception as e:
+                logger.warning(f"Redis delete failed: {e}")
+    
+    async def _publish_invalidation(self, key: str):
+        """Tell other replicas to drop their L1 copy of key"""
+        await self.redis_client.publish(self.config.invalidation_channel, f"{self.node_id}:{key}")
+    
+    async def _listen_for_invalidations(self):
+        """Evict L1 entries written or deleted on other replicas"""
+        while True:
+            try:
+                async for message in self.pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    
+                    data = message["data"]
+                    if isinstance(data, bytes):
+                        data = data.decode("utf-8")
+                    node_id, _, key = data.partition(":")
+                    if node_id != self.node_id:
+                        self.l1.delete(key)
+                        self.invalidations_received += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Entries written meanwhile are still bounded by l1_ttl
+                logger.error(f"Cache invalidation listener failed: {e}")
+                self.l1.clear()
+                await asyncio.sleep(1)
+    
+    def _sign(self, body: bytes) -> bytes:
+        return hmac.new(self.config.cache_signing_key.encode(), body, hashlib.sha256).digest()
+    
+    def _serialize(self, value: Any) -> Optional[bytes]:
+        """Redis payload for value, or None if it can't be shared"""
+        if self.config.cache_signing_key:
+            body = pickle.dumps(value, protocol=5)
+            return b"p" + self._sign(body) + body
+        try:
+            return b"j" + json.dumps(value).encode("utf-8")
+        except (TypeError, ValueError):
+            return None
+    
+    def _deserialize(self, payload: bytes) -> Any:
+        """Value of a Redis payload, or None if it is not one we can trust"""
+        kind, body = payload[:1], payload[1:]
+        if kind == b"j":
+            return json.loads(body)
+        if kind == b"p" and self.config.cache_signing_key:
+            signature, body = body[:32], body[32:]
+            if hmac.compare_digest(signature, self._sign(body)):
+                return pickle.loads(body)
+        logger.warning("Ignoring unsigned or tampered cache entry")
+        return None
+    
+    def clear_local(self):
+        """Drop the in-process tier, leaving Redis untouched"""
+        self.l1.clear()
+    
+    async def close(self):
+        """Stop listening for invalidations and close Redis"""
+        if self.listener_task:
+            self.listener_task.cancel()
+        if self.pubsub:
+            await self.pubsub.unsubscribe()
+            await self.pubsub.aclose()
+        if self.redis_client:
+            await self.redis_client.aclose()
     
     def get_hit_rate(self) -> float:
         """Get cache hit rate"""
@@ -208,15 +259,17 @@ class AdvancedBackendCache:
     
     def get_metrics(self) -> Dict[str, Any]:
         """Get cache performance metrics"""
-        with self.lock:
-            return {
-                'size': len(self.cache),
-                'max_size': self.config.cache_size,
-                'hit_rate': self.get_hit_rate(),
-                'hit_count': self.hit_count,
-                'miss_count': self.miss_count,
-                'redis_connected': self.redis_client is not None
-            }
+        return {
+            'size': len(self.l1.cache),
+            'max_size': self.l1.max_size,
+            'hit_rate': self.get_hit_rate(),
+            'hit_count': self.hit_count,
+            'miss_count': self.miss_count,
+            'l1_hit_count': self.l1_hit_count,
+            'l2_hit_count': self.l2_hit_count,
+            'invalidations_received': self.invalidations_received,
+            'redis_connected': self.redis_client is not None
+        }
 
 class BackendConnectionPool:
     """Advanced connection pooling for backend services"""
@@ -349,29 +402,53 @@ class BackendPerformanceOptimizer:
             return result
         return wrapper
     
-    def cache_result(self, key_prefix: str = None, ttl: int = None):
-        """Decorator for caching function results"""
+    def cache_result(self, key_prefix: str = None, ttl: int = None,
+                     stale_ttl: int = None, early_refresh_beta: float = 0.0):
+        """Decorator for caching function results
+        
+        Concurrent misses for the same key share one call. ``stale_ttl`` keeps
+        serving an expired result while a single background call refreshes it,
+        and ``early_refresh_beta`` > 0 refreshes probabilistically before expiry.
+        """
         def decorator(func: Callable) -> Callable:
+            # Per function, so same-named functions never share a call
+            single_flight = SingleFlight()
+            
             @functools.wraps(func)
             async def wrapper(*args, **kwargs):
                 # Generate cache key
-                cache_key = self._generate_cache_key(func.__name__, args, kwargs, key_prefix)
+                cache_key = self._generate_cache_key(qualified_name(func), args, kwargs, key_prefix)
+                fresh_ttl = ttl or self.config.cache_ttl
                 
-                # Try to get from cache
-                cached_result = await self.cache.get(cache_key)
-                if cached_result is not None:
-                    return cached_result
-                
-                # Execute function
-                result = await func(*args, **kwargs)
+                async def compute():
+                    start_time = time.time()
+                    result = await func(*args, **kwargs)
+                    end_time = time.time()
+                    
+                    # Cache result, keeping it around for the stale window
+                    if result is not None:
+                        entry = CachedResult(result, end_time + fresh_ttl, end_time - start_time)
+                        await self.cache.put(cache_key, entry, fresh_ttl + (stale_ttl or 0))
+                    
+                    return result
                 
-                # Cache result
-                await self.cache.put(cache_key, result, ttl)
+                # Try to get from cache
+                entry = self._load_cached_result(await self.cache.get(cache_key))
+                if entry is not None:
+                    if entry.should_refresh(early_refresh_beta):
+                        single_flight.spawn(cache_key, compute)
+                    return entry.value
                 
-                return result
+                # Execute function once for all concurrent callers
+                return await single_flight.do(cache_key, compute)
             return wrapper
         return decorator
     
+    @staticmethod
+    def _load_cached_result(cached: Any) -> Optional[CachedResult]:
+        """Treat entries that aren't a CachedResult as a miss"""
+        return cached if isinstance(cached, CachedResult) else None
+    
     def compress_response(self, min_size: int = 1024):
         """Decorator for response compression"""
         def decorator(func: Callable) -> Callable:
@@ -539,8 +616,7 @@ class BackendPerformanceOptimizer:
         
         if metrics.memory_usage > 80:
             # Clear cache
-            with self.cache.lock:
-                self.cache.cache.clear()
+            self.cache.clear_local()
             logger.info("Cleared cache due to high memory usage")
         
         if metrics.cache_hit_rate < 70:
@@ -554,6 +630,7 @@ class BackendPerformanceOptimizer:
     
     async def close(self):
         """Close performance optimizer"""
+        await self.cache.close()
         await self.connection_pool.close()
         self.thread_pool.shutdown(wait=True)
         self.process_pool.shutdown(wait=True)
@@ -0,0 +1,203 @@
+"""
+Per-user flow session store with pluggable backends
+
+Keeps flow state out of process memory so it survives restarts and is
+shared by every worker. Configuration is passed in by the caller: backend
+services use shared.config, and server/session_store.py binds the same
+classes to environment variables.
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import weakref
+import zlib
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# States above this many bytes of JSON are stored zlib-compressed
+COMPRESS_THRESHOLD = 512
+
+DEFAULT_TTL = 7 * 24 * 3600  # seconds an idle session is kept
+DEFAULT_MEMORY_MAX_ENTRIES = 10000
+
+def encode_state(state: Dict[str, Any]) -> bytes:
+    """Compact JSON, compressed when that pays off; the first byte says which"""
+    raw = json.dumps(state, separators=(",", ":"), default=str).encode()
+    if len(raw) > COMPRESS_THRESHOLD:
+        return b"z" + zlib.compress(raw, 6)
+    return b"j" + raw
+
+def decode_state(blob: bytes) -> Dict[str, Any]:
+    if blob[:1] == b"z":
+        return json.loads(zlib.decompress(blob[1:]))
+    return json.loads(blob[1:])
+
+class MemorySessionBackend:
+    """Process-local LRU; sessions are lost on restart and not shared by workers"""
+
+    def __init__(self, max_entries: int = DEFAULT_MEMORY_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, Tuple[bytes, float]] = OrderedDict()
+
+    async def load(self, key: str) -> Optional[bytes]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.time():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    async def save(self, key: str, blob: bytes, ttl: int):
+        self.entries[key] = (blob, time.time() + ttl)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def delete(self, key: str):
+        self.entries.pop(key, None)
+
+    async def close(self):
+        self.entries.clear()
+
+class SQLiteSessionBackend:
+    """Single-file store in WAL mode, shared by every worker on the node"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn: Optional[sqlite3.Connection] = None
+        self.lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS flow_sessions "
+            "(key TEXT PRIMARY KEY, state BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        return conn
+
+    def _execute(self, sql: str, params: tuple) -> Optional[tuple]:
+        with self.lock:
+            if self.conn is None:
+                self.conn = self._connect()
+            return self.conn.execute(sql, params).fetchone()
+
+    async def load(self, key: str) -> Optional[bytes]:
+        row = await asyncio.to_thread(
+            self._execute,
+            "SELECT state FROM flow_sessions WHERE key = ? AND expires_at > ?",
+            (key, time.time())
+        )
+        return row[0] if row else None
+
+    async def save(self, key: str, blob: bytes, ttl: int):
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO flow_sessions (key, state, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET state = excluded.state, expires_at = excluded.expires_at",
+            (key, blob, time.time() + ttl)
+        )
+
+    async def delete(self, key: str):
+        await asyncio.to_thread(self._execute, "DELETE FROM flow_sessions WHERE key = ?", (key,))
+
+    async def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+class RedisSessionBackend:
+    """Any client with Redis' async get/set/delete (Redis, Valkey, KeyDB, fakeredis)"""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def load(self, key: str) -> Optional[bytes]:
+        return await self.client.get(key)
+
+    async def save(self, key: str, blob: bytes, ttl: int):
+        await self.client.set(key, blob, ex=ttl)
+
+    async def delete(self, key: str):
+        await self.client.delete(key)
+
+    async def close(self):
+        await self.client.aclose()
+
+def create_session_backend(url: str, memory_max_entries: int = DEFAULT_MEMORY_MAX_ENTRIES):
+    """Backend for a SESSION_STORE_URL"""
+    if url.startswith("memory://"):
+        return MemorySessionBackend(memory_max_entries)
+    if url.startswith("sqlite:///"):
+        path = Path(url[len("sqlite:///"):])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return SQLiteSessionBackend(str(path))
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        import redis.asyncio as redis
+        return RedisSessionBackend(redis.from_url(url))
+    raise ValueError(f"Unsupported session store URL: {url}")
+
+class SessionStore:
+    """Serialized flow state per user, hydrated only when a request touches it
+
+    Nothing is cached between requests, so any worker can serve any user and a
+    restart loses nothing the backend kept. Requests for the same user are
+    serialized within a worker, and unchanged state is not written back.
+    The lock is per process: if two workers handle requests for one user at
+    the same time, the later save wins and the other update is lost. Route a
+    user's flow requests to one worker (sticky sessions) where that matters.
+    """
+
+    def __init__(self, backend, namespace: str, ttl: int = DEFAULT_TTL):
+        self.backend = backend
+        self.namespace = namespace
+        self.ttl = ttl
+        self.locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    def _key(self, user_id: str) -> str:
+        return f"{self.namespace}:{user_id}"
+
+    def _lock(self, key: str) -> asyncio.Lock:
+        lock = self.locks.get(key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self.locks[key] = lock
+        return lock
+
+    async def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        blob = await self.backend.load(self._key(user_id))
+        return decode_state(blob) if blob is not None else None
+
+    async def put(self, user_id: str, state: Dict[str, Any]):
+        await self.backend.save(self._key(user_id), encode_state(state), self.ttl)
+
+    async def delete(self, user_id: str):
+        await self.backend.delete(self._key(user_id))
+
+    @asynccontextmanager
+    async def session(
+        self,
+        user_id: str,
+        hydrate: Callable[[Optional[Dict[str, Any]]], T],
+        dehydrate: Callable[[T], Dict[str, Any]]
+    ) -> AsyncIterator[T]:
+        """Load a user's flow, yield it, and save it back if it changed"""
+        key = self._key(user_id)
+        async with self._lock(key):
+            blob = await self.backend.load(key)
+            flow = hydrate(decode_state(blob) if blob is not None else None)
+            yield flow
+            updated = encode_state(dehydrate(flow))
+            if updated != blob:
+                await self.backend.save(key, updated, self.ttl)
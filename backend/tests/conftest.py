@@ -0,0 +1,5 @@
+import sys
+import os
+
+# Add the backend directory to the path so tests can import shared
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,96 @@
+import pytest
+import asyncio
+
+from shared import advanced_performance
+from shared.advanced_performance import PerformanceOptimizer
+
+@pytest.fixture
+def optimizer():
+    optimizer = PerformanceOptimizer()
+    optimizer.create_cache("test", max_size=100)
+    yield optimizer
+    optimizer.thread_pool.shutdown()
+    optimizer.process_pool.shutdown()
+
+def counter(delay: float = 0.01):
+    """Async function returning how many times it has been called, and its call log"""
+    calls = []
+
+    async def count(key: str) -> int:
+        calls.append(key)
+        made = len(calls)
+        await asyncio.sleep(delay)
+        return made
+
+    return count, calls
+
+class TestAsyncCache:
+    """Test cases for the async_cache decorator"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_call(self, optimizer):
+        """Concurrent misses for one key run the function once"""
+        count, calls = counter()
+        cached = optimizer.async_cache("test", ttl=60)(count)
+
+        assert await asyncio.gather(*[cached("a") for _ in range(10)]) == [1] * 10
+        assert await cached("a") == 1
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_same_named_functions_are_not_merged(self, optimizer):
+        """Functions sharing a name and arguments keep their own calls and entries"""
+        def make(module: str, value: str):
+            async def lookup(key: str) -> str:
+                await asyncio.sleep(0.01)
+                return value
+            lookup.__module__ = module
+            return optimizer.async_cache("test", ttl=60)(lookup)
+
+        users, orders = make("users", "user"), make("orders", "order")
+
+        assert await asyncio.gather(users("1"), orders("1")) == ["user", "order"]
+        assert await asyncio.gather(users("1"), orders("1")) == ["user", "order"]
+
+    @pytest.mark.asyncio
+    async def test_stale_result_is_served_while_refreshing(self, optimizer):
+        """Within stale_ttl an expired result is returned and refreshed once in the background"""
+        count, calls = counter()
+        cached = optimizer.async_cache("test", ttl=0.05, stale_ttl=5)(count)
+        assert await cached("a") == 1
+
+        await asyncio.sleep(0.06)
+        assert await asyncio.gather(*[cached("a") for _ in range(5)]) == [1] * 5
+        await asyncio.sleep(0.03)
+
+        assert len(calls) == 2
+        assert await cached("a") == 2
+
+    @pytest.mark.asyncio
+    async def test_expired_result_without_stale_ttl_is_recomputed(self, optimizer):
+        """Past ttl with no stale window the caller waits for a fresh result"""
+        count, calls = counter()
+        cached = optimizer.async_cache("test", ttl=0.05)(count)
+        assert await cached("a") == 1
+
+        await asyncio.sleep(0.06)
+        assert await cached("a") == 2
+
+    @pytest.mark.asyncio
+    async def test_early_refresh_before_expiry(self, optimizer, monkeypatch):
+        """With early_refresh_beta a slow result is refreshed before it expires"""
+        monkeypatch.setattr(advanced_performance.random, "random", lambda: 0.5)
+        count, calls = counter(delay=0.02)
+        eager = optimizer.async_cache("test", ttl=60, early_refresh_beta=5000)(count)
+        assert await eager("a") == 1
+
+        assert await eager("a") == 1
+        await asyncio.sleep(0.05)
+        assert len(calls) == 2
+
+        count, calls = counter(delay=0.02)
+        lazy = optimizer.async_cache("test", ttl=60)(count)
+        await lazy("b")
+        await lazy("b")
+        await asyncio.sleep(0.05)
+        assert len(calls) == 1
@@ -0,0 +1,97 @@
+import pytest
+import pytest_asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from shared.config import settings
+from shared.database import (
+    Base,
+    LimbicState,
+    TrustRecord,
+    create_user,
+    get_limbic_state,
+    get_trust_tier,
+    record_trust_event,
+    update_limbic_state
+)
+
+@pytest_asyncio.fixture
+async def db(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'sallie.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+@pytest_asyncio.fixture
+async def user_id(db):
+    user = await create_user(db, "user@example.com", "hash", "User")
+    return user.id
+
+class TestLimbicState:
+    """Test cases for the current limbic state and its history"""
+
+    @pytest.mark.asyncio
+    async def test_partial_update_keeps_other_fields(self, db, user_id):
+        """Fields left out of an update keep their current values"""
+        await update_limbic_state(db, user_id, trust=0.8, warmth=0.6, posture="mentor")
+        snapshot = await update_limbic_state(db, user_id, arousal=0.9)
+
+        current = await get_limbic_state(db, user_id)
+        assert (current.trust, current.warmth, current.arousal, current.posture) == (0.8, 0.6, 0.9, "mentor")
+        # The snapshot is the full state, not just the changed field
+        assert (snapshot.trust, snapshot.warmth, snapshot.arousal, snapshot.posture) == (0.8, 0.6, 0.9, "mentor")
+
+    @pytest.mark.asyncio
+    async def test_updates_append_history(self, db, user_id):
+        """Every update adds a snapshot while the current state stays one row"""
+        for trust in (0.2, 0.4, 0.6):
+            await update_limbic_state(db, user_id, trust=trust)
+
+        result = await db.execute(
+            select(LimbicState.trust).where(LimbicState.user_id == user_id).order_by(LimbicState.timestamp)
+        )
+        assert result.scalars().all() == [0.2, 0.4, 0.6]
+        assert (await get_limbic_state(db, user_id)).trust == 0.6
+
+    @pytest.mark.asyncio
+    async def test_unknown_fields_are_ignored(self, db, user_id):
+        """Keys that aren't limbic fields don't reach the tables"""
+        await update_limbic_state(db, user_id, trust=0.3, updated_at=None, mood="calm")
+        assert (await get_limbic_state(db, user_id)).trust == 0.3
+
+class TestTrust:
+    """Test cases for trust events and the current tier"""
+
+    @pytest.mark.asyncio
+    async def test_default_tier_without_records(self, db, user_id):
+        """A user with no trust events gets the default tier"""
+        assert await get_trust_tier(db, user_id) == settings.DEFAULT_TRUST_TIER
+
+    @pytest.mark.asyncio
+    async def test_latest_tier_wins(self, db, user_id):
+        """With several records the current tier is the latest one, not the highest"""
+        await record_trust_event(db, user_id, "tool_call", "success", 0.4, 1)
+        await record_trust_event(db, user_id, "tool_call", "success", 0.8, 3)
+        await record_trust_event(db, user_id, "tool_call", "penalty", 0.5, 2, reason="Overstepped")
+
+        assert await get_trust_tier(db, user_id) == 2
+
+        result = await db.execute(
+            select(TrustRecord.trust_tier, TrustRecord.outcome)
+            .where(TrustRecord.user_id == user_id)
+            .order_by(TrustRecord.timestamp)
+        )
+        assert result.all() == [(1, "success"), (3, "success"), (2, "penalty")]
+
+    @pytest.mark.asyncio
+    async def test_tiers_are_per_user(self, db, user_id):
+        """One user's events don't change another user's tier"""
+        other = await create_user(db, "other@example.com", "hash", "Other")
+        await record_trust_event(db, user_id, "tool_call", "success", 0.9, 4)
+        await record_trust_event(db, other.id, "tool_call", "failure", 0.1, 1)
+
+        assert await get_trust_tier(db, user_id) == 4
+        assert await get_trust_tier(db, other.id) == 1
@@ -0,0 +1,66 @@
+import pytest
+import asyncio
+from dataclasses import dataclass
+
+from shared.enhanced_backend_performance import BackendPerformanceOptimizer, PerformanceConfig
+
+@dataclass
+class Profile:
+    name: str
+    tags: list
+
+class TestCacheResult:
+    """Test cases for the cache_result decorator"""
+
+    @pytest.mark.asyncio
+    async def test_dataclass_result_round_trips(self):
+        """A cache hit returns the same type the function returned"""
+        optimizer = BackendPerformanceOptimizer(PerformanceConfig(max_workers=1))
+        calls = 0
+
+        @optimizer.cache_result(key_prefix="profile", ttl=60)
+        async def load_profile(name: str) -> Profile:
+            nonlocal calls
+            calls += 1
+            return Profile(name=name, tags=["a", "b"])
+
+        first = await load_profile("sallie")
+        second = await load_profile("sallie")
+
+        assert calls == 1
+        assert isinstance(second, Profile)
+        assert second == first
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_call(self):
+        """Concurrent misses for one key run the function once"""
+        optimizer = BackendPerformanceOptimizer(PerformanceConfig(max_workers=1))
+        calls = 0
+
+        @optimizer.cache_result(ttl=60)
+        async def slow(value: int) -> int:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return value * 2
+
+        results = await asyncio.gather(*[slow(21) for _ in range(10)])
+        assert results == [42] * 10
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_same_named_functions_are_not_merged(self):
+        """Functions sharing a name and arguments keep their own calls and entries"""
+        optimizer = BackendPerformanceOptimizer(PerformanceConfig(max_workers=1))
+
+        def make(module: str, value: str):
+            async def lookup(key: str) -> str:
+                await asyncio.sleep(0.01)
+                return value
+            lookup.__module__ = module
+            return optimizer.cache_result(ttl=60)(lookup)
+
+        users, orders = make("users", "user"), make("orders", "order")
+
+        assert await asyncio.gather(users("1"), orders("1")) == ["user", "order"]
+        assert await asyncio.gather(users("1"), orders("1")) == ["user", "order"]
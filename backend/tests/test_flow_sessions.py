@@ -0,0 +1,79 @@
+import pytest
+
+from shared import convergence_engine_29
+from shared.convergence_engine_29 import ConvergenceEngine
+from shared.session_store import (
+    MemorySessionBackend,
+    SessionStore,
+    SQLiteSessionBackend,
+    create_session_backend,
+    decode_state,
+    encode_state
+)
+
+# Valid answers for the first few convergence questions
+ANSWERS = {
+    1: "I want a companion that helps me think clearly and keeps me honest.",
+    2: ["Visual and intuitive - I learn best through seeing", "Mixed approach - I use multiple methods depending on context"],
+    3: "Intermediate - I use AI occasionally and understand the basics",
+    4: "I write music and paint; making things is how I process the world around me.",
+}
+
+def answered_engine() -> ConvergenceEngine:
+    engine = ConvergenceEngine()
+    for question_id, answer in ANSWERS.items():
+        result = engine.submit_answer(question_id, answer)
+        assert result["success"], result
+    return engine
+
+class TestSessionBackends:
+    """Test cases for the shared flow session store"""
+
+    @pytest.mark.asyncio
+    async def test_sqlite_url_creates_parent_directory(self, tmp_path):
+        """A sqlite:/// URL in a directory that doesn't exist yet still works"""
+        path = tmp_path / "data" / "sessions" / "flow_sessions.db"
+        backend = create_session_backend(f"sqlite:///{path}")
+        assert isinstance(backend, SQLiteSessionBackend)
+
+        store = SessionStore(backend, "test", ttl=60)
+        await store.put("user-1", {"step": 1})
+        assert await store.get("user-1") == {"step": 1}
+        assert path.exists()
+        await backend.close()
+
+class TestConvergenceState:
+    """Test cases for storing the convergence flow between requests"""
+
+    def test_state_round_trip(self):
+        """from_state(to_state()) restores answers, position and derived profile"""
+        engine = answered_engine()
+        restored = ConvergenceEngine.from_state(decode_state(encode_state(engine.to_state())))
+
+        assert restored.answers == engine.answers
+        assert restored.current_index == engine.current_index == len(ANSWERS)
+        assert restored.user_profile == engine.user_profile
+        assert restored.convergence_state == engine.convergence_state
+        assert restored.get_current_question() is engine.get_current_question()
+
+    def test_empty_state_starts_fresh(self):
+        """No stored state yields an engine at the first question"""
+        engine = ConvergenceEngine.from_state(None)
+        assert engine.current_index == 0
+        assert engine.answers == {}
+
+    @pytest.mark.asyncio
+    async def test_session_persists_answers(self, monkeypatch):
+        """Answers submitted in one session are seen by the next"""
+        store = SessionStore(MemorySessionBackend(), "convergence")
+        monkeypatch.setattr(convergence_engine_29, "convergence_sessions", store)
+
+        async with convergence_engine_29.convergence_session("user-1") as engine:
+            assert engine.submit_answer(1, ANSWERS[1])["success"]
+
+        async with convergence_engine_29.convergence_session("user-1") as engine:
+            assert engine.current_index == 1
+            assert engine.answers[1]["value"] == ANSWERS[1]
+
+        async with convergence_engine_29.convergence_session("user-2") as engine:
+            assert engine.answers == {}
@@ -0,0 +1,140 @@
+import pytest
+import asyncio
+import pickle
+
+import fakeredis
+
+from shared.enhanced_backend_performance import AdvancedBackendCache, PerformanceConfig
+
+async def make_node(server: fakeredis.FakeServer, signing_key: str = "") -> AdvancedBackendCache:
+    node = AdvancedBackendCache(PerformanceConfig(max_workers=1, cache_signing_key=signing_key))
+    await node.initialize(fakeredis.aioredis.FakeRedis(server=server))
+    return node
+
+async def wait_until(condition, timeout: float = 1.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.001)
+
+class TestTwoTierCache:
+    """Test cases for the L1 + Redis backend cache"""
+
+    @pytest.mark.asyncio
+    async def test_redis_hit_fills_l1(self):
+        """A Redis read is cached in L1 and the next read skips Redis"""
+        server = fakeredis.FakeServer()
+        writer = await make_node(server)
+        reader = await make_node(server)
+        try:
+            await writer.put("trust_tier:user-1", {"tier": 2})
+
+            assert await reader.get("trust_tier:user-1") == {"tier": 2}
+            assert "trust_tier:user-1" in reader.cache
+            assert await reader.get("trust_tier:user-1") == {"tier": 2}
+
+            metrics = reader.get_metrics()
+            assert metrics["l2_hit_count"] == 1
+            assert metrics["l1_hit_count"] == 1
+        finally:
+            await writer.close()
+            await reader.close()
+
+    @pytest.mark.asyncio
+    async def test_l1_miss_falls_through_to_redis(self):
+        """Clearing L1 leaves the value readable from Redis"""
+        node = await make_node(fakeredis.FakeServer())
+        try:
+            await node.put("limbic_state:user-1", {"trust": 0.7})
+            node.clear_local()
+
+            assert await node.get("limbic_state:user-1") == {"trust": 0.7}
+            assert node.get_metrics()["l2_hit_count"] == 1
+            assert await node.get("missing") is None
+            assert node.miss_count == 1
+        finally:
+            await node.close()
+
+    @pytest.mark.asyncio
+    async def test_write_invalidates_other_replicas(self):
+        """A write on one replica evicts the stale L1 copy on another"""
+        server = fakeredis.FakeServer()
+        node_a = await make_node(server)
+        node_b = await make_node(server)
+        try:
+            await node_a.put("trust_tier:user-1", {"tier": 1})
+            await wait_until(lambda: node_b.invalidations_received == 1)
+            assert await node_b.get("trust_tier:user-1") == {"tier": 1}
+
+            await node_a.put("trust_tier:user-1", {"tier": 3})
+            await wait_until(lambda: "trust_tier:user-1" not in node_b.cache)
+
+            assert await node_b.get("trust_tier:user-1") == {"tier": 3}
+            assert node_b.invalidations_received == 2
+            # A replica ignores its own invalidations
+            assert "trust_tier:user-1" in node_a.cache
+            assert node_a.invalidations_received == 0
+        finally:
+            await node_a.close()
+            await node_b.close()
+
+    @pytest.mark.asyncio
+    async def test_delete_invalidates_other_replicas(self):
+        """A delete removes the key from Redis and every replica's L1"""
+        server = fakeredis.FakeServer()
+        node_a = await make_node(server)
+        node_b = await make_node(server)
+        try:
+            await node_a.put("trust_tier:user-2", {"tier": 0})
+            await node_b.get("trust_tier:user-2")
+
+            await node_a.delete("trust_tier:user-2")
+            await wait_until(lambda: "trust_tier:user-2" not in node_b.cache)
+
+            assert await node_b.get("trust_tier:user-2") is None
+        finally:
+            await node_a.close()
+            await node_b.close()
+
+class TestTwoTierCacheSerialization:
+    """Test cases for what the cache trusts from Redis"""
+
+    @pytest.mark.asyncio
+    async def test_json_by_default(self):
+        """Without a signing key values are shared as JSON and pickles are refused"""
+        server = fakeredis.FakeServer()
+        node = await make_node(server)
+        try:
+            await node.put("limbic_state:user-1", {"trust": 0.7})
+            assert await node.redis_client.get("limbic_state:user-1") == b'j{"trust": 0.7}'
+
+            # Not JSON-encodable: kept out of Redis
+            await node.put("raw", {1, 2})
+            assert await node.redis_client.get("raw") is None
+            assert await node.get("raw") == {1, 2}
+
+            await node.redis_client.set("planted", b"p" + bytes(32) + pickle.dumps({"x": 1}))
+            assert await node.get("planted") is None
+        finally:
+            await node.close()
+
+    @pytest.mark.asyncio
+    async def test_signed_pickle_between_replicas(self):
+        """Replicas sharing a signing key exchange pickles; tampered ones are misses"""
+        server = fakeredis.FakeServer()
+        writer = await make_node(server, signing_key="shared-secret")
+        reader = await make_node(server, signing_key="shared-secret")
+        outsider = await make_node(server, signing_key="other-secret")
+        try:
+            await writer.put("tiers", {(1, 2): {"tier", "set"}})
+            assert await reader.get("tiers") == {(1, 2): {"tier", "set"}}
+            assert await outsider.get("tiers") is None
+
+            payload = await writer.redis_client.get("tiers")
+            await writer.redis_client.set("tampered", payload[:33] + pickle.dumps("evil"))
+            assert await reader.get("tampered") is None
+            assert reader.miss_count == 1
+        finally:
+            await writer.close()
+            await reader.close()
+            await outsider.close()
@@ -10,13 +10,17 @@ import json
 import logging
 import os
 from datetime import datetime, timezone
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterable, Tuple
 from dataclasses import dataclass, asdict
 from pathlib import Path
 import re
 
+from session_store import SESSION_TTL, SessionStore, create_session_backend
+
 logger = logging.getLogger(__name__)
 
+SENTENCE_BOUNDARY = re.compile(r'[.!?]+')
+
 @dataclass
 class ExtractionTarget:
     """Structured data extraction from convergence answers"""
@@ -66,21 +70,168 @@ class HeritageDNACore:
     # Phase 10: Final Integration (Q27-Q30) - NEW
     final_integration: Dict[str, Any]
 
+class SentenceLocator:
+    """
+    Span of the sentence around a position, as re.split(r'[.!?]+') would cut it
+    
+    Positions must be queried in increasing order; the next occurrence of each
+    punctuation mark is remembered, so locating every sentence of an answer
+    scans it about once.
+    """
+    
+    MARKS = '.!?'
+    
+    def __init__(self, text: str):
+        self.text = text
+        self.current = (-1, -1)
+        self.next_mark = {mark: -1 for mark in self.MARKS}
+    
+    def span(self, position: int) -> Tuple[int, int]:
+        start, end = self.current
+        if start <= position < end:
+            return self.current
+        
+        text = self.text
+        # The sentence starts after the last mark before position; nothing
+        # before the previous sentence's closing mark needs searching again
+        start = max(text.rfind(mark, max(end, 0), position) for mark in self.MARKS) + 1
+        end = len(text)
+        for mark in self.MARKS:
+            found = self.next_mark[mark]
+            if found != len(text) and found < position:
+                found = text.find(mark, position)
+                found = len(text) if found == -1 else found
+                self.next_mark[mark] = found
+            end = min(end, found)
+        self.current = (start, end)
+        return self.current
+
+class CompiledExtractor:
+    """
+    Finds the sentences relevant to every field in one pass over an answer
+    
+    All keyword patterns are compiled into one regex, searched again from
+    one character past each match so every position where some pattern
+    starts is seen. Alternatives are tried longest first, and a match also
+    counts for the fields of any pattern that is a prefix of it, so the
+    result is the same as testing each field's patterns against each
+    sentence. Once a field has its two sentences the scan continues with a
+    regex of the patterns still pending, and stops when none are.
+    """
+    
+    def __init__(self, extraction_patterns: Dict[str, List[str]]):
+        owners: Dict[str, set] = {}
+        for field_name, patterns in extraction_patterns.items():
+            for pattern in patterns:
+                if not pattern or SENTENCE_BOUNDARY.search(pattern):
+                    raise ValueError(f"Pattern {pattern!r} for {field_name} must be non-empty and within one sentence")
+                owners.setdefault(pattern, set()).add(field_name)
+        
+        self.owners: Dict[str, frozenset] = {pattern: frozenset(fields) for pattern, fields in owners.items()}
+        self.fields_by_pattern: Dict[str, frozenset] = {
+            pattern: frozenset(
+                field_name
+                for prefix, fields in owners.items() if pattern.startswith(prefix)
+                for field_name in fields
+            )
+            for pattern in owners
+        }
+        self.fields = frozenset(field_name for fields in owners.values() for field_name in fields)
+        self.regexes: Dict[frozenset, re.Pattern] = {}
+    
+    def _regex(self, fields: frozenset) -> re.Pattern:
+        """Combined regex for the patterns of some fields, longest first"""
+        regex = self.regexes.get(fields)
+        if regex is None:
+            patterns = sorted((pattern for pattern, owners in self.owners.items() if owners & fields), key=len, reverse=True)
+            regex = re.compile('|'.join(re.escape(pattern) for pattern in patterns))
+            self.regexes[fields] = regex
+        return regex
+    
+    def extract(self, answer: str, field_names: Iterable[str]) -> Dict[str, str]:
+        """Up to two matching sentences per field, else the first substantive sentence"""
+        wanted = frozenset(field_names)
+        matched = self._matching_sentences(answer, wanted)
+        
+        values = {}
+        fallback = None
+        for field_name in wanted:
+            spans = matched.get(field_name)
+            if spans:
+                values[field_name] = ' '.join(answer[start:end].strip() for start, end in spans)
+                continue
+            if fallback is None:
+                fallback = self._fallback(answer)
+            values[field_name] = fallback
+        return values
+    
+    def _matching_sentences(self, answer: str, wanted: frozenset) -> Dict[str, List[Tuple[int, int]]]:
+        """Spans of the first two sentences matching each wanted field"""
+        matched: Dict[str, List[Tuple[int, int]]] = {}
+        pending = wanted & self.fields
+        if not pending:
+            return matched
+        
+        answer_lower = answer.lower()
+        positions = None
+        if len(answer_lower) != len(answer):
+            # A few characters lowercase to several; map positions back
+            positions = [i for i, char in enumerate(answer) for _ in char.lower()]
+        
+        sentences = SentenceLocator(answer)
+        regex = self._regex(pending)
+        match = regex.search(answer_lower)
+        while match is not None:
+            start = match.start()
+            sentence = sentences.span(positions[start] if positions else start)
+            completed = []
+            for field_name in self.fields_by_pattern[match.group()]:
+                if field_name not in pending:
+                    continue
+                spans = matched.setdefault(field_name, [])
+                if not spans or spans[-1] != sentence:
+                    spans.append(sentence)
+                    if len(spans) == 2:
+                        completed.append(field_name)
+            if completed:
+                pending = pending.difference(completed)
+                if not pending:
+                    break
+                regex = self._regex(pending)
+            match = regex.search(answer_lower, start + 1)
+        return matched
+    
+    @staticmethod
+    def _fallback(answer: str) -> str:
+        # First substantive sentence, else the first 200 chars
+        start = 0
+        for boundary in SENTENCE_BOUNDARY.finditer(answer):
+            sentence = answer[start:boundary.start()]
+            if len(sentence.split()) > 5:
+                return sentence.strip()
+            start = boundary.end()
+        sentence = answer[start:]
+        if len(sentence.split()) > 5:
+            return sentence.strip()
+        return answer[:200]
+
 class ConvergenceProcessor:
     """
     Processes convergence answers in real-time
     Extracts structured data and builds Heritage DNA
     """
     
-    def __init__(self, heritage_data_path: Optional[Path] = None):
+    def __init__(self, heritage_data_path: Optional[Path] = None, session_store: Optional[SessionStore] = None):
         self.heritage_data_path = heritage_data_path or Path(os.getenv("HERITAGE_DATA_PATH", "./data/heritage"))
         self.heritage_data_path.mkdir(parents=True, exist_ok=True)
         
-        # Active convergence sessions
-        self.active_sessions: Dict[str, Dict[str, Any]] = {}
+        # Convergence sessions, loaded from the store by session id on each call
+        self.sessions = session_store or SessionStore(create_session_backend(), "convergence", SESSION_TTL)
         
         # Extraction patterns (simple pattern matching for now, can be enhanced with LLM)
         self.extraction_patterns = self._initialize_extraction_patterns()
+        # Rebuild after changing extraction_patterns
+        self.extractor = CompiledExtractor(self.extraction_patterns)
     
     def _initialize_extraction_patterns(self) -> Dict[str, List[str]]:
         """Initialize simple keyword patterns for extraction"""
@@ -93,6 +244,20 @@ class ConvergenceProcessor:
             'joy_source': ['joy', 'happy', 'delight', 'pleasure', 'love', 'enjoy'],
         }
     
+    @staticmethod
+    def _hydrate(session_id: str):
+        def hydrate(state: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+            if state is None:
+                raise ValueError(f"Session {session_id} not found")
+            # JSON keys are strings; answers are keyed by question number
+            state['answers'] = {int(number): answer for number, answer in state['answers'].items()}
+            return state
+        return hydrate
+    
+    def _session(self, session_id: str):
+        """Load, yield and save back one convergence session"""
+        return self.sessions.session(session_id, self._hydrate(session_id), lambda session: session)
+    
     async def start_convergence(self, user_id: str) -> Dict[str, Any]:
         """
         Start a new convergence session
@@ -100,7 +265,7 @@ class ConvergenceProcessor:
         """
         session_id = f"{user_id}_{datetime.now(timezone.utc).isoformat()}"
         
-        self.active_sessions[session_id] = {
+        await self.sessions.put(session_id, {
             'user_id': user_id,
             'session_id': session_id,
             'started_at': datetime.now(timezone.utc).isoformat(),
@@ -114,7 +279,7 @@ class ConvergenceProcessor:
                 'valence': 0.5,
                 'posture': 'Companion'
             }
-        }
+        })
         
         logger.info(f"Started convergence session {session_id} for user {user_id}")
         
@@ -137,60 +302,63 @@ class ConvergenceProcessor:
         Process a single convergence answer
         Canonical Spec Section 14.3: Extract structured data from answer
         """
-        if session_id not in self.active_sessions:
-            raise ValueError(f"Session {session_id} not found")
-        
-        session = self.active_sessions[session_id]
-        
-        # Store raw answer
-        session['answers'][question_number] = {
-            'question_id': question_id,
-            'answer': answer,
-            'word_count': len(answer.split()),
-            'timestamp': datetime.now(timezone.utc).isoformat()
-        }
-        
-        # Extract structured data
-        extracted_data = await self._extract_data(answer, extraction_target)
-        
-        extraction = ExtractionTarget(
-            question_number=question_number,
-            question_id=question_id,
-            extracted_fields=extracted_data,
-            extraction_confidence=self._calculate_confidence(extracted_data),
-            extraction_timestamp=datetime.now(timezone.utc).isoformat()
-        )
-        
-        session['extractions'].append(asdict(extraction))
-        
-        # Canonical Spec Section 14.3: Elastic Mode - Update limbic state
-        limbic_impact = self._calculate_limbic_impact(answer, extracted_data)
-        session['limbic_state']['trust'] = min(1.0, session['limbic_state']['trust'] + limbic_impact['trust'])
-        session['limbic_state']['warmth'] = min(1.0, session['limbic_state']['warmth'] + limbic_impact['warmth'])
-        
-        # Update progress
-        session['current_question'] = question_number + 1
-        
-        logger.info(f"Processed Q{question_number} for session {session_id}, confidence: {extraction.extraction_confidence:.2f}")
-        
-        return {
-            'success': True,
-            'extraction': asdict(extraction),
-            'limbic_state': session['limbic_state'],
-            'progress': {
-                'current': question_number,
-                'total': 30,
-                'percentage': (question_number / 30) * 100
+        async with self._session(session_id) as session:
+            # Store raw answer
+            session['answers'][question_number] = {
+                'question_id': question_id,
+                'answer': answer,
+                'word_count': len(answer.split()),
+                'timestamp': datetime.now(timezone.utc).isoformat()
+            }
+            
+            # Extract structured data
+            extracted_data = await self._extract_data(answer, extraction_target)
+            
+            extraction = ExtractionTarget(
+                question_number=question_number,
+                question_id=question_id,
+                extracted_fields=extracted_data,
+                extraction_confidence=self._calculate_confidence(extracted_data),
+                extraction_timestamp=datetime.now(timezone.utc).isoformat()
+            )
+            
+            session['extractions'].append(asdict(extraction))
+            
+            # Canonical Spec Section 14.3: Elastic Mode - Update limbic state
+            limbic_impact = self._calculate_limbic_impact(answer, extracted_data)
+            session['limbic_state']['trust'] = min(1.0, session['limbic_state']['trust'] + limbic_impact['trust'])
+            session['limbic_state']['warmth'] = min(1.0, session['limbic_state']['warmth'] + limbic_impact['warmth'])
+            
+            # Update progress
+            session['current_question'] = question_number + 1
+            
+            logger.info(f"Processed Q{question_number} for session {session_id}, confidence: {extraction.extraction_confidence:.2f}")
+            
+            return {
+                'success': True,
+                'extraction': asdict(extraction),
+                'limbic_state': session['limbic_state'],
+                'progress': {
+                    'current': question_number,
+                    'total': 30,
+                    'percentage': (question_number / 30) * 100
+                }
             }
-        }
     
     async def _extract_data(self, answer: str, extraction_target: Dict[str, Any]) -> Dict[str, Any]:
         """
         Extract structured data from free-form answer
         This is a simple implementation - can be enhanced with LLM for better extraction
         """
+        return self._extract(answer, extraction_target)
+    
+    async def extract_batch(self, items: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Extract structured data from many (answer, extraction_target) pairs"""
+        return [self._extract(answer, extraction_target) for answer, extraction_target in items]
+    
+    def _extract(self, answer: str, extraction_target: Dict[str, Any]) -> Dict[str, Any]:
         extracted = {}
-        answer_lower = answer.lower()
+        simple_fields = []
         
         for field_name in extraction_target.keys():
             if isinstance(extraction_target[field_name], list):
@@ -201,37 +369,16 @@ class ConvergenceProcessor:
                 extracted[field_name] = {}
             else:
                 # For simple fields, extract relevant sentences
-                extracted[field_name] = self._extract_field_value(answer, answer_lower, field_name)
+                extracted[field_name] = None
+                simple_fields.append(field_name)
         
+        if simple_fields:
+            extracted.update(self.extractor.extract(answer, simple_fields))
         return extracted
     
     def _extract_field_value(self, answer: str, answer_lower: str, field_name: str) -> str:
         """Extract value for a specific field using pattern matching"""
-        # Get relevant patterns for this field
-        patterns = self.extraction_patterns.get(field_name, [])
-        
-        # Split answer into sentences
-        sentences = re.split(r'[.!?]+', answer)
-        
-        # Find sentences that match patterns
-        relevant_sentences = []
-        for sentence in sentences:
-            sentence_lower = sentence.lower()
-            for pattern in patterns:
-                if pattern in sentence_lower:
-                    relevant_sentences.append(sentence.strip())
-                    break
-        
-        # Return the most relevant content
-        if relevant_sentences:
-            return ' '.join(relevant_sentences[:2])  # Return up to 2 sentences
-        
-        # Fallback: return first substantive sentence
-        for sentence in sentences:
-            if len(sentence.split()) > 5:
-                return sentence.strip()
-        
-        return answer[:200]  # Fallback: first 200 chars
+        return self.extractor.extract(answer, [field_name])[field_name]
     
     def _calculate_confidence(self, extracted_data: Dict[str, Any]) -> float:
         """Calculate extraction confidence based on data quality"""
@@ -273,10 +420,7 @@ class ConvergenceProcessor:
         Canonical Spec Section 14.3 Q13: Generate dynamic Mirror Test
         Synthesize a Soul Topology from Q1-Q12 answers
         """
-        if session_id not in self.active_sessions:
-            raise ValueError(f"Session {session_id} not found")
-        
-        session = self.active_sessions[session_id]
+        session = self._hydrate(session_id)(await self.sessions.get(session_id))
         answers = session['answers']
         
         # Simple synthesis (can be enhanced with LLM for better results)
@@ -367,33 +511,29 @@ class ConvergenceProcessor:
         """
         Canonical Spec Section 14.4: Compile Heritage DNA after Q30
         """
-        if session_id not in self.active_sessions:
-            raise ValueError(f"Session {session_id} not found")
-        
-        session = self.active_sessions[session_id]
-        
-        # Compile Heritage DNA from all extractions
-        heritage_dna = await self._compile_heritage_dna(session)
-        
-        # Save to file
-        user_id = session['user_id']
-        heritage_file = self.heritage_data_path / f"{user_id}_heritage_core.json"
-        
-        with open(heritage_file, 'w') as f:
-            json.dump(asdict(heritage_dna), f, indent=2)
-        
-        logger.info(f"Heritage DNA compiled for user {user_id}")
-        
-        # Mark session as complete
-        session['completed_at'] = datetime.now(timezone.utc).isoformat()
-        session['status'] = 'complete'
-        
-        return {
-            'success': True,
-            'heritage_dna_saved': str(heritage_file),
-            'convergence_complete': True,
-            'limbic_state': session['limbic_state']
-        }
+        async with self._session(session_id) as session:
+            # Compile Heritage DNA from all extractions
+            heritage_dna = await self._compile_heritage_dna(session)
+            
+            # Save to file
+            user_id = session['user_id']
+            heritage_file = self.heritage_data_path / f"{user_id}_heritage_core.json"
+            
+            with open(heritage_file, 'w') as f:
+                json.dump(asdict(heritage_dna), f, indent=2)
+            
+            logger.info(f"Heritage DNA compiled for user {user_id}")
+            
+            # Mark session as complete
+            session['completed_at'] = datetime.now(timezone.utc).isoformat()
+            session['status'] = 'complete'
+            
+            return {
+                'success': True,
+                'heritage_dna_saved': str(heritage_file),
+                'convergence_complete': True,
+                'limbic_state': session['limbic_state']
+            }
     
     async def _compile_heritage_dna(self, session: Dict[str, Any]) -> HeritageDNACore:
         """
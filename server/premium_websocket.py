@@ -17,6 +17,7 @@ from typing import Dict, List, Optional, Any, Set
 from fastapi import WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.responses import JSONResponse
 import websockets
+import httpx
 from dataclasses import dataclass, asdict
 import hashlib
 import hmac
@@ -124,6 +125,11 @@ class PremiumWebSocketManager:
         self.dream_cycle_queue: List[SyncEvent] = []
         self.dream_cycle_processors: List[str] = []
         
+        # Streaming chat relay to the AI service
+        self.ai_service_url = os.getenv("AI_SERVICE_URL", "http://localhost:8748")
+        self.ai_client = httpx.AsyncClient(timeout=httpx.Timeout(10.0, read=None))
+        self.chat_streams: Dict[str, Set[asyncio.Task]] = defaultdict(set)  # client_id -> running chat streams
+        
         # Background tasks
         self.cleanup_task: Optional[asyncio.Task] = None
         self.metrics_task: Optional[asyncio.Task] = None
@@ -210,6 +216,10 @@ class PremiumWebSocketManager:
         
         client = self.connected_clients[client_id]
         
+        # Stop relaying any chat streams to this client
+        for task in self.chat_streams.pop(client_id, set()):
+            task.cancel()
+        
         # Remove from all mappings
         self.user_clients[client.user_id].discard(client_id)
         if client.room_id:
@@ -260,6 +270,8 @@ class PremiumWebSocketManager:
                 await self.handle_state_sync(client_id, message)
             elif message_type == "dream_cycle":
                 await self.handle_dream_cycle(client_id, message)
+            elif message_type == "chat":
+                await self.handle_chat(client_id, message)
             else:
                 # Generic message handling
                 await self.handle_generic_message(client_id, message)
@@ -411,6 +423,67 @@ class PremiumWebSocketManager:
                 "processed": False
             })
 
+    async def handle_chat(self, client_id: str, message: Dict[str, Any]):
+        """Start streaming a chat reply from the AI service to the client"""
+        client = self.connected_clients[client_id]
+        data = message.get("data", {})
+        request_id = data.get("request_id") or uuid.uuid4().hex
+        
+        payload = {
+            "message": data.get("message", ""),
+            "conversation_id": data.get("conversation_id"),
+            "model": data.get("model"),
+            "stream": True
+        }
+        
+        # Relay in the background so this socket keeps receiving while tokens stream
+        task = asyncio.create_task(self.relay_chat_stream(client_id, client.user_id, request_id, payload))
+        self.chat_streams[client_id].add(task)
+        task.add_done_callback(lambda done: self.chat_streams.get(client_id, set()).discard(done))
+
+    async def relay_chat_stream(self, client_id: str, user_id: str, request_id: str, payload: Dict[str, Any]):
+        """Forward AI service SSE events to the client as chat_* messages"""
+        token = jwt.encode(
+            {"sub": user_id, "exp": int(time.time()) + 300},
+            self.jwt_secret,
+            algorithm="HS256"
+        )
+        
+        try:
+            async with self.ai_client.stream(
+                "POST",
+                f"{self.ai_service_url}/api/v1/ai/chat",
+                json=payload,
+                headers={"Authorization": f"Bearer {token}"}
+            ) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    await self.send_to_client(client_id, {
+                        "type": "chat_error",
+                        "request_id": request_id,
+                        "data": {"error": f"AI service returned {response.status_code}"},
+                        "timestamp": time.time() * 1000
+                    })
+                    return
+                
+                async for line in response.aiter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    
+                    event = json.loads(line[len("data: "):])
+                    await self.send_to_client(client_id, {
+                        "type": f"chat_{event['type']}",
+                        "request_id": request_id,
+                        "data": event,
+                        "timestamp": time.time() * 1000
+                    })
+                    
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error relaying chat stream to {client_id}: {e}")
+            await self.send_error(client_id, "Chat stream failed")
+
     async def handle_generic_message(self, client_id: str, message: Dict[str, Any]):
         """Handle generic messages"""
         client = self.connected_clients[client_id]
@@ -637,6 +710,16 @@ class PremiumWebSocketManager:
                 logger.error(f"Error processing dream cycles: {e}")
                 await asyncio.sleep(5)
 
+    async def close(self):
+        """Stop chat relays and close the AI service client on shutdown"""
+        streams = [task for tasks in self.chat_streams.values() for task in tasks]
+        for task in streams:
+            task.cancel()
+        await asyncio.gather(*streams, return_exceptions=True)
+        self.chat_streams.clear()
+
+        await self.ai_client.aclose()
+
     def get_metrics(self) -> Dict[str, Any]:
         """Get current metrics"""
         return {
@@ -913,6 +913,12 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down Sallie Server Enterprise Edition...")
 
+    try:
+        from premium_websocket import premium_ws_manager
+        await premium_ws_manager.close()
+    except ImportError:
+        pass
+
 # Middleware
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,31 @@
+"""
+Per-user flow session store for the server
+
+The implementation is shared with the backend services in
+backend/shared/session_store.py; this module only binds it to the
+server's environment variables instead of shared.config.
+"""
+
+import os
+
+# Add shared modules to path
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '../backend'))
+
+from shared import session_store as shared_session_store
+from shared.session_store import (
+    MemorySessionBackend,
+    RedisSessionBackend,
+    SessionStore,
+    SQLiteSessionBackend,
+    decode_state,
+    encode_state
+)
+
+SESSION_STORE_URL = os.getenv("SESSION_STORE_URL", "sqlite:///./data/flow_sessions.db")
+SESSION_TTL = int(os.getenv("SESSION_TTL", str(shared_session_store.DEFAULT_TTL)))  # seconds an idle session is kept
+SESSION_MEMORY_MAX_ENTRIES = int(os.getenv("SESSION_MEMORY_MAX_ENTRIES", str(shared_session_store.DEFAULT_MEMORY_MAX_ENTRIES)))
+
+def create_session_backend(url: str = SESSION_STORE_URL):
+    """Backend for a SESSION_STORE_URL"""
+    return shared_session_store.create_session_backend(url, SESSION_MEMORY_MAX_ENTRIES)
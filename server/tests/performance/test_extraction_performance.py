@@ -0,0 +1,91 @@
+import pytest
+import random
+import re
+import time
+import sys
+import os
+
+# Add the server directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from convergence_processor import ConvergenceProcessor
+
+WORDS = (
+    "so anyway most days look pretty ordinary from the outside and that is fine with me "
+    "work and family take most of the week and i try to keep a steady rhythm going "
+    "there is a lot i could say here about how things unfolded over the years "
+    "i usually feel it in my body first when the pressure starts and my heart races "
+    "then i overthink every detail and the loop escalates until i need a break or a walk "
+    "what i love most is building something real and i enjoy quiet mornings "
+    "honestly i am afraid that if i stop i will lose momentum and people will notice"
+).split()
+
+def long_answer(rng: random.Random, sentences: int) -> str:
+    """Free-form answer of `sentences` sentences of 8-25 words"""
+    parts = []
+    for _ in range(sentences):
+        words = rng.choices(WORDS, k=rng.randint(8, 25))
+        parts.append(" ".join(words).capitalize() + rng.choice([".", ".", "!", "?", "..."]))
+    return " ".join(parts)
+
+def nested_loop_extract(patterns, answer: str, field_name: str) -> str:
+    """The previous _extract_field_value: re-split, then fields x sentences x patterns"""
+    sentences = re.split(r'[.!?]+', answer)
+    relevant_sentences = []
+    for sentence in sentences:
+        sentence_lower = sentence.lower()
+        for pattern in patterns.get(field_name, []):
+            if pattern in sentence_lower:
+                relevant_sentences.append(sentence.strip())
+                break
+    if relevant_sentences:
+        return ' '.join(relevant_sentences[:2])
+    for sentence in sentences:
+        if len(sentence.split()) > 5:
+            return sentence.strip()
+    return answer[:200]
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestExtractionPerformance:
+    """Performance tests for convergence answer extraction"""
+
+    @pytest.mark.asyncio
+    async def test_compiled_extraction_on_long_answers(self, tmp_path):
+        """Compiled extraction matches the nested loop and is faster on long answers"""
+        processor = ConvergenceProcessor(tmp_path)
+        patterns = processor.extraction_patterns
+        target = {field_name: "" for field_name in list(patterns) + ["core_theme", "origin_story"]}
+        rng = random.Random(7)
+
+        # Compile the combined regexes outside the timed runs
+        await processor.extract_batch([(long_answer(rng, 50), target) for _ in range(10)])
+
+        print(f"\n{'sentences':>10} {'answers':>8} {'nested ms':>10} {'compiled ms':>12} {'batch ms':>9} {'speedup':>8}")
+        for sentences, count in [(5, 200), (50, 100), (400, 20)]:
+            answers = [long_answer(rng, sentences) for _ in range(count)]
+
+            start = time.perf_counter()
+            expected = [
+                {field_name: nested_loop_extract(patterns, answer, field_name) for field_name in target}
+                for answer in answers
+            ]
+            nested = time.perf_counter() - start
+
+            start = time.perf_counter()
+            compiled = [await processor._extract_data(answer, target) for answer in answers]
+            single = time.perf_counter() - start
+
+            start = time.perf_counter()
+            batched = await processor.extract_batch([(answer, target) for answer in answers])
+            batch = time.perf_counter() - start
+
+            assert compiled == expected
+            assert batched == expected
+            print(
+                f"{sentences:>10} {count:>8} {nested * 1000:>10.1f} {single * 1000:>12.1f} "
+                f"{batch * 1000:>9.1f} {nested / single:>7.1f}x"
+            )
+
+            if sentences >= 50:
+                assert single < nested
@@ -0,0 +1,90 @@
+import pytest
+import asyncio
+import sys
+import os
+
+# Add the server directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from session_store import (
+    SessionStore, MemorySessionBackend, SQLiteSessionBackend, encode_state, decode_state
+)
+from convergence_processor import ConvergenceProcessor
+
+LONG_ANSWER = " ".join(["I overthink and analyze everything before I build anything."] * 30)
+
+@pytest.mark.unit
+class TestSessionStore:
+    """Test cases for the flow session store"""
+
+    def test_state_round_trip_is_compact(self):
+        """Large states are compressed and decode to the same data"""
+        state = {"answers": {"1": LONG_ANSWER}, "current_question": 2}
+        blob = encode_state(state)
+        assert blob[:1] == b"z"
+        assert len(blob) < len(LONG_ANSWER) // 4
+        assert decode_state(blob) == state
+        assert encode_state({"n": 1})[:1] == b"j"
+
+    @pytest.mark.asyncio
+    async def test_memory_backend_evicts_least_recent(self):
+        """The in-memory backend is a bounded LRU"""
+        backend = MemorySessionBackend(max_entries=2)
+        store = SessionStore(backend, "test", ttl=60)
+        await store.put("a", {"n": 1})
+        await store.put("b", {"n": 2})
+        await store.get("a")
+        await store.put("c", {"n": 3})
+        assert await store.get("b") is None
+        assert await store.get("a") == {"n": 1}
+
+    @pytest.mark.asyncio
+    async def test_session_serializes_concurrent_updates(self):
+        """Concurrent requests for one user don't overwrite each other"""
+        store = SessionStore(MemorySessionBackend(), "test", ttl=60)
+        await store.put("user", {"count": 0})
+
+        async def increment():
+            async with store.session("user", lambda state: state, lambda state: state) as state:
+                await asyncio.sleep(0)
+                state["count"] += 1
+
+        await asyncio.gather(*[increment() for _ in range(20)])
+        assert (await store.get("user"))["count"] == 20
+
+    @pytest.mark.asyncio
+    async def test_session_not_saved_on_error(self):
+        """A failed request leaves the stored state untouched"""
+        store = SessionStore(MemorySessionBackend(), "test", ttl=60)
+        await store.put("user", {"count": 0})
+        with pytest.raises(RuntimeError):
+            async with store.session("user", lambda state: state, lambda state: state) as state:
+                state["count"] = 99
+                raise RuntimeError("boom")
+        assert (await store.get("user"))["count"] == 0
+
+@pytest.mark.unit
+class TestConvergenceProcessorSessions:
+    """Test cases for persistent convergence sessions"""
+
+    @pytest.mark.asyncio
+    async def test_session_survives_restart(self, tmp_path):
+        """A new processor on the same SQLite store resumes the session"""
+        store_path = str(tmp_path / "sessions.db")
+        processor = ConvergenceProcessor(tmp_path, SessionStore(SQLiteSessionBackend(store_path), "convergence"))
+        session = await processor.start_convergence("user-1")
+        await processor.process_answer(session["session_id"], 1, "ni_ti_loop", LONG_ANSWER, {"trigger_pattern": ""})
+
+        restarted = ConvergenceProcessor(tmp_path, SessionStore(SQLiteSessionBackend(store_path), "convergence"))
+        result = await restarted.process_answer(session["session_id"], 2, "door_slam", "short answer", {})
+        assert result["progress"]["current"] == 2
+
+        mirror = await restarted.generate_mirror_test(session["session_id"])
+        assert "deep thinker" in mirror["mirror_test_text"]
+
+    @pytest.mark.asyncio
+    async def test_unknown_session_raises(self, tmp_path):
+        """Unknown session ids still raise ValueError"""
+        processor = ConvergenceProcessor(tmp_path, SessionStore(MemorySessionBackend(), "convergence"))
+        with pytest.raises(ValueError):
+            await processor.process_answer("missing", 1, "q", "answer", {})